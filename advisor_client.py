@@ -0,0 +1,71 @@
+"""
+Client of the advisor API (api.py), with the interface bot.py uses from agent.py, so the Streamlit
+app can run as a thin client (set ADVISOR_API_URL, e.g. http://localhost:8000).
+"""
+import json
+import urllib.error
+import urllib.request
+
+ERROR_RESPONSE = "I apologize, but I encountered an error processing your request. Please try rephrasing your question or ask something else."
+
+class AdvisorAPIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+class AdvisorClient:
+    """
+    answer() and stream() take the caller's session id, so one conversation keeps its history
+    whichever replica answers.
+    """
+
+    def __init__(self, base_url, timeout=180.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _post(self, path, body):
+        request = urllib.request.Request(
+            f"{self.base_url}{path}", data=json.dumps(body).encode('utf-8'), method='POST',
+            headers={'Content-Type': 'application/json'},
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get('error', e.reason)
+            except ValueError:
+                message = e.reason
+            raise AdvisorAPIError(e.code, message) from None
+
+    def answer(self, message, session_id=None):
+        with self._post('/v1/answer', {'message': message, 'session_id': session_id}) as response:
+            return json.loads(response.read())['answer']
+
+    def stream(self, message, session_id=None):
+        """
+        The events of agent.stream_response, read from the NDJSON stream as they arrive.
+        """
+        with self._post('/v1/answer/stream', {'message': message, 'session_id': session_id}) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+
+    def degree_progress(self, major_id, completed_courses):
+        body = {'major_id': major_id, 'completed_courses': list(completed_courses)}
+        with self._post('/v1/degree_progress', body) as response:
+            return json.loads(response.read())
+
+    def stream_response(self, message, session_id=None):
+        """
+        stream() that ends with the error answer instead of raising, like agent.stream_response.
+        """
+        try:
+            for event in self.stream(message, session_id):
+                if event['type'] == 'error':
+                    break
+                yield event
+                if event['type'] == 'final':
+                    return
+        except (AdvisorAPIError, OSError, ValueError) as e:
+            print(f"Error occurred: {str(e)}")
+        yield {'type': 'final', 'text': ERROR_RESPONSE}
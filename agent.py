@@ -1,7 +1,10 @@
-from llm import llm
-from graph import graph
+import time
+_import_started = time.perf_counter()
+
+from llm import llm, embeddings
 
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.callbacks import CallbackManager
 from langchain.schema import StrOutputParser
 
 from langchain.tools import Tool
@@ -13,20 +16,72 @@ from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain import hub
 
 
-from utils import get_session_id
-
 from langchain_core.prompts import PromptTemplate
 
 
-from tools.cypher import cypher_qa
-from tools.db_retriever import *
-#from tools.vector import get_course_description
-from tools.pdf_reader import pdf_qa_tool
+from tools.registry import ToolRegistry
+from course_ids import clean_course_id, find_course_ids
+from router import route_question, log_route
+from response_cache import ResponseCache
+from chat_history import ChatHistoryStore
+from streaming import stream_events, STREAM_ALL_TAG
+from observations import observation_log
 
 
 from pydantic import BaseModel, field_validator
 import re
 
+# Tool components are built on first use (or by tool_registry.warm_up(), see bot.py),
+# so importing this module does not wait on Neo4j, the PDF index or the Cypher chain.
+def _build_cypher_qa():
+    from tools.cypher import cypher_qa
+    return cypher_qa
+
+def _catalog_version():
+    return tool_registry.get("db_retriever").catalog_version()
+
+# Fast-path answers shared across sessions; catalog reloads drop the ones about courses that changed,
+# and answers from an older catalog version are never served
+response_cache = ResponseCache(embeddings, version_source=_catalog_version)
+
+def _build_db_retriever():
+    import tools.db_retriever as db_retriever
+    from tools.course_index import CourseGraphIndex
+    from graph import graph
+
+    # Serve prerequisite and course lookups from an in-process copy of the catalog graph
+    try:
+        index = CourseGraphIndex.from_neo4j(graph, refresh_interval=300)
+        # an answer about a course also depends on everything in its prerequisite chain
+        index.on_change(lambda version, changed: response_cache.invalidate(
+            index.get_dependents(changed), catalog_version=version))
+        db_retriever.use_course_index(index)
+    except Exception as e:
+        print(f"Course index unavailable, using Neo4j directly: {str(e)}")
+    return db_retriever
+
+def _build_course_search():
+    from tools.hybrid_retriever import HybridCourseRetriever, format_courses
+
+    # search the same in-process catalog copy the db_retriever tools use
+    index = tool_registry.get("db_retriever").course_index
+    if index is None:
+        from tools.course_index import CourseGraphIndex
+        from graph import graph
+        index = CourseGraphIndex.from_neo4j(graph, refresh_interval=300)
+    retriever = HybridCourseRetriever(index, embeddings)
+    return lambda query: format_courses(retriever.search(query))
+
+def _build_pdf_qa_tool():
+    from tools.pdf_reader import pdf_qa_tool
+    return pdf_qa_tool
+
+tool_registry = ToolRegistry()
+tool_registry.register("cypher_qa", _build_cypher_qa)
+tool_registry.register("db_retriever", _build_db_retriever)
+tool_registry.register("course_search", _build_course_search)
+tool_registry.register("pdf_qa_tool", _build_pdf_qa_tool)
+
 # Create a course chat chain
 chat_prompt = ChatPromptTemplate.from_messages(
     [
@@ -37,20 +92,42 @@ chat_prompt = ChatPromptTemplate.from_messages(
 
 course_chat = chat_prompt | llm | StrOutputParser()
 
+# Phrases the result of a single tool call for the fast path (one LLM call, no agent loop)
+fast_path_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", "You are an expert UCSD college course advisor. Answer the student's question using only the data below. "
+                   "Course ids take the form 'MATH 20C'. Prerequisite groups joined by AND are all required; courses joined by OR are alternatives.\n\n"
+                   "Data from the {tool} tool:\n{context}"),
+        ("human", "{input}"),
+    ]
+)
+
+fast_path_chat = fast_path_prompt | llm | StrOutputParser()
+
 class CourseIDInput(BaseModel):
     course_id: str
 
     @field_validator('course_id')
     @classmethod
     def validate_course_id(cls, v):
-        # Pattern: Letters + space + numbers (optionally followed by a letter)
-        cleaned = v.strip().replace('`', '').split('\n')[0]
-        pattern = r'^[A-Z]+\s\d+[A-Z]*$'
-        if not re.match(pattern, cleaned):
-            raise ValueError('Course ID must be in format like "MATH 18" or "MATH 20C"')
+        # validation only: the Tool passes the raw text on, and db_retriever cleans it again
+        cleaned = clean_course_id(v)
         print(f"VALIDATION OUTPUT:{cleaned}________")
         return cleaned
 
+class CourseIDsInput(BaseModel):
+    # several course ids in one text ("CSE 100, CSE 101 and MATH 184"); the batch tools
+    # get the text as is and read the course ids from it (db_retriever.course_id_list)
+    course_ids: str
+
+    @field_validator('course_ids')
+    @classmethod
+    def validate_course_ids(cls, v):
+        found = find_course_ids(v)
+        if not found:
+            raise ValueError('Give course IDs in format like "MATH 18, MATH 20C"')
+        return v
+
 class MajorIDInput(BaseModel):
     major_id: str
 
@@ -72,49 +149,130 @@ tools = [
     Tool.from_function(
         name="Course information",
         description="Provide information about course questions using Cypher",
-        func = cypher_qa,
+        func = tool_registry.lazy("cypher_qa"),
     ), 
     Tool.from_function(
         name="(Accurate) Gets immediate prerequisites",
         description="Accurately retrieves immediate prerequisite courses for given course_id from Neo4j database. Convert input course id into proper format before proceeding. ",
-        func=get_prerequisites,
+        func=tool_registry.lazy("db_retriever", "get_prerequisites"),
         args_schema=CourseIDInput,
     ),
     Tool.from_function(
         name="(Accurate) Iteratively retrieves ALL prerequisites",
         description="Iteratively handles the retrieval of ALL prerequisite courses for a given course_id from Neo4j database. DO NOT use unless you are retrieving ALL prerequisites. Otherwise, just use '(Accurate) Gets immediate prerequisites'.",
-        func=iterative_get_prerequisites,
+        func=tool_registry.lazy("db_retriever", "iterative_get_prerequisites"),
         args_schema=CourseIDInput,
     ),
+    Tool.from_function(
+        name="(Accurate) Gets immediate prerequisites of several courses",
+        description="Retrieves immediate prerequisite courses for SEVERAL course_ids at once, e.g. 'CSE 100, CSE 101, MATH 184'. Use this instead of calling '(Accurate) Gets immediate prerequisites' once per course.",
+        func=tool_registry.lazy("db_retriever", "get_prerequisites_batch"),
+        args_schema=CourseIDsInput,
+    ),
+    Tool.from_function(
+        name="(Accurate) Iteratively retrieves ALL prerequisites of several courses",
+        description="Retrieves ALL prerequisite courses for SEVERAL course_ids at once, e.g. 'CSE 100, CSE 101, MATH 184', as one combined list. Use this instead of calling '(Accurate) Iteratively retrieves ALL prerequisites' once per course.",
+        func=tool_registry.lazy("db_retriever", "iterative_get_prerequisites_batch"),
+        args_schema=CourseIDsInput,
+    ),
     Tool.from_function(
         name="(Accurate) Get entire major requirement",
         description="Retrieves all sets of sub-requirements and courses for a given major_id. Use this dictionary to reference major_id: \{'MATH-CS major': 'MA30'\}",
-        func=get_major_requirements,
+        func=tool_registry.lazy("db_retriever", "get_major_requirements"),
         args_schema=MajorIDInput,
     ),
+    Tool.from_function(
+        name="(Accurate) Degree progress",
+        description="Computes which requirements of a major are satisfied and which remain, given the courses a student has completed, and which courses would complete a requirement next. Input: the major_id followed by the completed course ids, e.g. 'MA30: MATH 18, MATH 20A, CSE 11'. Use this instead of comparing completed courses against the major requirements yourself.",
+        func=tool_registry.lazy("db_retriever", "get_degree_progress"),
+    ),
+    Tool.from_function(
+        name="(Accurate) Plan a quarter schedule",
+        description="Computes a valid quarter-by-quarter schedule that respects prerequisites and the 22 unit quarter limit. Input: the target course ids, or a major_id to plan its remaining requirements, followed by the completed course ids, e.g. 'CSE 100, MATH 184; completed: CSE 11, MATH 20A' or 'MA30; completed: MATH 18, CSE 11'. Use this instead of building schedules yourself.",
+        func=tool_registry.lazy("db_retriever", "plan_schedule"),
+    ),
+    Tool.from_function(
+        name="(Accurate) Course prerequisite analytics",
+        description="Precomputed prerequisite metrics in one lookup. For course ids, e.g. 'CSE 150A': how deep its prerequisite chain is, the fastest chain to it, the fewest quarters to complete it from scratch and how many courses it unlocks. Without course ids, ranks courses, e.g. 'lower-division courses that unlock the most' or 'upper-division MATH courses with the longest chain'. Use this instead of chaining prerequisite lookups for 'fastest path' or 'unlocks the most' questions.",
+        func=tool_registry.lazy("db_retriever", "get_course_analytics"),
+    ),
+    Tool.from_function(
+        name="Course Description Search",
+        description="For when you need to find courses about a topic, e.g. 'machine learning' or 'number theory'. Returns matching courses with units, prerequisites and the courses they are required for.",
+        func=tool_registry.lazy("course_search"),
+    ),
     Tool.from_function(
         name="PDF Course Catalog Search",
         description="Search through UCSD course catalogs (CSE and Math) for detailed course information and requirements",
-        func=pdf_qa_tool,
+        func=tool_registry.lazy("pdf_qa_tool"),
     ),
     Tool.from_function(
         name="Major Requirement",
         description="Provided required courses to complete in order to graduate for a major",
-        func=get_courses_by_milestone,
+        func=tool_registry.lazy("db_retriever", "get_courses_by_milestone"),
+    ),
+    Tool.from_function(
+        name="Expand tool output",
+        description="Returns the next part of a tool output that was cut off. Input: the handle given at the end of the cut output, e.g. 'obs-3:2'.",
+        func=observation_log.expand,
     ),
 ]
 
-unused_tool = """
-    Tool.from_function(
-        name="Course Description Search",  
-        description="For when you need to find information about course content based on a description",
-        func=get_course_description, 
-    )
-"""
+# Tool outputs enter the scratchpad in compact form, capped per observation (see observations.py)
+for tool in tools:
+    if tool.name not in ("General Chat", "Expand tool output"):
+        tool.func = observation_log.wrap(tool.name, tool.func)
 
 # Create chat history callback
+# The agent sees a rolling summary plus the last HISTORY_WINDOW messages; messages are
+# persisted to Neo4j by a background writer so a turn never waits on the write.
+HISTORY_WINDOW = 6
+
+summary_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", "Condense this conversation between a student and a UCSD course advisor into a short summary. "
+                   "Keep the student's major, completed courses, course ids discussed and any decisions made."),
+        ("human", "Current summary:\n{summary}\n\nNew lines of conversation:\n{lines}"),
+    ]
+)
+
+summary_chain = summary_prompt | llm | StrOutputParser()
+
+class SharedDriverChatMessageHistory(Neo4jChatMessageHistory):
+    """
+    Neo4jChatMessageHistory on the shared graph connection. The base class closes the driver when
+    garbage collected, which would break every other session once the history store evicts one.
+    """
+
+    def __del__(self):
+        pass
+
+def _history_backend(session_id):
+    from graph import graph
+    return SharedDriverChatMessageHistory(session_id=session_id, graph=graph, window=HISTORY_WINDOW // 2)
+
+# Rolling summaries are kept on the Session node of Neo4jChatMessageHistory, so they survive eviction and restarts
+def _load_summary(session_id):
+    from graph import graph
+    records = graph.query("MATCH (s:Session {id: $session_id}) RETURN s.summary AS summary",
+                          params={"session_id": session_id}, name="chat_history.load_summary")
+    return records[0]['summary'] if records else None
+
+def _save_summary(session_id, summary):
+    from graph import graph
+    graph.query("MERGE (s:Session {id: $session_id}) SET s.summary = $summary",
+                params={"session_id": session_id, "summary": summary}, name="chat_history.save_summary")
+
+history_store = ChatHistoryStore(
+    _history_backend,
+    window=HISTORY_WINDOW,
+    summarize=lambda summary, lines: summary_chain.invoke({"summary": summary, "lines": lines}),
+    load_summary=_load_summary,
+    save_summary=_save_summary,
+)
+
 def get_memory(session_id):
-    return Neo4jChatMessageHistory(session_id=session_id, graph=graph)
+    return history_store.get(session_id)
 
 # Create the agent
 agent_prompt = PromptTemplate.from_template("""
@@ -184,19 +342,113 @@ chat_agent = RunnableWithMessageHistory(
 
 )
 
+# Tools are built on first use; the UI calls tool_registry.warm_up() to build them while it renders
+print(f"Agent module ready in {time.perf_counter() - _import_started:.3f}s")
+
+def startup_report():
+    """
+    Per-tool build timings, for checking what delays the first answer.
+    """
+    return tool_registry.startup_report()
+
+def answer_fast_path(route, user_input, session_id, callbacks=None):
+    """
+    Answers a routed question with one db_retriever call and one LLM call.
+    Returns None if the tool has nothing to say, so the agent can take over.
+    """
+    # reported to the callbacks like an agent tool call
+    tool_run = CallbackManager.configure(inheritable_callbacks=callbacks).on_tool_start({'name': route.tool}, route.argument)
+    try:
+        result = tool_registry.lazy("db_retriever", route.tool)(route.argument)
+    except Exception as e:
+        tool_run.on_tool_error(e)
+        raise
+    tool_run.on_tool_end(str(result))
+    if not result:
+        return None
+    # streamed, so the callbacks get the answer token by token
+    answer = ''.join(fast_path_chat.stream(
+        {"tool": route.tool, "context": observation_log.format(route.tool, result, cap=False), "input": user_input},
+        {"callbacks": callbacks, "tags": [STREAM_ALL_TAG]},
+    ))
+
+    # keep the conversation history complete, as the agent would
+    history = get_memory(session_id)
+    history.add_user_message(user_input)
+    history.add_ai_message(answer)
+    return answer
+
+def answer_question(user_input, session_id, callbacks=None):
+    """
+    Answers from the response cache, the fast path or the agent, in that order.
+    callbacks receive the LLM and tool events of the turn (see streaming.py).
+    """
+    started = time.perf_counter()
+
+    try:
+        cached = response_cache.lookup(user_input)
+    except Exception as e:
+        print(f"Response cache lookup failed: {str(e)}")
+        cached = None
+    if cached is not None:
+        history = get_memory(session_id)
+        history.add_user_message(user_input)
+        history.add_ai_message(cached)
+        log_route("cache", time.perf_counter() - started)
+        return cached
+
+    route = route_question(user_input)
+    if route is not None:
+        try:
+            answer = answer_fast_path(route, user_input, session_id, callbacks)
+            if answer is not None:
+                log_route(f"fast:{route.intent}", time.perf_counter() - started)
+                response_cache.store(user_input, answer)
+                return answer
+        except Exception as e:
+            print(f"Fast path {route} failed, falling back to the agent: {str(e)}")
+
+    response = chat_agent.invoke(
+        {"input": user_input},
+        {"configurable": {"session_id": session_id}, "callbacks": callbacks},
+    )
+    log_route("agent", time.perf_counter() - started)
+    # not cached: the agent's answer can depend on this session's history
+    return response['output']
+
+ERROR_RESPONSE = "I apologize, but I encountered an error processing your request. Please try rephrasing your question or ask something else."
+
+def _streamlit_session_id():
+    # only the Streamlit UI calls without a session id; the headless API (api.py) passes its own
+    from utils import get_session_id
+    return get_session_id()
+
 # Create a handler to call the agent
-def generate_response(user_input):
+def generate_response(user_input, session_id=None):
     """
     Create a handler that calls the Conversational agent
-    and returns a response to be rendered in the UI
+    and returns a response to be rendered in the UI.
+    session_id defaults to the Streamlit session's.
     """
     try:
-        response = chat_agent.invoke(
-            {"input": user_input},
-            {"configurable": {"session_id": get_session_id()}},
-        )
-        return response['output']
+        return answer_question(user_input, session_id or _streamlit_session_id())
     except Exception as e:
         # Log the error if you have logging set up
         print(f"Error occurred: {str(e)}")
-        return "I apologize, but I encountered an error processing your request. Please try rephrasing your question or ask something else."
\ No newline at end of file
+        return ERROR_RESPONSE
+
+def stream_response(user_input, session_id=None):
+    """
+    Streaming version of generate_response. Yields events while the turn runs:
+        {'type': 'tool_start', 'tool', 'input'} / {'type': 'tool_end', 'tool', 'seconds'}
+        {'type': 'token', 'text'} for the final answer as it is generated
+    and finally {'type': 'final', 'text'} with the complete answer (also saved to history).
+    session_id defaults to the Streamlit session's.
+    """
+    # the Streamlit session id is only available on the script thread
+    session_id = session_id or _streamlit_session_id()
+    try:
+        yield from stream_events(lambda handler: answer_question(user_input, session_id, [handler]))
+    except Exception as e:
+        print(f"Error occurred: {str(e)}")
+        yield {'type': 'final', 'text': ERROR_RESPONSE}
\ No newline at end of file
@@ -0,0 +1,436 @@
+"""
+Headless HTTP/JSON API around the advisor agent, for running without Streamlit and with several
+replicas behind a load balancer. bot.py becomes a thin client of it when ADVISOR_API_URL is set
+(see advisor_client.py).
+
+    POST /v1/answer             {"message", "session_id"?} -> {"answer", "session_id", "seconds"}
+    POST /v1/answer/stream      same body, answers with NDJSON events (see streaming.py), one per line
+    POST /v1/degree_progress    {"major_id", "completed_courses": [...]} -> the degree progress report
+    GET  /healthz               the process is up
+    GET  /readyz                503 until the tools are built, and while shutting down
+    GET  /metrics               Prometheus text: turns, worker pool, graph queries, LLM governors
+
+A request without a session_id gets a new one, returned in the response; the chat history is kept per
+session id in Neo4j, so any replica can continue a conversation (the in-process history window and
+response cache are per replica, so keep a session on one replica where the load balancer allows it).
+
+Agent turns and degree progress reports run on a bounded worker pool: at most `workers` at once and
+`max_pending` running or queued; past that the API answers 503 with Retry-After instead of queueing
+without bound. A /v1/answer turn or /v1/degree_progress report that takes longer than `turn_timeout`
+answers 504 (the work itself finishes in the background).
+On SIGTERM or SIGINT the server stops accepting connections, fails readiness, waits up to
+`drain_timeout` for open requests and flushes the chat history writes.
+
+Settings (environment or secrets.toml, see config.py), overridden by the command line:
+    ADVISOR_HOST, ADVISOR_PORT, ADVISOR_WORKERS, ADVISOR_MAX_PENDING, ADVISOR_TURN_TIMEOUT, ADVISOR_DRAIN_TIMEOUT
+
+    python api.py --port 8000 --workers 8
+"""
+import json
+import time
+import uuid
+import signal
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from config import settings
+from query_metrics import query_metrics, QUANTILES, _percentile
+from streaming import stream_events
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_MESSAGE_CHARS = 4000
+
+class ServiceBusy(Exception):
+    """
+    The worker pool is full, or the service is shutting down.
+    """
+
+class AdvisorService:
+    """
+    The agent behind the HTTP handlers: worker pool, admission control, readiness and metrics.
+    """
+
+    def __init__(self, agent, workers=8, max_pending=32, turn_timeout=120.0):
+        self.agent = agent
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.turn_timeout = turn_timeout
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-turn")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.draining = False
+        self.warm_up_thread = None
+        self.pending = 0
+        self.running = 0
+        self.open_requests = 0
+        self.requests = {}
+        self.rejected = 0
+        self.timeouts = 0
+        self.turn_errors = 0
+        self.turn_seconds = deque(maxlen=2048)
+
+    def warm_up(self):
+        self.warm_up_thread = self.agent.tool_registry.warm_up()
+
+    def ready(self):
+        """
+        Ready once the tool warm-up finished (components that failed are retried on first use).
+        """
+        return not self.draining and self.warm_up_thread is not None and not self.warm_up_thread.is_alive()
+
+    def submit(self, fn, *args):
+        """
+        Runs fn(*args) on the worker pool. Raises ServiceBusy instead of queueing past max_pending.
+        """
+        if self.draining or not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ServiceBusy()
+        with self._lock:
+            self.pending += 1
+
+        def run():
+            with self._lock:
+                self.pending -= 1
+                self.running += 1
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            except Exception:
+                with self._lock:
+                    self.turn_errors += 1
+                raise
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.turn_seconds.append(time.perf_counter() - started)
+                self._slots.release()
+        return self.pool.submit(run)
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.turn_timeout)
+        except TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def answer(self, message, session_id):
+        return self._result(self.submit(self.agent.answer_question, message, session_id))
+
+    def stream(self, message, session_id):
+        """
+        Events of one turn; raises ServiceBusy on the first next() if the pool is full.
+        """
+        events = stream_events(lambda handler: self.agent.answer_question(message, session_id, [handler]),
+                               submit=self.submit)
+
+        def counted():
+            # stream_events hands the turn's error to the reader, so submit() never sees it
+            try:
+                yield from events
+            except ServiceBusy:
+                raise
+            except Exception:
+                with self._lock:
+                    self.turn_errors += 1
+                raise
+        return counted()
+
+    def degree_progress(self, major_id, completed_courses):
+        """
+        On the worker pool like a turn: the requirement engine may be built from Neo4j first.
+        """
+        def evaluate():
+            db_retriever = self.agent.tool_registry.get("db_retriever")
+            return db_retriever.evaluate_degree_progress(major_id, completed_courses)
+        return self._result(self.submit(evaluate))
+
+    def request_started(self):
+        with self._lock:
+            self.open_requests += 1
+
+    def request_finished(self, endpoint, status):
+        with self._lock:
+            self.open_requests -= 1
+            key = (endpoint, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self._idle.notify_all()
+
+    def drain(self, timeout):
+        """
+        Waits up to timeout seconds for open requests, then for the chat history writes.
+        Returns the requests still open.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self.open_requests and time.monotonic() < deadline:
+                self._idle.wait(deadline - time.monotonic())
+            left = self.open_requests
+        self.pool.shutdown(wait=False)
+        self.agent.history_store.flush()
+        return left
+
+    def to_prometheus(self, prefix='advisor'):
+        """
+        Prometheus text exposition format, followed by the graph query and LLM governor metrics.
+        """
+        with self._lock:
+            requests = dict(self.requests)
+            gauges = (
+                ('turns_running', self.running, 'Agent turns running on the worker pool.'),
+                ('turns_pending', self.pending, 'Agent turns waiting for a worker.'),
+                ('workers', self.workers, 'Size of the worker pool.'),
+                ('max_pending', self.max_pending, 'Turns running or waiting before requests are rejected.'),
+                ('ready', int(self.ready()), 'Whether the service accepts traffic.'),
+            )
+            counters = (
+                ('rejected', self.rejected, 'Turns rejected because the worker pool was full or shutting down.'),
+                ('timeouts', self.timeouts, 'Turns that took longer than the turn timeout.'),
+                ('turn_errors', self.turn_errors, 'Turns that raised an error.'),
+            )
+            seconds = sorted(self.turn_seconds)
+
+        lines = [
+            f"# HELP {prefix}_requests_total HTTP requests by endpoint and status.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        for (endpoint, status), count in sorted(requests.items()):
+            lines.append(f'{prefix}_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        for name, value, description in counters:
+            lines += [
+                f"# HELP {prefix}_{name}_total {description}",
+                f"# TYPE {prefix}_{name}_total counter",
+                f"{prefix}_{name}_total {value}",
+            ]
+        for name, value, description in gauges:
+            lines += [
+                f"# HELP {prefix}_{name} {description}",
+                f"# TYPE {prefix}_{name} gauge",
+                f"{prefix}_{name} {value}",
+            ]
+        lines += [
+            f"# HELP {prefix}_turn_seconds Agent turn latency over recent turns.",
+            f"# TYPE {prefix}_turn_seconds gauge",
+        ]
+        for q in QUANTILES:
+            lines.append(f'{prefix}_turn_seconds{{quantile="{q}"}} {_percentile(seconds, q)}')
+
+        text = '\n'.join(lines) + '\n' + query_metrics.to_prometheus()
+        import llm
+        # the offline stand-ins of benchmarks/offline.py replace llm.py without governors
+        for name, governor_prefix in (('llm_governor', 'openai_chat'), ('embedding_governor', 'openai_embedding')):
+            governor = getattr(llm, name, None)
+            if governor is not None:
+                text += governor.to_prometheus(prefix=governor_prefix)
+        return text
+
+class BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _string(body, name, required=True):
+    value = body.get(name)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or not value.strip():
+        raise BadRequest(400, f"'{name}' must be a non-empty string")
+    return value.strip()
+
+class AdvisorHTTPServer(ThreadingHTTPServer):
+    # one thread per connection; the worker pool, not the listen backlog, limits the agent turns
+    daemon_threads = True
+    request_queue_size = 128
+
+def make_handler(service):
+    """
+    Request handler class bound to service.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, payload, content_type='application/json', headers=None):
+            data = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+            return status
+
+        def _error(self, status, message, headers=None):
+            return self._send(status, {'error': message}, headers=headers)
+
+        def _busy(self):
+            return self._error(503, "The advisor is busy or shutting down, retry shortly.", {'Retry-After': '1'})
+
+        def _body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_BODY_BYTES:
+                raise BadRequest(413, f"Request body is larger than {MAX_BODY_BYTES} bytes")
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                raise BadRequest(400, "Request body is not valid JSON")
+            if not isinstance(body, dict):
+                raise BadRequest(400, "Request body must be a JSON object")
+            return body
+
+        def _turn(self, body):
+            message = _string(body, 'message')
+            if len(message) > MAX_MESSAGE_CHARS:
+                raise BadRequest(413, f"'message' is longer than {MAX_MESSAGE_CHARS} characters")
+            return message, _string(body, 'session_id', required=False) or str(uuid.uuid4())
+
+        def _handle(self, routes):
+            endpoint = self.path.split('?', 1)[0]
+            route = routes.get(endpoint)
+            service.request_started()
+            status = 500
+            try:
+                if route is None:
+                    status = self._error(404, f"No route {self.command} {endpoint}")
+                else:
+                    status = route()
+            except BadRequest as e:
+                status = self._error(e.status, str(e))
+            except Exception as e:
+                print(f"API error on {self.command} {endpoint}: {str(e)}")
+                status = self._error(500, "Internal error")
+            finally:
+                service.request_finished(endpoint if route else 'other', status)
+
+        def do_GET(self):
+            self._handle({
+                '/healthz': lambda: self._send(200, {'status': 'ok'}),
+                '/readyz': self.readyz,
+                '/metrics': lambda: self._send(200, service.to_prometheus().encode('utf-8'),
+                                               content_type='text/plain; version=0.0.4'),
+            })
+
+        def do_POST(self):
+            self._handle({
+                '/v1/answer': self.answer,
+                '/v1/answer/stream': self.answer_stream,
+                '/v1/degree_progress': self.degree_progress,
+            })
+
+        def readyz(self):
+            payload = {'ready': service.ready(), 'draining': service.draining,
+                       'tools': service.agent.tool_registry.startup_report()['components']}
+            return self._send(200 if payload['ready'] else 503, payload)
+
+        def answer(self):
+            message, session_id = self._turn(self._body())
+            started = time.perf_counter()
+            try:
+                answer = service.answer(message, session_id)
+            except ServiceBusy:
+                return self._busy()
+            except TimeoutError:
+                return self._error(504, f"The answer took longer than {service.turn_timeout}s")
+            return self._send(200, {'answer': answer, 'session_id': session_id,
+                                    'seconds': round(time.perf_counter() - started, 3)})
+
+        def answer_stream(self):
+            message, session_id = self._turn(self._body())
+            events = service.stream(message, session_id)
+            try:
+                first = next(events)
+            except ServiceBusy:
+                return self._busy()
+
+            # no Content-Length: the connection is closed after the last event
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            try:
+                self._write_event(dict(first, session_id=session_id))
+                for event in events:
+                    self._write_event(event)
+            except (BrokenPipeError, ConnectionResetError):
+                # the client went away; the turn still finishes and is saved to history
+                print(f"Client disconnected from the stream of session {session_id}")
+            except Exception as e:
+                print(f"Error occurred: {str(e)}")
+                self._write_event({'type': 'error', 'error': "Internal error"})
+            return 200
+
+        def _write_event(self, event):
+            self.wfile.write(json.dumps(event, default=str).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+        def degree_progress(self):
+            body = self._body()
+            courses = body.get('completed_courses')
+            if not isinstance(courses, list) or not all(isinstance(course, str) for course in courses):
+                raise BadRequest(400, "'completed_courses' must be a list of course ids")
+            major_id = _string(body, 'major_id')
+            try:
+                report = service.degree_progress(major_id, courses)
+            except ServiceBusy:
+                return self._busy()
+            except TimeoutError:
+                return self._error(504, f"The degree progress took longer than {service.turn_timeout}s")
+            except LookupError:
+                # no requirement records for the major
+                return self._error(404, f"No requirements loaded for major {major_id}")
+            return self._send(200, report)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def serve(service, host, port, drain_timeout=30.0):
+    """
+    Serves until SIGTERM or SIGINT, then drains (see module docstring).
+    """
+    server = AdvisorHTTPServer((host, port), make_handler(service))
+
+    def stop(signum, frame):
+        if service.draining:
+            return
+        print(f"Received signal {signum}, draining")
+        service.draining = True
+        # shutdown() waits for serve_forever to return, so it cannot run on the serving thread
+        threading.Thread(target=server.shutdown, name="api-shutdown", daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    service.warm_up()
+    print(f"Advisor API listening on http://{host}:{server.server_address[1]} "
+          f"({service.workers} workers, {service.max_pending} pending at most)")
+    server.serve_forever()
+    left = service.drain(drain_timeout)
+    server.server_close()
+    print(f"Advisor API stopped ({left} requests still open)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the course advisor over HTTP.")
+    parser.add_argument("--host", default=settings.get("ADVISOR_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(settings.get("ADVISOR_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(settings.get("ADVISOR_WORKERS", 8)),
+                        help="agent turns run at once")
+    parser.add_argument("--max-pending", type=int, default=int(settings.get("ADVISOR_MAX_PENDING", 32)),
+                        help="turns running or queued before answering 503")
+    parser.add_argument("--turn-timeout", type=float, default=float(settings.get("ADVISOR_TURN_TIMEOUT", 120)),
+                        help="seconds before a turn answers 504")
+    parser.add_argument("--drain-timeout", type=float, default=float(settings.get("ADVISOR_DRAIN_TIMEOUT", 30)),
+                        help="seconds to wait for open requests on shutdown")
+    args = parser.parse_args()
+
+    import agent
+    service = AdvisorService(agent, args.workers, args.max_pending, args.turn_timeout)
+    serve(service, args.host, args.port, args.drain_timeout)
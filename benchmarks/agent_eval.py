@@ -0,0 +1,351 @@
+"""
+Offline evaluation of the advisor pipeline (agent.answer_question: response cache, fast path, ReAct agent)
+on the golden questions in benchmarks/golden_questions.json.
+
+The graph is an in-memory stand-in loaded from data/processed (benchmarks/offline.py), so no Neo4j is needed.
+Without OpenAI the embeddings are deterministic fakes; course search ranks by keyword only unless run live without --record.
+The LLM is one of:
+    scripted (default)  plays the agent from each question's agent_steps and echoes tool data, no API calls
+    replay              responses recorded by an earlier --llm openai --record run
+    openai              the model from secrets.toml (embeddings too)
+
+Reported as JSON: end-to-end latency, per-tool latency, LLM calls, prompt and completion tokens
+(estimated at ~4 characters per token where the model does not report them), token reduction of the
+compact tool observations (observations.py), graph query latency, and the share of expected course ids
+(or titles) from the CSVs that the answer contains:
+    tool_accuracy  with the scripted LLM, whose answer is the tool output: whether the routed / scripted
+                   tools return the right data. It checks the tools, not the answers.
+    accuracy       with replay or openai: the accuracy of the model's answers
+With --baseline, metrics that got worse than a saved report are listed and the exit status is 1.
+To gate answer accuracy, record a run once with --llm openai and compare replays against it.
+
+    python -m benchmarks.agent_eval --output eval.json
+    python -m benchmarks.agent_eval --baseline eval.json
+    python -m benchmarks.agent_eval --llm openai --record benchmarks/recording.json
+    python -m benchmarks.agent_eval --llm replay --record benchmarks/recording.json --baseline eval-openai.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import get_buffer_string
+
+from course_ids import find_course_ids
+from query_metrics import query_metrics
+from observations import observation_log
+from tools.course_index import CourseGraphIndex
+from benchmarks.offline import ScriptedChatModel, RecordedChatModel, CatalogGraphStandIn, install
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "golden_questions.json")
+
+class EvalRecorder(BaseCallbackHandler):
+    """
+    LLM calls, token usage and tool timings of one question.
+    """
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tools = []
+        self._prompts = {}
+        self._tools = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.llm_calls += 1
+        self._prompts[run_id] = sum(len(get_buffer_string(batch)) for batch in messages) // 4
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self.llm_calls += 1
+        self._prompts[run_id] = sum(len(prompt) for prompt in prompts) // 4
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = (response.llm_output or {}).get('token_usage') or {}
+        estimated_prompt = self._prompts.pop(run_id, 0)
+        self.prompt_tokens += usage.get('prompt_tokens', estimated_prompt)
+        self.completion_tokens += usage.get('completion_tokens', sum(
+            len(generation.text) // 4 for generations in response.generations for generation in generations))
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._tools[run_id] = ((serialized or {}).get('name', 'tool'), time.perf_counter())
+
+    def _tool_finished(self, run_id, error):
+        name, started = self._tools.pop(run_id, ('tool', time.perf_counter()))
+        self.tools.append({'tool': name, 'seconds': time.perf_counter() - started, 'error': error})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._tool_finished(run_id, False)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._tool_finished(run_id, True)
+
+def _title(title):
+    # processed titles can carry the catalog's "(4) Tag: ..." suffix
+    return re.split(r'\s*\(\d', title or '', maxsplit=1)[0].strip()
+
+def expected_items(question, index):
+    """
+    What a correct answer must mention, from the CSVs: course ids, or titles for course_info.
+    Returns None if the data to check the question against is not loaded.
+    """
+    expect = question['expect']
+    course_ids = question.get('course_ids', [])
+    if expect == 'prerequisites':
+        return sorted({prereq for course_id in course_ids
+                       for record in index.get_prerequisites(course_id) for prereq in record['prereq_courses']})
+    if expect == 'all_prerequisites':
+        return sorted({prereq for course_id in course_ids
+                       for prereq in index.get_prerequisite_closure(course_id)['depth']} - set(course_ids))
+    if expect == 'course_info':
+        return [_title(index.get_course_info(course_id)[0]['title']) for course_id in course_ids]
+    if expect == 'mentions':
+        return list(course_ids)
+    if expect == 'major_requirements':
+        milestones = index.milestones()
+        if question['major_id'] not in milestones:
+            return None
+        courses, pending = set(), [question['major_id']]
+        while pending:
+            milestone = milestones.get(pending.pop(), {})
+            pending.extend(milestone.get('sub_milestones', []))
+            courses.update(milestone.get('courses', []))
+            courses.update(course_id for _, path in milestone.get('paths', []) for course_id in path)
+        return sorted(courses)
+    raise ValueError(f"Unknown expectation {expect!r}")
+
+def score(answer, items):
+    mentioned = set(find_course_ids(answer))
+    lowered = answer.lower()
+    found = [item for item in items if item in mentioned or item.lower() in lowered]
+    return len(found) / len(items) if items else 1.0, sorted(set(items) - set(found))
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    quantiles = statistics.quantiles(values, n=100, method='inclusive') if len(values) > 1 else values * 99
+    return {
+        'p50_ms': round(quantiles[49] * 1000, 3),
+        'p95_ms': round(quantiles[94] * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3),
+    }
+
+def _build_llm(args):
+    """
+    Returns (llm, embeddings), embeddings being None unless OpenAI is used.
+    """
+    recording = {}
+    if args.record and os.path.exists(args.record):
+        with open(args.record) as f:
+            recording = json.load(f)
+    if args.llm == 'scripted':
+        return ScriptedChatModel(), None
+    if args.llm == 'replay':
+        if not recording:
+            sys.exit(f"No recorded responses in {args.record}: record them with --llm openai --record PATH")
+        return RecordedChatModel(responses=recording), None
+    import llm as live
+    if args.record:
+        return RecordedChatModel(responses=recording, underlying=live.llm), live.embeddings
+    return live.llm, live.embeddings
+
+def run(args):
+    with open(args.golden) as f:
+        questions = json.load(f)
+    if args.category:
+        questions = [question for question in questions if question['category'] in args.category]
+
+    index = CourseGraphIndex.from_csv()
+    llm, live_embeddings = _build_llm(args)
+    embeddings = live_embeddings
+    if embeddings is None:
+        from langchain_community.embeddings import DeterministicFakeEmbedding
+        embeddings = DeterministicFakeEmbedding(size=256)
+    if isinstance(llm, ScriptedChatModel):
+        llm.scripts = {question['question']: question['agent_steps'] for question in questions}
+    install(llm, embeddings, CatalogGraphStandIn(index))
+
+    started = time.perf_counter()
+    import agent
+    import_seconds = time.perf_counter() - started
+    import tools.db_retriever as db_retriever
+    from langchain_community.chat_message_histories import ChatMessageHistory
+    from tools.requirement_cache import RequirementCache
+    from router import router_stats
+
+    def build_db_retriever():
+        db_retriever.use_course_index(index)
+        # keep the on-disk requirement cache of the real catalog untouched
+        db_retriever.requirement_cache = RequirementCache(db_retriever.catalog_version, path=None)
+        return db_retriever
+
+    def build_pdf_qa_tool():
+        # the catalog entries the PDF tool would retrieve, without its own LLM call
+        from langchain_community.vectorstores import FAISS
+        from tools.pdf_index import PDF_PATHS, split_pdf, course_entry_retriever
+        documents = [document for path in PDF_PATHS for document in split_pdf(path)]
+        retriever = course_entry_retriever(FAISS.from_documents(documents, embeddings))
+        # shaped like the RetrievalQA output, with the retrieved entries standing in for the answer
+        def pdf_qa_tool(query):
+            documents = retriever.invoke(query)
+            return {'query': query, 'result': '\n\n'.join(document.page_content for document in documents),
+                    'source_documents': documents}
+        return pdf_qa_tool
+
+    def build_course_search():
+        # dense search over fake embeddings is noise, and recorded prompts must not depend on
+        # the embeddings, so offline and recorded runs search by keyword only
+        from tools.hybrid_retriever import HybridCourseRetriever, format_courses
+        retriever = HybridCourseRetriever(index, embeddings)
+        return lambda query: format_courses(retriever.search(query, mode='keyword'))
+
+    agent.tool_registry.register("db_retriever", build_db_retriever)
+    if live_embeddings is None or args.record:
+        agent.tool_registry.register("course_search", build_course_search)
+    agent.tool_registry.register("pdf_qa_tool", build_pdf_qa_tool)
+    agent.tool_registry.register("cypher_qa", lambda: lambda query: "Generated Cypher cannot run on the in-memory graph.")
+    agent.history_store.backend_factory = lambda session_id: ChatMessageHistory()
+    agent.agent_executor.verbose = False
+
+    agent.tool_registry.warm_up(background=False)
+
+    results = []
+    for question in questions:
+        items = expected_items(question, index)
+        if items is None:
+            results.append({'id': question['id'], 'category': question['category'], 'skipped': 'requirement data not loaded'})
+            continue
+        recorder = EvalRecorder()
+        paths_before = {path: count for path, (count, _) in router_stats.paths.items()}
+        started = time.perf_counter()
+        error = None
+        try:
+            answer = agent.answer_question(question['question'], f"eval-{question['id']}", [recorder])
+        except Exception as e:
+            answer, error = '', f"{type(e).__name__}: {str(e)}"
+        seconds = time.perf_counter() - started
+        path = next((path for path, (count, _) in router_stats.paths.items() if count != paths_before.get(path, 0)), None)
+        accuracy, missing = score(answer, items)
+        results.append({
+            'id': question['id'],
+            'category': question['category'],
+            'path': path,
+            'seconds': round(seconds, 4),
+            'llm_calls': recorder.llm_calls,
+            'prompt_tokens': recorder.prompt_tokens,
+            'completion_tokens': recorder.completion_tokens,
+            'tools': [{**tool, 'seconds': round(tool['seconds'], 4)} for tool in recorder.tools],
+            'score': round(accuracy, 3),
+            'missing': missing[:20],
+            'error': error,
+        })
+
+    if args.record and isinstance(llm, RecordedChatModel) and llm.underlying is not None:
+        with open(args.record, 'w') as f:
+            json.dump(llm.responses, f, indent=1)
+    agent.history_store.flush()
+    startup = {name: component['seconds'] for name, component in agent.startup_report()['components'].items()}
+    return report(results, import_seconds, startup, args.llm)
+
+def report(results, import_seconds, startup, llm_name):
+    answered = [result for result in results if 'skipped' not in result]
+    tool_timings = {}
+    for result in answered:
+        for tool in result['tools']:
+            tool_timings.setdefault(tool['tool'], []).append(tool['seconds'])
+
+    categories = {}
+    for result in answered:
+        categories.setdefault(result['category'], []).append(result['score'])
+    # the scripted LLM echoes the tool output, so its score only checks the tools
+    accuracy = 'tool_accuracy' if llm_name == 'scripted' else 'accuracy'
+
+    return {
+        'llm': llm_name,
+        'summary': {
+            'questions': len(answered),
+            'skipped': len(results) - len(answered),
+            'errors': sum(1 for result in answered if result['error']),
+            accuracy: round(statistics.mean(result['score'] for result in answered), 3) if answered else None,
+            'exact': sum(1 for result in answered if result['score'] == 1.0),
+            'llm_calls': sum(result['llm_calls'] for result in answered),
+            'prompt_tokens': sum(result['prompt_tokens'] for result in answered),
+            'completion_tokens': sum(result['completion_tokens'] for result in answered),
+            'total_seconds': round(sum(result['seconds'] for result in answered), 3),
+            **_percentiles([result['seconds'] for result in answered]),
+            'agent_import_seconds': round(import_seconds, 3),
+        },
+        'tool_build_seconds': startup,
+        f'{accuracy}_by_category': {category: round(statistics.mean(scores), 3) for category, scores in categories.items()},
+        'paths': {path: sum(1 for result in answered if result['path'] == path)
+                  for path in sorted({str(result['path']) for result in answered})},
+        'tools': {tool: {'calls': len(timings), **_percentiles(timings)} for tool, timings in sorted(tool_timings.items())},
+        'observations': observation_log.report(),
+        'graph_queries': query_metrics.snapshot(),
+        'questions': results,
+    }
+
+LATENCY_SLACK_MS = 5.0
+
+# summary metrics where a higher value is a regression, and whether they are timings
+REGRESSION_METRICS = {
+    'errors': False, 'llm_calls': False, 'prompt_tokens': False, 'completion_tokens': False,
+    'p50_ms': True, 'p95_ms': True,
+}
+
+def regressions(current, baseline, tolerance, latency_tolerance):
+    """
+    Summary metrics of current that are worse than baseline beyond the tolerances (relative).
+    """
+    found = []
+    before, after = baseline['summary'], current['summary']
+    for accuracy in ('accuracy', 'tool_accuracy'):
+        if accuracy not in before:
+            continue
+        if accuracy not in after:
+            found.append(f"{accuracy} not measured by this {current['llm']} run (baseline: {baseline['llm']} run)")
+        elif (after[accuracy] or 0) < (before[accuracy] or 0):
+            found.append(f"{accuracy} {before[accuracy]} -> {after[accuracy]}")
+    for metric, timing in REGRESSION_METRICS.items():
+        if metric not in before or metric not in after:
+            continue
+        allowed = before[metric] * (1 + (latency_tolerance if timing else tolerance))
+        if timing:
+            # sub-millisecond timings are noise
+            allowed += LATENCY_SLACK_MS
+        if after[metric] > allowed:
+            found.append(f"{metric} {before[metric]} -> {after[metric]}")
+    return found
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate accuracy, latency and LLM cost of the advisor pipeline offline.")
+    parser.add_argument("--llm", choices=("scripted", "replay", "openai"), default="scripted")
+    parser.add_argument("--record", metavar="PATH", help="recorded LLM responses, read by replay and written by openai runs")
+    parser.add_argument("--golden", default=GOLDEN_PATH)
+    parser.add_argument("--category", action="append", help="only evaluate questions of this category (repeatable)")
+    parser.add_argument("--output", metavar="PATH", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved report, exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="allowed relative growth of LLM calls and tokens")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5, help="allowed relative growth of p50/p95 latency")
+    args = parser.parse_args()
+
+    result = run(args)
+    text = json.dumps(result, indent=1)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(result, baseline, args.tolerance, args.latency_tolerance)
+        for regression in found:
+            print(f"Regression: {regression}", file=sys.stderr)
+        sys.exit(1 if found else 0)
@@ -0,0 +1,186 @@
+"""
+Local stand-in for the OpenAI API (chat completions and embeddings), for load testing the LLM governor
+without an API key. Point a client at FakeOpenAIServer.start()'s base URL, or set OPENAI_BASE_URL in
+secrets.toml to run the whole app against it.
+
+Each request takes `latency` seconds. Above requests_per_second (one second of burst allowed) the server
+answers 429 with a Retry-After header, like the real API does past the account's rate limit.
+
+    python -m benchmarks.fake_openai --port 8765 --latency 0.2 --requests-per-second 5
+"""
+import json
+import time
+import base64
+import struct
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class FakeOpenAIServer:
+    """
+    Answers /v1/chat/completions with "Answer to: <last message>" (streamed word by word when the
+    request asks for a stream) and /v1/embeddings with
+    deterministic vectors. Counts requests, 429s, peak concurrency and repeated request bodies.
+    """
+
+    def __init__(self, latency=0.05, requests_per_second=None, embedding_size=8, port=0):
+        self.latency = latency
+        self.requests_per_second = requests_per_second
+        self.embedding_size = embedding_size
+        self.port = port
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.bodies = {}
+        self._allowance = float(requests_per_second or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self):
+        """
+        Serves in a daemon thread. Returns the base URL for OpenAI clients.
+        """
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status, headers, payload = fake.handle(self.path, body)
+                if isinstance(payload, list):
+                    # streamed completion: server-sent events
+                    data = b''.join(f"data: {json.dumps(event)}\n\n".encode('utf-8') for event in payload)
+                    data += b"data: [DONE]\n\n"
+                    content_type = 'text/event-stream'
+                else:
+                    data = json.dumps(payload).encode('utf-8')
+                    content_type = 'application/json'
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _admit(self):
+        if not self.requests_per_second:
+            return True
+        now = time.monotonic()
+        self._allowance = min(self.requests_per_second,
+                              self._allowance + (now - self._updated) * self.requests_per_second)
+        self._updated = now
+        if self._allowance < 1:
+            return False
+        self._allowance -= 1
+        return True
+
+    def handle(self, path, body):
+        with self._lock:
+            self.requests += 1
+            digest = hashlib.sha256(body).hexdigest()
+            self.bodies[digest] = self.bodies.get(digest, 0) + 1
+            if not self._admit():
+                self.rate_limited += 1
+                retry_after = 1 / self.requests_per_second
+                return 429, {'retry-after': f"{retry_after:.3f}"}, {'error': {
+                    'message': 'Rate limit reached for requests', 'type': 'requests', 'code': 'rate_limit_exceeded'}}
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            request = json.loads(body or b'{}')
+            if path.endswith('/chat/completions'):
+                if request.get('stream'):
+                    return 200, {}, self._chat_chunks(request)
+                return 200, {}, self._chat(request)
+            if path.endswith('/embeddings'):
+                return 200, {}, self._embeddings(request)
+            return 404, {}, {'error': {'message': f'Unknown path {path}', 'type': 'invalid_request_error'}}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _chat(self, request):
+        messages = request.get('messages', [])
+        prompt = ' '.join(str(message.get('content', '')) for message in messages)
+        text = f"Answer to: {str(messages[-1].get('content', ''))[:80]}" if messages else "Answer."
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(text) // 4}
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        return {
+            'id': 'chatcmpl-fake', 'object': 'chat.completion', 'created': int(time.time()),
+            'model': request.get('model', 'fake'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': usage,
+        }
+
+    def _chat_chunks(self, request):
+        # the answer of _chat, one word per chunk
+        completion = self._chat(request)
+        words = completion['choices'][0]['message']['content'].split(' ')
+        chunks = [{'role': 'assistant', 'content': ''}] + [
+            {'content': word if i == 0 else f" {word}"} for i, word in enumerate(words)]
+        events = [
+            {'id': completion['id'], 'object': 'chat.completion.chunk', 'created': completion['created'],
+             'model': completion['model'], 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]}
+            for delta in chunks
+        ]
+        events[-1]['choices'][0]['finish_reason'] = 'stop'
+        return events
+
+    def _vector(self, text):
+        digest = hashlib.sha256(str(text).encode('utf-8')).digest()
+        return [byte / 255.0 for byte in (digest * (self.embedding_size // len(digest) + 1))[:self.embedding_size]]
+
+    def _embeddings(self, request):
+        inputs = request.get('input', [])
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        data = []
+        for index, text in enumerate(inputs):
+            vector = self._vector(text)
+            if request.get('encoding_format') == 'base64':
+                vector = base64.b64encode(struct.pack(f'{len(vector)}f', *vector)).decode('ascii')
+            data.append({'object': 'embedding', 'index': index, 'embedding': vector})
+        tokens = sum(len(str(text)) for text in inputs) // 4
+        return {'object': 'list', 'data': data, 'model': request.get('model', 'fake'),
+                'usage': {'prompt_tokens': tokens, 'total_tokens': tokens}}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'rate_limited': self.rate_limited,
+                'peak_in_flight': self.peak_in_flight,
+                'duplicate_requests': sum(count - 1 for count in self.bodies.values()),
+            }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI API locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--requests-per-second", type=float, help="answer 429 above this rate")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.latency, args.requests_per_second, port=args.port)
+    print(f"Fake OpenAI API at {server.start()} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(server.stats())
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,79 @@
+"""
+Recall and latency of the hybrid course retriever on the processed catalog (data/processed).
+
+Each course with a description yields two queries whose answer is that course:
+    title:    the course title, without the course id
+    keywords: a few words drawn from the description
+Recall@k is the share of queries whose course is in the top k, for dense, keyword (BM25) and hybrid search.
+
+    python -m benchmarks.hybrid_retrieval               # OpenAI embeddings through the local embedding cache
+    python -m benchmarks.hybrid_retrieval --fake 256    # offline; dense search is then meaningless
+"""
+import time
+import random
+import argparse
+import statistics
+
+from tools.course_index import CourseGraphIndex
+from tools.hybrid_retriever import HybridCourseRetriever, tokenize
+
+MODES = ('dense', 'keyword', 'hybrid')
+KS = (1, 5, 10)
+
+def golden_queries(retriever, seed, words=4):
+    rng = random.Random(seed)
+    queries = []
+    for course in retriever.courses:
+        if course['title']:
+            queries.append(('title', course['title'], course['course_id']))
+        title_tokens = set(tokenize(course['title'] or ''))
+        candidates = sorted({token for token in tokenize(course['description'] or '')
+                             if len(token) > 4 and token not in title_tokens})
+        if len(candidates) >= words:
+            queries.append(('keywords', ' '.join(rng.sample(candidates, words)), course['course_id']))
+    return queries
+
+def run(embeddings, seed):
+    started = time.perf_counter()
+    retriever = HybridCourseRetriever(CourseGraphIndex.from_csv(), embeddings)
+    results = {'build': {'courses': len(retriever.courses), 'seconds': round(time.perf_counter() - started, 3)}}
+
+    queries = golden_queries(retriever, seed)
+    # embed every query once up front, so timings measure search rather than the embedding API
+    for _, query, _ in queries:
+        embeddings.embed_query(query)
+
+    for mode in MODES:
+        for kind in ('title', 'keywords'):
+            hits = {k: 0 for k in KS}
+            timings = []
+            selected = [(query, course_id) for query_kind, query, course_id in queries if query_kind == kind]
+            for query, course_id in selected:
+                started = time.perf_counter()
+                found = [course['course_id'] for course in retriever.search(query, k=max(KS), mode=mode)]
+                timings.append(time.perf_counter() - started)
+                for k in KS:
+                    hits[k] += course_id in found[:k]
+            results[f"{mode} / {kind}"] = {
+                'queries': len(selected),
+                **{f"recall@{k}": round(hits[k] / len(selected), 3) for k in KS},
+                'p50_ms': round(statistics.median(timings) * 1000, 3),
+                'p95_ms': round(statistics.quantiles(timings, n=20)[-1] * 1000, 3),
+            }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark recall and latency of the hybrid course retriever.")
+    parser.add_argument("--fake", type=int, metavar="SIZE",
+                        help="use deterministic local embeddings of this size instead of OpenAI")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.fake:
+        from langchain_community.embeddings import DeterministicFakeEmbedding
+        embeddings = DeterministicFakeEmbedding(size=args.fake)
+    else:
+        from llm import embeddings
+
+    for name, result in run(embeddings, args.seed).items():
+        print(f"{name}: " + ", ".join(f"{key} {value}" for key, value in result.items()))
@@ -0,0 +1,125 @@
+"""
+Burst of concurrent LLM and embedding requests against the local fake OpenAI server (benchmarks/fake_openai.py),
+with and without the governor of llm_governor.py.
+
+    direct:    ChatOpenAI / OpenAIEmbeddings as before, the openai client retrying 429s itself (max_retries=2)
+    governed:  the same clients with max_retries=0 behind an LLMGovernor limited just below the server
+Chat is run with invoke() and with stream(), which is how the ReAct agent calls the model. Last, streams are
+sent through a governor without rate limits, and the run fails (exit status 1) if any 429 reaches a caller.
+
+Every request is sent at once from its own thread; `--distinct` prompts are spread over them, so identical
+requests are in flight together, as when many sessions ask the same question. Reported: requests the
+server saw, 429s, errors surfaced to callers, coalesced calls, queue wait and end-to-end latency.
+
+    python -m benchmarks.llm_governor
+    python -m benchmarks.llm_governor --requests 200 --distinct 50 --server-rps 10 --latency 0.2
+"""
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from benchmarks.fake_openai import FakeOpenAIServer
+from llm_governor import LLMGovernor, GovernedChatModel, GovernedEmbeddings
+
+def _percentile(values, quantile):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(quantile * len(values)))] if values else 0.0
+
+def burst(call, inputs):
+    def timed(value):
+        started = time.perf_counter()
+        try:
+            call(value)
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, type(e).__name__
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+        outcomes = list(pool.map(timed, inputs))
+    return time.perf_counter() - started, outcomes
+
+def run_scenario(name, kind, args, governed):
+    server = FakeOpenAIServer(latency=args.latency, requests_per_second=args.server_rps)
+    base_url = server.start()
+    # stay a little under the server's limit
+    governor = LLMGovernor(requests_per_minute=args.server_rps * 60 * 0.9, max_concurrency=args.concurrency,
+                           max_retries=args.retries, backoff=0.1) if governed else None
+    retries = 0 if governed else 2
+
+    if kind in ('chat', 'chat stream'):
+        client = ChatOpenAI(openai_api_key='fake', model='fake-model', base_url=base_url, max_retries=retries)
+        if governed:
+            client = GovernedChatModel(underlying=client, governor=governor)
+        if kind == 'chat':
+            call = client.invoke
+        else:
+            # the ReAct agent calls the model this way
+            call = lambda text: ''.join(chunk.content for chunk in client.stream(text))
+    else:
+        # plain strings on the wire (no tiktoken download)
+        client = OpenAIEmbeddings(openai_api_key='fake', model='fake-embedding', base_url=base_url,
+                                  max_retries=retries, check_embedding_ctx_length=False)
+        if governed:
+            client = GovernedEmbeddings(client, governor)
+        call = client.embed_query
+
+    inputs = [f"What are the prerequisites for course number {i % args.distinct}?" for i in range(args.requests)]
+    seconds, outcomes = burst(call, inputs)
+    server.stop()
+
+    latencies = [latency for latency, _ in outcomes]
+    errors = [error for _, error in outcomes if error]
+    result = {
+        'scenario': f"{kind} {name}",
+        'seconds': round(seconds, 3),
+        **server.stats(),
+        'errors': len(errors),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 1),
+    }
+    if governor is not None:
+        stats = governor.snapshot()
+        result.update({key: stats[key] for key in ('coalesced', 'retries', 'queue_wait_p50_ms', 'queue_wait_p95_ms')})
+    return result
+
+def check_stream_retries(args):
+    """
+    Streams through a governor without rate limits, so the server answers 429s that only the
+    governor's retries can absorb. Returns the number of streams that failed anyway.
+    """
+    server = FakeOpenAIServer(latency=args.latency, requests_per_second=args.server_rps)
+    governor = LLMGovernor(max_concurrency=args.concurrency, max_retries=args.retries + 3, backoff=0.1)
+    client = GovernedChatModel(underlying=ChatOpenAI(openai_api_key='fake', model='fake-model',
+                                                     base_url=server.start(), max_retries=0), governor=governor)
+    inputs = [f"Which courses does course number {i} unlock?" for i in range(int(args.server_rps * 2))]
+    _, outcomes = burst(lambda text: ''.join(chunk.content for chunk in client.stream(text)), inputs)
+    server.stop()
+
+    errors = sum(1 for _, error in outcomes if error)
+    stats = governor.snapshot()
+    print(f"scenario chat stream retries, streams {len(inputs)}, rate_limited {server.stats()['rate_limited']}, "
+          f"retries {stats['retries']}, errors {errors}")
+    return errors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare direct and governed OpenAI clients under a burst.")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--distinct", type=int, default=16, help="distinct prompts among the requests")
+    parser.add_argument("--server-rps", type=float, default=20.0, help="rate limit of the fake server")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the fake server takes per request")
+    parser.add_argument("--concurrency", type=int, default=8, help="governor concurrency limit")
+    parser.add_argument("--retries", type=int, default=3, help="governor retries")
+    args = parser.parse_args()
+
+    for kind in ('chat', 'chat stream', 'embeddings'):
+        for name, governed in (('direct', False), ('governed', True)):
+            result = run_scenario(name, kind, args, governed)
+            print(", ".join(f"{key} {value}" for key, value in result.items()))
+    # a 429 before the first chunk must be retried, as for invoke()
+    if check_stream_retries(args):
+        sys.exit(1)
@@ -0,0 +1,59 @@
+"""
+Per-call cost of the major requirement tools, against the Neo4j database in secrets:
+    uncached: the Cypher queries and document build on every call (the tools before caching)
+    disk:     first call after a restart, loading the documents from the pickle cache
+    memory:   every later call in the same catalog version
+
+    python -m benchmarks.major_requirements
+    python -m benchmarks.major_requirements --major MA30 --repeat 50
+"""
+import os
+import time
+import argparse
+import statistics
+import tempfile
+
+import tools.db_retriever as db_retriever
+from tools.requirement_cache import RequirementCache
+
+def _median_ms(work, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        work()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3)
+
+def run(major_id, repeat):
+    path = os.path.join(tempfile.mkdtemp(), "major_requirements.pkl")
+    version = db_retriever.catalog_version()
+    cases = {
+        'get_major_requirements': (
+            ('major_requirements', major_id), lambda: db_retriever.build_major_requirements(major_id)),
+        'get_courses_by_milestone': (
+            ('courses_by_milestone',), db_retriever.build_courses_by_milestone),
+    }
+
+    results = {}
+    for name, (key, build) in cases.items():
+        uncached = _median_ms(build, repeat)
+
+        # fill the disk cache, then time fresh caches reading it
+        RequirementCache(lambda: version, path).get(key, build)
+        disk = _median_ms(lambda: RequirementCache(lambda: version, path).get(key, build), repeat)
+
+        cache = RequirementCache(lambda: version, path)
+        cache.get(key, build)
+        memory = _median_ms(lambda: cache.get(key, build), repeat)
+        results[name] = {'uncached_ms': uncached, 'disk_ms': disk, 'memory_ms': memory}
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the major requirement tools with and without the requirement cache.")
+    parser.add_argument("--major", default="MA30")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"median of {args.repeat} calls")
+    for name, result in run(args.major, args.repeat).items():
+        print(f"{name}: uncached {result['uncached_ms']}ms, from disk {result['disk_ms']}ms, from memory {result['memory_ms']}ms")
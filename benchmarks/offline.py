@@ -0,0 +1,212 @@
+"""
+Local stand-ins for running the agent pipeline (agent.py) without Neo4j or OpenAI, used by benchmarks/agent_eval.py.
+
+    ScriptedChatModel:  plays the ReAct agent from a script of tool calls per question, and echoes
+                        the data given to the fast path, so answers are exactly what the tools returned
+    RecordedChatModel:  replays LLM responses saved by an earlier live run, recording new ones if given a live model
+    CatalogGraphStandIn: answers the named queries of tools/db_retriever.py from a CourseGraphIndex
+
+install() puts them in place of the llm and graph modules; it must run before agent.py is imported.
+"""
+import sys
+import time
+import types
+import asyncio
+import hashlib
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, get_buffer_string
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from chat_history import approximate_tokens
+from query_metrics import query_metrics
+
+def _result(messages, text, token_usage=None):
+    token_usage = token_usage or {
+        'prompt_tokens': approximate_tokens(messages),
+        'completion_tokens': len(text) // 4,
+    }
+    return ChatResult(
+        generations=[ChatGeneration(message=AIMessage(content=text))],
+        llm_output={'token_usage': token_usage},
+    )
+
+def _observations(scratchpad):
+    # ReAct scratchpad: "...Action Input: X\nObservation: <tool output>\nThought: "
+    return [part.split('\nThought:', 1)[0].strip() for part in scratchpad.split('Observation:')[1:]]
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic chat model for the agent's prompts:
+        ReAct agent:  the tool calls scripted for the question (scripts[question] = [[tool, input], ...]),
+                      one per step, then "Final Answer:" with the tool outputs
+        fast path:    the tool data it was given
+        summaries:    a fixed summary
+    Token usage is estimated at ~4 characters per token.
+    """
+    scripts: dict = {}
+
+    @property
+    def _llm_type(self):
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = get_buffer_string(messages)
+        if 'New input:' in prompt:
+            question, _, scratchpad = prompt.split('New input:', 1)[1].partition('\n')
+            steps = self.scripts.get(question.strip(), [])
+            observations = _observations(scratchpad)
+            if len(observations) < len(steps):
+                tool, tool_input = steps[len(observations)]
+                text = f"Thought: Do I need to use a tool? Yes\nAction: {tool}\nAction Input: {tool_input}"
+            else:
+                answer = '\n'.join(observations) or "I could not find that in the catalog."
+                text = f"Thought: Do I need to use a tool? No\nFinal Answer: {answer}"
+        elif 'Data from the ' in prompt:
+            text = prompt.split('tool:\n', 1)[1].rsplit('\nHuman:', 1)[0].strip()
+        elif 'Condense this conversation' in prompt:
+            text = "The student asked about UCSD courses."
+        else:
+            text = "That is beyond the scope of this advisor."
+        return _result(messages, text)
+
+def prompt_key(messages, stop=None):
+    return hashlib.sha256((get_buffer_string(messages) + repr(stop)).encode('utf-8')).hexdigest()
+
+class RecordedChatModel(BaseChatModel):
+    """
+    Replays responses by prompt (responses[prompt_key] = {'text', 'token_usage'}).
+    Prompts without a recording are sent to underlying and recorded, or raise KeyError without one.
+    """
+    responses: dict = {}
+    underlying: Optional[Any] = None
+
+    @property
+    def _llm_type(self):
+        return "recorded"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = prompt_key(messages, stop)
+        if key not in self.responses:
+            if self.underlying is None:
+                raise KeyError(f"No recorded response for prompt {key[:12]}")
+            message = self.underlying.invoke(messages, stop=stop)
+            usage = message.response_metadata.get('token_usage') or {}
+            self.responses[key] = {
+                'text': message.content,
+                'token_usage': {field: usage[field] for field in ('prompt_tokens', 'completion_tokens') if field in usage},
+            }
+        recorded = self.responses[key]
+        return _result(messages, recorded['text'], recorded['token_usage'])
+
+class CatalogGraphStandIn:
+    """
+    In-memory stand-in for graph.graph. The named queries of tools/db_retriever.py are answered
+    from a CourseGraphIndex (e.g. CourseGraphIndex.from_csv()); any other query returns no records.
+    Latencies are recorded in query_metrics like real queries.
+    """
+    schema = ''
+    structured_schema = {}
+
+    def __init__(self, index):
+        self.index = index
+        self.handlers = {
+            'get_course_info': lambda params: self.index.get_course_info(params['course_id']) or [],
+            'get_prerequisites': lambda params: self.index.get_prerequisites(params['course_id']),
+            'get_course_units': self._course_units,
+            'get_courses_by_milestone.query_courses': self._milestone_courses,
+            'get_courses_by_milestone.query_orgroups': self._milestone_paths,
+            'get_major_requirements.direct_query': self._requirement_courses,
+            'get_major_requirements.or_group_query': self._requirement_paths,
+        }
+
+    def query(self, query, params={}, name=None):
+        started = time.perf_counter()
+        handler = self.handlers.get(name)
+        result = handler(params) if handler is not None else []
+        query_metrics.observe(name or 'unnamed', time.perf_counter() - started)
+        return result
+
+    def refresh_schema(self):
+        pass
+
+    def _course_units(self, params):
+        return [
+            {'course_id': course_id, 'units': info[0]['units']}
+            for course_id in params['course_ids']
+            for info in [self.index.get_course_info(course_id)] if info
+        ]
+
+    def _milestone_courses(self, params):
+        milestones = self.index.milestones()
+        return [
+            {'milestone_id': milestone_id, 'title': milestones[milestone_id]['title'],
+             'course_ids': milestones[milestone_id]['courses']}
+            for milestone_id in sorted(milestones) if milestones[milestone_id]['courses']
+        ]
+
+    def _milestone_paths(self, params):
+        milestones = self.index.milestones()
+        return [
+            {'milestone_id': milestone_id, 'title': milestones[milestone_id]['title'],
+             'grouped_courses': [courses for _, courses in milestones[milestone_id]['paths']]}
+            for milestone_id in sorted(milestones) if milestones[milestone_id]['paths']
+        ]
+
+    def _requirements(self, major_id):
+        # (major, division, requirement) milestone triples, as matched by the major requirement queries
+        milestones = self.index.milestones()
+        major = milestones.get(major_id)
+        if major is None:
+            return
+        for division_id in major['sub_milestones']:
+            for requirement_id in milestones.get(division_id, {}).get('sub_milestones', []):
+                if requirement_id in milestones:
+                    yield major, (division_id, milestones[division_id]), milestones[requirement_id]
+
+    def _requirement_record(self, major, division, requirement):
+        division_id, division = division
+        return {
+            'major': major['title'], 'major.description': major['description'],
+            'division': division_id, 'div.description': division['description'],
+            'requirement': requirement['title'], 'require.description': requirement['description'],
+            'units_needed': requirement['units_required'],
+        }
+
+    def _requirement_courses(self, params):
+        return [
+            {**self._requirement_record(major, division, requirement), 'select_from_courses': requirement['courses']}
+            for major, division, requirement in self._requirements(params['major_id']) if requirement['courses']
+        ]
+
+    def _requirement_paths(self, params):
+        return [
+            {**self._requirement_record(major, division, requirement), 'path': group_id, 'select_from_courses': courses}
+            for major, division, requirement in self._requirements(params['major_id'])
+            for group_id, courses in requirement['paths']
+        ]
+
+def graph_module(stand_in):
+    """
+    A module with the interface of graph.py (graph, aquery, run_async) backed by stand_in.
+    """
+    module = types.ModuleType('graph')
+
+    async def aquery(query, params=None, name=None):
+        return stand_in.query(query, params or {}, name=name)
+
+    module.graph = stand_in
+    module.aquery = aquery
+    module.run_async = asyncio.run
+    return module
+
+def install(llm, embeddings, graph_stand_in):
+    """
+    Makes `from graph import ...` use graph_stand_in and `from llm import ...` use llm and embeddings.
+    If the real llm module was already imported (live runs), only its attributes are replaced.
+    """
+    sys.modules['graph'] = graph_module(graph_stand_in)
+    llm_module = sys.modules.setdefault('llm', types.ModuleType('llm'))
+    llm_module.llm = llm
+    llm_module.embeddings = embeddings
@@ -0,0 +1,75 @@
+"""
+Page chunks vs course entry chunks for the PDF catalog search tool.
+
+    pages:   the previous splitter, 500 character pieces of each page, top 4 by vector search
+    entries: one chunk per course entry (tools/pdf_index.split_pdf), exact course id lookup,
+             top 3 by vector search for questions that name no course
+
+For every course in the catalogs the question "What is <course id> about?" is asked; the context
+is what the QA chain would stuff into its prompt. Tokens are estimated at ~4 characters per token.
+"found" is the share of questions whose context contains the course's own catalog header.
+
+    python -m benchmarks.pdf_chunking              # OpenAI embeddings through the local embedding cache
+    python -m benchmarks.pdf_chunking --fake 256   # offline; vector search is then meaningless
+"""
+import time
+import argparse
+import statistics
+
+from langchain_community.vectorstores import FAISS
+
+from tools.pdf_index import PDF_PATHS, split_pdf, split_pdf_pages, course_entry_retriever
+
+def tokens(text):
+    return len(text) // 4
+
+def run(embeddings, limit=None):
+    entries = [document for path in PDF_PATHS for document in split_pdf(path)]
+    pages = [document for path in PDF_PATHS for document in split_pdf_pages(path)]
+    questions = [
+        (document.metadata['course_id'], f"{document.metadata['course_id']}. {document.metadata['title']}")
+        for document in entries if 'course_id' in document.metadata
+    ]
+    questions = list(dict.fromkeys(questions))[:limit]
+
+    retrievers = {
+        'pages': FAISS.from_documents(pages, embeddings).as_retriever(search_kwargs={'k': 4}),
+        'entries': course_entry_retriever(FAISS.from_documents(entries, embeddings)),
+    }
+    chunks = {'pages': pages, 'entries': entries}
+
+    results = {}
+    for name, retriever in retrievers.items():
+        context_tokens, timings, found = [], [], 0
+        for course_id, header in questions:
+            started = time.perf_counter()
+            documents = retriever.invoke(f"What is {course_id} about?")
+            timings.append(time.perf_counter() - started)
+            context = '\n\n'.join(document.page_content for document in documents)
+            context_tokens.append(tokens(context))
+            found += header in context
+        results[name] = {
+            'chunks': len(chunks[name]),
+            'avg_chunk_tokens': round(statistics.mean(tokens(document.page_content) for document in chunks[name]), 1),
+            'questions': len(questions),
+            'avg_context_tokens': round(statistics.mean(context_tokens), 1),
+            'found': round(found / len(questions), 3),
+            'p50_ms': round(statistics.median(timings) * 1000, 3),
+        }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare page and course entry chunking of the PDF catalogs.")
+    parser.add_argument("--fake", type=int, metavar="SIZE",
+                        help="use deterministic local embeddings of this size instead of OpenAI")
+    parser.add_argument("--limit", type=int, help="ask about the first LIMIT courses only")
+    args = parser.parse_args()
+
+    if args.fake:
+        from langchain_community.embeddings import DeterministicFakeEmbedding
+        embeddings = DeterministicFakeEmbedding(size=args.fake)
+    else:
+        from llm import embeddings
+
+    for name, result in run(embeddings, args.limit).items():
+        print(f"{name}: " + ", ".join(f"{key} {value}" for key, value in result.items()))
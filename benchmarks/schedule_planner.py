@@ -0,0 +1,81 @@
+"""
+Schedule planner on the full CSE + Math catalog (data/processed), no database needed.
+
+Scenarios:
+    all upper division: every CSE and MATH course numbered 100-199, from nothing completed
+    random targets:     --plans plans of 6 random upper division courses, with random lower division courses completed
+
+    python -m benchmarks.schedule_planner
+    python -m benchmarks.schedule_planner --plans 500 --seed 1
+"""
+import re
+import time
+import random
+import argparse
+import statistics
+
+from tools.course_index import CourseGraphIndex
+from tools.schedule_planner import SchedulePlanner
+
+def catalog_planner(index):
+    prerequisites = {}
+    units = {}
+    for course_id in index.course_ids():
+        groups = [record['prereq_courses'] for record in index.get_prerequisites(course_id)]
+        if groups:
+            prerequisites[course_id] = groups
+        info = index.get_course_info(course_id)
+        if info:
+            units[course_id] = info[0]['units']
+    return SchedulePlanner(prerequisites, units)
+
+def _number(course_id):
+    return int(re.match(r'\d+', course_id.split(' ')[1]).group(0))
+
+def run(plans, seed):
+    started = time.perf_counter()
+    index = CourseGraphIndex.from_csv()
+    planner = catalog_planner(index)
+    load_seconds = time.perf_counter() - started
+
+    catalog = [course_id for course_id in index.course_ids() if index.get_course_info(course_id)]
+    upper = [course_id for course_id in catalog if 100 <= _number(course_id) < 200]
+    lower = [course_id for course_id in catalog if _number(course_id) < 100]
+
+    results = {'catalog': {'courses': len(catalog), 'load_seconds': round(load_seconds, 4)}}
+
+    started = time.perf_counter()
+    plan = planner.plan(upper, max_quarters=60)
+    results['all upper division'] = {
+        'targets': len(upper),
+        'ms': round((time.perf_counter() - started) * 1000, 2),
+        'quarters': len(plan['quarters']),
+        'lower_bound': plan['lower_bound'],
+        'unscheduled': len(plan['unscheduled']),
+    }
+
+    rng = random.Random(seed)
+    timings, optimal = [], 0
+    for _ in range(plans):
+        targets = rng.sample(upper, 6)
+        completed = rng.sample(lower, 8)
+        started = time.perf_counter()
+        plan = planner.plan(targets, completed)
+        timings.append(time.perf_counter() - started)
+        optimal += plan['optimal']
+    results['random targets'] = {
+        'plans': plans,
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+        'optimal_share': round(optimal / plans, 3),
+    }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the schedule planner on the processed catalog.")
+    parser.add_argument("--plans", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, result in run(args.plans, args.seed).items():
+        print(f"{name}: " + ", ".join(f"{key} {value}" for key, value in result.items()))
@@ -0,0 +1,66 @@
+"""
+Serial vs fanned-out prerequisite lookups for a multi-course question, against the Neo4j database in secrets.
+
+Serial is what the agent did before the batch tools: one get_prerequisites / iterative_get_prerequisites
+call per course. Fanned out is one get_prerequisites_batch / iterative_get_prerequisites_batch call.
+
+    python -m benchmarks.tool_fanout
+    python -m benchmarks.tool_fanout --courses "CSE 100" "CSE 101" "MATH 184" --repeat 20
+    python -m benchmarks.tool_fanout --metrics prometheus   # also print per-query latency
+"""
+import time
+import argparse
+import statistics
+
+from query_metrics import query_metrics
+from tools.db_retriever import (get_prerequisites, iterative_get_prerequisites,
+                                get_prerequisites_batch, iterative_get_prerequisites_batch)
+
+DEFAULT_COURSES = ["CSE 100", "CSE 101", "MATH 184", "CSE 105", "MATH 180A", "CSE 150A"]
+
+def _time(work, repeat):
+    work()  # warm up connections on both drivers
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        work()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def run(course_ids, repeat):
+    cases = {
+        'immediate': (
+            lambda: [get_prerequisites(course_id) for course_id in course_ids],
+            lambda: get_prerequisites_batch(course_ids),
+        ),
+        'closure': (
+            lambda: [iterative_get_prerequisites(course_id) for course_id in course_ids],
+            lambda: iterative_get_prerequisites_batch(course_ids),
+        ),
+    }
+    results = {}
+    for name, (serial, fanned_out) in cases.items():
+        serial_times = _time(serial, repeat)
+        fanned_out_times = _time(fanned_out, repeat)
+        results[name] = {
+            'serial_ms': round(statistics.median(serial_times) * 1000, 2),
+            'fanned_out_ms': round(statistics.median(fanned_out_times) * 1000, 2),
+            'speedup': round(statistics.median(serial_times) / statistics.median(fanned_out_times), 2),
+        }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serial vs concurrent prerequisite tool calls.")
+    parser.add_argument("--courses", nargs="*", default=DEFAULT_COURSES)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--metrics", choices=["json", "prometheus"], help="print per-query latency after the run")
+    args = parser.parse_args()
+
+    print(f"{len(args.courses)} courses, median of {args.repeat} runs")
+    for name, result in run(args.courses, args.repeat).items():
+        print(f"{name}: serial {result['serial_ms']}ms, fanned out {result['fanned_out_ms']}ms ({result['speedup']}x)")
+
+    if args.metrics == "json":
+        print(query_metrics.to_json(indent=2))
+    elif args.metrics == "prometheus":
+        print(query_metrics.to_prometheus())
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-from utils import write_message
-from agent import generate_response
+from utils import write_message, get_session_id
+from config import settings
 
 # Page Config
 st.set_page_config("UCSD Course Advisor", page_icon=":books:")
@@ -9,6 +9,29 @@ st.set_page_config("UCSD Course Advisor", page_icon=":books:")
 # App Title
 st.title("UC San Diego Course Advisor")
 
+# With ADVISOR_API_URL set, the agent runs in the advisor API (api.py) and this app is a thin client
+if settings.get("ADVISOR_API_URL"):
+    from advisor_client import AdvisorClient
+    advisor = AdvisorClient(settings["ADVISOR_API_URL"])
+
+    def stream_response(message):
+        return advisor.stream_response(message, get_session_id())
+
+    def evaluate_degree_progress(major_id, completed_courses):
+        return advisor.degree_progress(major_id, completed_courses)
+else:
+    from agent import stream_response, tool_registry
+
+    # Build the agent tools in the background while the UI renders, once per server process
+    @st.cache_resource
+    def warm_up_tools():
+        return tool_registry.warm_up()
+
+    warm_up_tools()
+
+    def evaluate_degree_progress(major_id, completed_courses):
+        return tool_registry.get("db_retriever").evaluate_degree_progress(major_id, completed_courses)
+
 # Sample completed courses data
 completed_courses = {
     'CS': pd.DataFrame({
@@ -29,6 +52,26 @@ completed_courses = {
     })
 }
 
+# Majors whose requirements are loaded in the graph
+major_ids = {'Math-CS': 'MA30'}
+
+def show_degree_progress(major_id, course_codes):
+    """
+    Shows how far the completed courses go toward the major's requirements.
+    """
+    try:
+        report = evaluate_degree_progress(major_id, list(course_codes))
+    except Exception as e:
+        print(f"Degree progress unavailable: {str(e)}")
+        return
+    st.write(f"### Degree Progress: {report['requirements satisfied']} of {report['requirements total']} requirements satisfied")
+    if report['remaining']:
+        st.table(pd.DataFrame({
+            'Division': [entry['division'] for entry in report['remaining']],
+            'Requirement': [entry['study'] for entry in report['remaining']],
+            'Needed': [entry['needed to satisfy'] for entry in report['remaining']],
+        }))
+
 # Set up Session State
 if "messages" not in st.session_state:
     st.session_state.messages = [
@@ -53,6 +96,8 @@ if major != "Select Major":
         if want_to_see_completed == "Yes":
             st.write(f"### Completed Courses for {major}")
             st.table(completed_courses.get(major, pd.DataFrame({"Message": ["No data available for this major."]})))
+            if major in major_ids and major in completed_courses:
+                show_degree_progress(major_ids[major], completed_courses[major]['Course Code'])
             ready_for_chat = True
         elif want_to_see_completed == "No":
             st.write(f"What topic of classes are you interested in taking?")
@@ -69,14 +114,35 @@ def handle_submit(message):
     """
     Submit handler:
 
-    You will modify this method to talk with an LLM and provide
-    context using data from Neo4j.
+    Streams the agent's answer into the chat as it is generated,
+    showing each tool call and its timing while the agent works.
     """
-    # Handle the response
-    with st.spinner('Thinking...'):
-        # Call the agent
-        response = generate_response(message)
-        write_message('assistant', response)
+    final = {}
+
+    with st.chat_message('assistant'):
+        status = st.status('Thinking...')
+
+        def answer_tokens():
+            streamed = False
+            for event in stream_response(message):
+                if event['type'] == 'tool_start':
+                    status.write(f"Using {event['tool']}...")
+                elif event['type'] == 'tool_end':
+                    status.write(f"{event['tool']} finished in {event['seconds']:.1f}s")
+                elif event['type'] == 'token':
+                    streamed = True
+                    yield event['text']
+                elif event['type'] == 'final':
+                    final['text'] = event['text']
+                    # cached answers arrive whole
+                    if not streamed:
+                        yield event['text']
+
+        response = st.write_stream(answer_tokens())
+        status.update(label='Done', state='complete', expanded=False)
+
+    # Save the complete answer, not the streamed pieces
+    st.session_state.messages.append({"role": "assistant", "content": final.get('text', response)})
 
 # Display Chat Interface only if all selections are made
 if ready_for_chat:
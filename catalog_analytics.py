@@ -0,0 +1,103 @@
+"""
+Batch job for the prerequisite analytics of tools/prerequisite_analytics.py: per-course chain depth,
+fastest chain, quarters from scratch, courses unlocked, cycles and dangling references.
+
+The metrics are computed once per catalog version, written as properties on the Course nodes
+(prereq_depth, fastest_chain, min_quarters, unlocks, direct_unlocks, in_prereq_cycle, dangling_prereqs)
+and saved to the local snapshot that the "(Accurate) Course prerequisite analytics" tool serves.
+Run it after catalog_loader.py or catalog_sync.py; the tool also rebuilds the snapshot itself when
+it finds the catalog version changed.
+
+    python catalog_analytics.py              # read the graph from Neo4j and write the metrics back
+    python catalog_analytics.py --dry-run    # compute from data/processed, write against an in-memory stand-in
+                                             # (no snapshot unless --snapshot is given)
+"""
+import time
+import argparse
+
+from catalog_loader import DryRunDriver, print_stats, _connect, _write_batches
+from tools.course_index import CourseGraphIndex
+from tools.prerequisite_analytics import SNAPSHOT_PATH, analyze_catalog, save_snapshot, rank_courses
+
+ANALYTICS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (c:Course {course_id: row.course_id})
+    SET c.prereq_depth = row.prereq_depth,
+        c.fastest_chain = row.fastest_chain,
+        c.min_quarters = row.min_quarters,
+        c.unlocks = row.unlocks,
+        c.direct_unlocks = row.direct_unlocks,
+        c.in_prereq_cycle = row.in_cycle,
+        c.dangling_prereqs = row.dangling_prereqs
+"""
+
+class DriverGraph:
+    """
+    graph.query() on top of a plain Neo4j driver, so CourseGraphIndex.from_neo4j can read the
+    catalog without the Streamlit app's graph module.
+    """
+
+    def __init__(self, driver, database=None):
+        self.driver = driver
+        self.database = database
+
+    def query(self, query, params=None):
+        with self.driver.session(database=self.database) as session:
+            return [record.data() for record in session.run(query, **(params or {}))]
+
+def write_analytics(driver, analytics, batch_size=1000, database=None):
+    """
+    Sets the metrics on every Course node in one transaction. Returns stats like load_catalog_graph.
+    """
+    rows = [
+        {'course_id': course_id, **metrics}
+        for course_id, metrics in analytics['courses'].items()
+    ]
+    started = time.perf_counter()
+    with driver.session(database=database) as session:
+        session.execute_write(_write_batches, ANALYTICS_QUERY, rows, batch_size)
+    seconds = time.perf_counter() - started
+    return {
+        'course_analytics': {
+            'rows': len(rows),
+            'seconds': round(seconds, 4),
+            'rows_per_second': round(len(rows) / seconds) if seconds > 0 else None,
+        },
+        'cycles': len(analytics['cycles']),
+        'dangling_references': len(analytics['dangling']),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute prerequisite analytics and store them on the Course nodes.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--snapshot", help=f"local snapshot the analytics tool reads (default {SNAPSHOT_PATH}, "
+                                           f"not written on dry runs unless given)")
+    parser.add_argument("--dry-run", action="store_true", help="read data/processed and write to an in-memory stand-in")
+    parser.add_argument("--uri")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    driver = DryRunDriver() if args.dry_run else _connect(args.uri, args.username, args.password)
+    try:
+        # the snapshot is keyed by the version of what it was computed from, as the tool sees it:
+        # the CSV stamp for a CSV course index, the Neo4j version stamp otherwise
+        index = CourseGraphIndex.from_csv() if args.dry_run else CourseGraphIndex.from_neo4j(DriverGraph(driver))
+        analytics = analyze_catalog(index)
+        print(f"Analyzed {index.course_count()} courses in {analytics['seconds']:.3f}s")
+        stats = write_analytics(driver, analytics, batch_size=args.batch_size)
+    finally:
+        driver.close()
+    print_stats(stats)
+    snapshot = args.snapshot or (None if args.dry_run else SNAPSHOT_PATH)
+    if snapshot:
+        save_snapshot(analytics, index.version, snapshot)
+        print(f"Snapshot saved to {snapshot}")
+
+    for cycle in analytics['cycles']:
+        print(f"Prerequisite cycle: {' / '.join(cycle)}")
+    for course_id, referenced_by in analytics['dangling'].items():
+        print(f"Not in the catalog: {course_id}, required by {', '.join(referenced_by)}")
+    print(f"Lower division courses unlocking the most: {', '.join(rank_courses(analytics, division='lower', limit=5))}")
+    if args.dry_run:
+        print(f"Dry run: {len(driver.statements)} statements")
@@ -0,0 +1,126 @@
+import os
+import json
+import hashlib
+from ast import literal_eval
+
+import pandas as pd
+
+PROCESSED_DIRECTORY = 'data/processed'
+REQUIREMENTS_SUFFIX = ' requirements.csv'
+# Prerequisite table written next to a processed catalog by catalog_pipeline.py
+PREREQUISITES_SUFFIX = '.prerequisites.parquet'
+
+def processed_catalog_paths(directory=PROCESSED_DIRECTORY):
+    """
+    Returns the department catalog CSVs in data/processed (e.g. 'CSE Course Data.csv').
+    """
+    return sorted(
+        os.path.join(directory, file_name)
+        for file_name in os.listdir(directory)
+        if file_name.endswith('.csv') and not file_name.endswith(REQUIREMENTS_SUFFIX)
+    )
+
+def requirement_paths(directory=PROCESSED_DIRECTORY):
+    """
+    Returns the major requirement CSVs in data/processed (e.g. 'MA30 requirements.csv').
+    """
+    return sorted(
+        os.path.join(directory, file_name)
+        for file_name in os.listdir(directory)
+        if file_name.endswith(REQUIREMENTS_SUFFIX)
+    )
+
+def _parse_list(value):
+    if isinstance(value, str):
+        return literal_eval(value)
+    return []
+
+def prerequisite_table_path(path):
+    return os.path.splitext(path)[0] + PREREQUISITES_SUFFIX
+
+def prerequisite_lists(table):
+    """
+    {course_id: [[prereq_id, ...], ...]} from a prerequisite table (course_id, group_index, prereq_id),
+    with a missing prereq_id marking a group without courses.
+    """
+    courses = {}
+    for course_id, group_index, prereq_id in zip(table['course_id'], table['group_index'], table['prereq_id']):
+        groups = courses.setdefault(course_id, [])
+        while len(groups) <= group_index:
+            groups.append([])
+        if not pd.isna(prereq_id):
+            groups[group_index].append(prereq_id)
+    return courses
+
+def read_prerequisite_table(path):
+    """
+    Prerequisites of the catalog at path from its Parquet table, as prerequisite_lists() returns them.
+    None if there is no table, it is older than the CSV (edited by hand since), or pyarrow is unavailable.
+    """
+    table_path = prerequisite_table_path(path)
+    if not os.path.exists(table_path) or os.path.getmtime(table_path) < os.path.getmtime(path):
+        return None
+    try:
+        return prerequisite_lists(pd.read_parquet(table_path))
+    except ImportError:
+        return None
+
+def read_department_catalog(path):
+    """
+    Reads a processed department catalog.
+    Returns a list of course dicts with the prerequisites parsed into AND groups of OR courses.
+    Group positions are kept as-is (they name the OrGroups), so 'Prerequisites: none.' gives [[]].
+    Prerequisites come from the Parquet table written by catalog_pipeline.py when it is current.
+    """
+    data = pd.read_csv(path)
+    prerequisites = read_prerequisite_table(path)
+    courses = []
+    for row in data.itertuples(index=False):
+        courses.append({
+            'course_id': row.Course_Index,
+            'title': row.Course_Title if isinstance(row.Course_Title, str) else '',
+            'units': float(row.Course_Units) if pd.notna(row.Course_Units) else 0,
+            'description': row.Course_Description if isinstance(row.Course_Description, str) else '',
+            'prerequisites': (prerequisites.get(row.Course_Index, []) if prerequisites is not None
+                              else [list(group) for group in _parse_list(row.Course_Prerequisites)]),
+            'restrictions': list(_parse_list(row.Major_Restriction)),
+            'tags': list(_parse_list(row.Course_Tags)),
+        })
+    return courses
+
+def course_row_hash(course):
+    """
+    Hash of one catalog row (as returned by read_department_catalog), stored on Course nodes
+    as row_hash so catalog_sync.py can tell which rows changed.
+    """
+    fields = [course[key] for key in ('course_id', 'title', 'units', 'description', 'prerequisites', 'restrictions', 'tags')]
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+def read_major_requirements(path):
+    """
+    Reads a major requirement CSV (columns: Milestones, Title, Units Required, Descriptions, Requirements).
+    Requirements entries are either sub-milestone ids, course ids (taken directly)
+    or tuples of course ids (one sequence path, loaded as an OrGroup '<milestone>_PATH_<idx>').
+    """
+    data = pd.read_csv(path)
+    milestone_ids = set(data['Milestones'])
+    milestones = []
+    for row in data.itertuples(index=False):
+        milestone = {
+            'milestone_id': row.Milestones,
+            'title': row.Title if isinstance(row.Title, str) else '',
+            'units_required': row[2] if pd.notna(row[2]) else 0,
+            'description': row.Descriptions if isinstance(row.Descriptions, str) else '',
+            'sub_milestones': [],
+            'courses': [],
+            'paths': [],
+        }
+        for group_idx, or_group in enumerate(_parse_list(row.Requirements)):
+            if isinstance(or_group, tuple):
+                milestone['paths'].append((f"{row.Milestones}_PATH_{group_idx}", list(or_group)))
+            elif or_group in milestone_ids:
+                milestone['sub_milestones'].append(or_group)
+            else:
+                milestone['courses'].append(or_group)
+        milestones.append(milestone)
+    return milestones
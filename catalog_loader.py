@@ -0,0 +1,311 @@
+"""
+Bulk loader for the course catalog graph, replacing the row-by-row MERGEs in neo4j_db_populate.ipynb.
+
+Parses data/processed/*.csv and the major requirement CSVs once, builds every node and edge in
+memory, then writes them with batched UNWIND statements, one transaction per node/edge type.
+
+    python catalog_loader.py              # load into the database from the settings (config.py)
+    python catalog_loader.py --dry-run    # build and "write" against an in-memory stand-in
+"""
+import time
+import argparse
+
+from catalog_data import (
+    course_row_hash,
+    processed_catalog_paths,
+    requirement_paths,
+    read_department_catalog,
+    read_major_requirements,
+)
+
+CONSTRAINTS = [
+    "CREATE CONSTRAINT course_id IF NOT EXISTS FOR (c:Course) REQUIRE c.course_id IS UNIQUE",
+    "CREATE CONSTRAINT or_group_id IF NOT EXISTS FOR (og:OrGroup) REQUIRE og.group_id IS UNIQUE",
+    "CREATE CONSTRAINT milestone_id IF NOT EXISTS FOR (m:Milestone) REQUIRE m.milestone_id IS UNIQUE",
+]
+
+# Placeholder courses (only referenced as prerequisites) never overwrite catalog data
+COURSE_QUERY = """
+    UNWIND $rows AS row
+    MERGE (c:Course {course_id: row.course_id})
+    SET c.name = row.course_id,
+        c.title = CASE WHEN row.placeholder AND c.title IS NOT NULL THEN c.title ELSE row.title END,
+        c.units = CASE WHEN row.placeholder AND c.units IS NOT NULL THEN c.units ELSE row.units END,
+        c.description = CASE WHEN row.placeholder AND c.description IS NOT NULL THEN c.description ELSE row.description END,
+        c.row_hash = CASE WHEN row.placeholder THEN c.row_hash ELSE row.row_hash END
+"""
+OR_GROUP_QUERY = """
+    UNWIND $rows AS row
+    MERGE (og:OrGroup {group_id: row.group_id})
+    SET og.name = row.group_id
+"""
+MILESTONE_QUERY = """
+    UNWIND $rows AS row
+    MERGE (m:Milestone {milestone_id: row.milestone_id})
+    SET m.name = row.milestone_id,
+        m.title = CASE WHEN row.placeholder AND m.title IS NOT NULL THEN m.title ELSE row.title END,
+        m.units_required = CASE WHEN row.placeholder AND m.units_required IS NOT NULL THEN m.units_required ELSE row.units_required END,
+        m.description = CASE WHEN row.placeholder AND m.description IS NOT NULL THEN m.description ELSE row.description END
+"""
+# (og)-[:REQUIRED]->(c): the group is a prerequisite of the course
+GROUP_REQUIRED_QUERY = """
+    UNWIND $rows AS row
+    MATCH (og:OrGroup {group_id: row.group_id})
+    MATCH (c:Course {course_id: row.course_id})
+    MERGE (og)-[:REQUIRED]->(c)
+"""
+# (c)-[:INCLUDED_IN]->(og): the course is one of the options in the group
+GROUP_MEMBER_QUERY = """
+    UNWIND $rows AS row
+    MATCH (c:Course {course_id: row.course_id})
+    MATCH (og:OrGroup {group_id: row.group_id})
+    MERGE (c)-[:INCLUDED_IN]->(og)
+"""
+# (sub)-[:REQUIRED]->(m): sub-milestone of a division or major
+MILESTONE_REQUIRED_QUERY = """
+    UNWIND $rows AS row
+    MATCH (sub:Milestone {milestone_id: row.sub_milestone_id})
+    MATCH (m:Milestone {milestone_id: row.milestone_id})
+    MERGE (sub)-[:REQUIRED]->(m)
+"""
+# (og)-[:INCLUDED_IN]->(m) and (c)-[:REQUIRED]->(og): one sequence path of a requirement
+PATH_QUERY = """
+    UNWIND $rows AS row
+    MATCH (og:OrGroup {group_id: row.group_id})
+    MATCH (m:Milestone {milestone_id: row.milestone_id})
+    MERGE (og)-[:INCLUDED_IN]->(m)
+"""
+PATH_MEMBER_QUERY = """
+    UNWIND $rows AS row
+    MATCH (c:Course {course_id: row.course_id})
+    MATCH (og:OrGroup {group_id: row.group_id})
+    MERGE (c)-[:REQUIRED]->(og)
+"""
+# (c)-[:INCLUDED_IN]->(m): course taken directly for a requirement
+MILESTONE_COURSE_QUERY = """
+    UNWIND $rows AS row
+    MATCH (c:Course {course_id: row.course_id})
+    MATCH (m:Milestone {milestone_id: row.milestone_id})
+    MERGE (c)-[:INCLUDED_IN]->(m)
+"""
+# Bumped on every load, so running apps (CourseGraphIndex) can tell the catalog changed
+VERSION_QUERY = """
+    MERGE (v:CatalogVersion {name: 'catalog'})
+    SET v.version = coalesce(v.version, 0) + 1, v.updated_at = datetime()
+    RETURN v.version as version
+"""
+
+class CatalogGraph:
+    """
+    Every node and edge of the catalog graph, built in memory from the processed CSVs.
+    Group ids follow the notebook: '<course>_GROUP_<idx>' for prerequisites, '<milestone>_PATH_<idx>' for sequences.
+    """
+
+    def __init__(self):
+        self.courses = {}
+        self.or_groups = {}
+        self.milestones = {}
+        self.group_required = []
+        self.group_members = []
+        self.milestone_required = []
+        self.paths = []
+        self.path_members = []
+        self.milestone_courses = []
+
+    def add_course(self, course_id, title='', units=0, description='', placeholder=True, row_hash=None):
+        if course_id in self.courses and (placeholder or not self.courses[course_id]['placeholder']):
+            return
+        self.courses[course_id] = {
+            'course_id': course_id,
+            'title': title,
+            'units': units,
+            'description': description,
+            'placeholder': placeholder,
+            'row_hash': row_hash,
+        }
+
+    def add_milestone(self, milestone_id, title='', units_required=0, description='', placeholder=True):
+        if milestone_id in self.milestones and (placeholder or not self.milestones[milestone_id]['placeholder']):
+            return
+        self.milestones[milestone_id] = {
+            'milestone_id': milestone_id,
+            'title': title,
+            'units_required': units_required,
+            'description': description,
+            'placeholder': placeholder,
+        }
+
+    def add_department_catalog(self, courses):
+        for course in courses:
+            self.add_course(course['course_id'], course['title'], course['units'], course['description'],
+                            placeholder=False, row_hash=course_row_hash(course))
+            for group_idx, or_group in enumerate(course['prerequisites']):
+                group_id = f"{course['course_id']}_GROUP_{group_idx}"
+                self.or_groups[group_id] = {'group_id': group_id}
+                self.group_required.append({'group_id': group_id, 'course_id': course['course_id']})
+                for prereq_course in or_group:
+                    self.add_course(prereq_course)
+                    self.group_members.append({'course_id': prereq_course, 'group_id': group_id})
+
+    def add_major_requirements(self, milestones):
+        for milestone in milestones:
+            milestone_id = milestone['milestone_id']
+            self.add_milestone(milestone_id, milestone['title'], milestone['units_required'],
+                               milestone['description'], placeholder=False)
+            for sub_milestone_id in milestone['sub_milestones']:
+                self.add_milestone(sub_milestone_id)
+                self.milestone_required.append({'sub_milestone_id': sub_milestone_id, 'milestone_id': milestone_id})
+            for group_id, courses in milestone['paths']:
+                self.or_groups[group_id] = {'group_id': group_id}
+                self.paths.append({'group_id': group_id, 'milestone_id': milestone_id})
+                for course_id in courses:
+                    self.add_course(course_id)
+                    self.path_members.append({'course_id': course_id, 'group_id': group_id})
+            for course_id in milestone['courses']:
+                self.add_course(course_id)
+                self.milestone_courses.append({'course_id': course_id, 'milestone_id': milestone_id})
+
+    def stages(self):
+        """
+        (name, query, rows) in write order: nodes before the edges that MATCH them.
+        """
+        return [
+            ('courses', COURSE_QUERY, list(self.courses.values())),
+            ('or_groups', OR_GROUP_QUERY, list(self.or_groups.values())),
+            ('milestones', MILESTONE_QUERY, list(self.milestones.values())),
+            ('group_required', GROUP_REQUIRED_QUERY, self.group_required),
+            ('group_members', GROUP_MEMBER_QUERY, self.group_members),
+            ('milestone_required', MILESTONE_REQUIRED_QUERY, self.milestone_required),
+            ('paths', PATH_QUERY, self.paths),
+            ('path_members', PATH_MEMBER_QUERY, self.path_members),
+            ('milestone_courses', MILESTONE_COURSE_QUERY, self.milestone_courses),
+        ]
+
+def build_catalog_graph(catalog_paths=None, requirements=None):
+    catalog_graph = CatalogGraph()
+    for path in catalog_paths if catalog_paths is not None else processed_catalog_paths():
+        catalog_graph.add_department_catalog(read_department_catalog(path))
+    for path in requirements if requirements is not None else requirement_paths():
+        catalog_graph.add_major_requirements(read_major_requirements(path))
+    return catalog_graph
+
+def _write_batches(tx, query, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        tx.run(query, rows=rows[start:start + batch_size]).consume()
+
+def load_catalog_graph(driver, catalog_graph, batch_size=1000, database=None):
+    """
+    Writes catalog_graph with one transaction per stage. Returns per-stage stats
+    (rows, seconds, rows_per_second) plus the new catalog version.
+    """
+    stats = {}
+    with driver.session(database=database) as session:
+        started = time.perf_counter()
+        for constraint in CONSTRAINTS:
+            session.run(constraint).consume()
+        stats['constraints'] = {'rows': len(CONSTRAINTS), 'seconds': time.perf_counter() - started}
+
+        for name, query, rows in catalog_graph.stages():
+            started = time.perf_counter()
+            session.execute_write(_write_batches, query, rows, batch_size)
+            seconds = time.perf_counter() - started
+            stats[name] = {
+                'rows': len(rows),
+                'seconds': round(seconds, 4),
+                'rows_per_second': round(len(rows) / seconds) if seconds > 0 else None,
+            }
+
+        stats['catalog_version'] = session.execute_write(lambda tx: tx.run(VERSION_QUERY).single()['version'])
+    return stats
+
+class DryRunDriver:
+    """
+    Local stand-in for a Neo4j driver: records statements and row counts instead of writing.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.version = 0
+
+    def session(self, database=None):
+        return _DryRunSession(self)
+
+    def close(self):
+        pass
+
+class _DryRunResult:
+    def __init__(self, record=None):
+        self.record = record
+
+    def __iter__(self):
+        return iter([])
+
+    def consume(self):
+        return None
+
+    def single(self):
+        return self.record
+
+class _DryRunSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        self.driver.statements.append((' '.join(query.split()), len(params.get('rows', []))))
+        if 'CatalogVersion' in query:
+            self.driver.version += 1
+            return _DryRunResult({'version': self.driver.version})
+        return _DryRunResult()
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    execute_read = execute_write
+
+def _connect(uri=None, username=None, password=None):
+    from neo4j import GraphDatabase
+    if uri is None:
+        from config import settings
+        uri = settings["NEO4J_URI"]
+        username = username or settings["NEO4J_USERNAME"]
+        password = password or settings["NEO4J_PASSWORD"]
+    return GraphDatabase.driver(uri, auth=(username, password))
+
+def print_stats(stats):
+    for name, stage in stats.items():
+        if isinstance(stage, dict):
+            rate = f", {stage['rows_per_second']} rows/s" if stage.get('rows_per_second') else ''
+            print(f"{name}: {stage['rows']} rows in {stage['seconds']:.3f}s{rate}")
+        else:
+            print(f"{name}: {stage}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the processed course catalog into Neo4j.")
+    parser.add_argument("--catalog", nargs="*", help="department catalog CSVs (default: data/processed/*.csv)")
+    parser.add_argument("--requirements", nargs="*", help="major requirement CSVs (default: data/processed/* requirements.csv)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="write to an in-memory stand-in instead of Neo4j")
+    parser.add_argument("--uri")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    catalog_graph = build_catalog_graph(args.catalog, args.requirements)
+    print(f"Parsed {len(catalog_graph.courses)} courses, {len(catalog_graph.or_groups)} groups and "
+          f"{len(catalog_graph.milestones)} milestones in {time.perf_counter() - started:.3f}s")
+
+    driver = DryRunDriver() if args.dry_run else _connect(args.uri, args.username, args.password)
+    try:
+        stats = load_catalog_graph(driver, catalog_graph, batch_size=args.batch_size)
+    finally:
+        driver.close()
+    print_stats(stats)
+    if args.dry_run:
+        print(f"Dry run: {len(driver.statements)} statements")
@@ -0,0 +1,178 @@
+"""
+Turns the scraped catalogs in data/raw (columns Title, Description) into the processed catalogs in
+data/processed, the step first prototyped in Databse_and_prototyping.ipynb.
+
+Each department is parsed column-wise with pandas string operations and precompiled patterns.
+Prerequisites are kept as a flat table with one row per (course_id, group_index, prereq_id), where the
+courses of one group are alternatives and every group is required. The table is written as Parquet next
+to the CSV ('<Dept> Course Data.prerequisites.parquet', needs pyarrow), and catalog_data.py reads it
+instead of re-parsing the CSV's prerequisite lists. Departments are processed in parallel.
+
+    python catalog_pipeline.py                     # every CSV in data/raw
+    python catalog_pipeline.py --workers 8
+    python catalog_pipeline.py "data/raw/CSE Course Data.csv" --no-parquet
+"""
+import os
+import re
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from catalog_data import PROCESSED_DIRECTORY, prerequisite_table_path, prerequisite_lists
+
+RAW_DIRECTORY = 'data/raw'
+DEPARTMENTS_PATH = 'data/Course_Catalogue.txt'
+
+# Only courses numbered below 200 (undergraduate) are kept
+MAX_COURSE_NUMBER = 200
+_COURSE_NUMBER = re.compile(r'\b(\d{1,3})')
+_UNITS = re.compile(r'\((\d+)\)')
+_PREREQUISITES = re.compile(r'Prerequisite[s]*: (.+?)(?:;|\.|$)')
+_RESTRICTION = re.compile(r'restricted to (.+?)(?:\.|$)', re.IGNORECASE)
+_MAJOR_CODE = re.compile(r'[A-Z]{2}\d{2}')
+
+PROCESSED_COLUMNS = [
+    'Course_Index', 'Course_Title', 'Course_Units', 'Course_Description',
+    'Course_Prerequisites', 'Major_Restriction', 'Course_Tags',
+]
+
+def department_codes(path=DEPARTMENTS_PATH):
+    """
+    Department codes that course ids can start with ('CSE', 'MATH', ...), one per line in path.
+    """
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+def course_id_pattern(departments):
+    """
+    Pattern for course ids of the given departments in prerequisite text: ('MATH', '20C').
+    """
+    return re.compile(rf"({'|'.join(departments)}) (\d+[A-Z]?[A-Z]?)", re.IGNORECASE)
+
+def _lists(series, default_mask):
+    # empty list wherever default_mask is set (or the value is missing)
+    return series.where(~default_mask & series.notna(), pd.Series([[]] * len(series), index=series.index))
+
+def prerequisite_table(course_ids, descriptions, pattern):
+    """
+    Flat prerequisite table: course_id, group_index, prereq_id. The 'Prerequisites: ...' sentence is split
+    into groups at ' and ', and each group holds the course ids it mentions. Groups without a course id
+    ('Prerequisites: none.') are kept as one row with a missing prereq_id, so group positions survive.
+    """
+    text = descriptions.str.extract(_PREREQUISITES, expand=False).dropna().astype(str)
+    # one row per group, indexed by the course's row
+    groups = text.str.split(' and ', regex=False).explode().to_frame('text')
+    groups['group_index'] = groups.groupby(level=0).cumcount()
+    groups['match'] = groups['text'].str.findall(pattern)
+    # one row per course id found, a missing match for groups without one
+    rows = groups.explode('match')
+    prereq_ids = rows['match'].map(' '.join, na_action='ignore')
+    return pd.DataFrame({
+        'course_id': course_ids.loc[rows.index].to_numpy(),
+        'group_index': rows['group_index'].to_numpy(dtype='int16'),
+        'prereq_id': prereq_ids.to_numpy(),
+    }).astype({'course_id': 'string', 'prereq_id': 'string'})
+
+def parse_department(raw, pattern):
+    """
+    Returns (processed catalog DataFrame with the columns of data/processed, prerequisite table).
+    """
+    numbers = pd.to_numeric(raw['Title'].str.extract(_COURSE_NUMBER, expand=False))
+    data = raw[numbers < MAX_COURSE_NUMBER].reset_index(drop=True)
+    titles = data['Title']
+    descriptions = data['Description']
+
+    words = titles.str.split()
+    course_ids = words.str[:2].str.join(' ').str.strip('.')
+    # the title ends with its units, e.g. 'Basic Data Structures and Object-Oriented Design (4)'
+    course_titles = words.str[2:-1].str.join(' ')
+    units = pd.to_numeric(titles.str.extract(_UNITS, expand=False))
+    if units.notna().all():
+        units = units.astype(int)
+
+    has_tags = titles.str.contains('Tags:', regex=False)
+    tags = _lists(titles.str.partition('Tags:')[2].str.strip().str.split(r'\s*,\s*', regex=True), ~has_tags)
+
+    lowered = descriptions.str.lower()
+    restriction = descriptions.str.extract(_RESTRICTION, expand=False)
+    unrestricted = (~lowered.str.contains('restricted to', regex=False)
+                    | lowered.str.contains('all other students will be allowed', regex=False))
+    restrictions = _lists(restriction.fillna('').str.findall(_MAJOR_CODE), unrestricted | restriction.isna())
+
+    table = prerequisite_table(course_ids, descriptions, pattern)
+    by_course = prerequisite_lists(table)
+    processed = pd.DataFrame({
+        'Course_Index': course_ids,
+        'Course_Title': course_titles,
+        'Course_Units': units,
+        'Course_Description': descriptions,
+        'Course_Prerequisites': [by_course.get(course_id, []) for course_id in course_ids],
+        'Major_Restriction': restrictions,
+        'Course_Tags': tags,
+    }, columns=PROCESSED_COLUMNS)
+    return processed, table
+
+def process_department(source_path, target_directory=PROCESSED_DIRECTORY, departments=None, parquet=True):
+    """
+    Parses one raw department CSV and writes the processed CSV (and the prerequisite table) to target_directory.
+    Returns stats for the department.
+    """
+    started = time.perf_counter()
+    pattern = course_id_pattern(departments or department_codes())
+    raw = pd.read_csv(source_path)
+    processed, table = parse_department(raw, pattern)
+
+    os.makedirs(target_directory, exist_ok=True)
+    target_path = os.path.join(target_directory, os.path.basename(source_path))
+    processed.to_csv(target_path, index=False)
+    written_table = None
+    if parquet:
+        try:
+            table.to_parquet(prerequisite_table_path(target_path), index=False)
+            written_table = prerequisite_table_path(target_path)
+        except ImportError as e:
+            print(f"Not writing the prerequisite table for {target_path}: {str(e)}")
+    return {
+        'source': source_path,
+        'target': target_path,
+        'prerequisite_table': written_table,
+        'raw_rows': len(raw),
+        'courses': len(processed),
+        'prerequisite_rows': int(table['prereq_id'].notna().sum()),
+        'seconds': round(time.perf_counter() - started, 4),
+    }
+
+def raw_catalog_paths(directory=RAW_DIRECTORY):
+    return sorted(
+        os.path.join(directory, file_name)
+        for file_name in os.listdir(directory)
+        if file_name.endswith('.csv')
+    )
+
+def process_catalogs(source_paths, target_directory=PROCESSED_DIRECTORY, workers=None, parquet=True):
+    """
+    Processes departments in a process pool (workers=1 runs them in this process). Returns per-department stats.
+    """
+    departments = department_codes()
+    if workers == 1 or len(source_paths) <= 1:
+        return [process_department(path, target_directory, departments, parquet) for path in source_paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_department, path, target_directory, departments, parquet) for path in source_paths]
+        return [future.result() for future in futures]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse the raw catalog scrapes into data/processed.")
+    parser.add_argument("paths", nargs="*", help="raw department CSVs (default: every CSV in --source)")
+    parser.add_argument("--source", default=RAW_DIRECTORY)
+    parser.add_argument("--target", default=PROCESSED_DIRECTORY)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--no-parquet", action="store_true", help="only write the processed CSVs")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = process_catalogs(args.paths or raw_catalog_paths(args.source), args.target, args.workers, not args.no_parquet)
+    for department in stats:
+        print(department)
+    print(f"Processed {len(stats)} departments in {time.perf_counter() - started:.3f}s")
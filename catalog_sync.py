@@ -0,0 +1,133 @@
+"""
+Incremental catalog sync: diffs data/processed/*.csv against the graph and writes only what changed.
+
+Every catalog row is hashed (catalog_data.course_row_hash) and compared with the row_hash stored on
+its Course node by catalog_loader.py. Only changed or new courses are upserted (with their
+prerequisite OrGroups rebuilt), and courses removed from the CSVs are deleted, or demoted to
+placeholders if other courses still reference them.
+
+    python catalog_sync.py                      # sync and print one JSON change event per line
+    python catalog_sync.py --events events.jsonl
+    python catalog_sync.py --dry-run
+"""
+import json
+import time
+import argparse
+
+from catalog_data import processed_catalog_paths, read_department_catalog, course_row_hash
+from catalog_loader import CatalogGraph, DryRunDriver, load_catalog_graph, print_stats, _connect
+
+STORED_HASHES_QUERY = """
+    MATCH (c:Course) WHERE c.row_hash IS NOT NULL
+    RETURN c.course_id as course_id, c.row_hash as row_hash
+"""
+# Prerequisite groups of the given courses are rebuilt from scratch
+DELETE_GROUPS_QUERY = """
+    UNWIND $course_ids AS course_id
+    MATCH (og:OrGroup)-[:REQUIRED]->(c:Course {course_id: course_id})
+    WHERE og.group_id STARTS WITH course_id + '_GROUP_'
+    DETACH DELETE og
+"""
+# Removed courses become placeholders, and are deleted if nothing references them anymore
+DEMOTE_COURSES_QUERY = """
+    UNWIND $course_ids AS course_id
+    MATCH (c:Course {course_id: course_id})
+    SET c.title = '', c.units = 0, c.description = ''
+    REMOVE c.row_hash
+"""
+DELETE_COURSES_QUERY = """
+    UNWIND $course_ids AS course_id
+    MATCH (c:Course {course_id: course_id})
+    WHERE NOT (c)-[:INCLUDED_IN|REQUIRED]->()
+    DETACH DELETE c
+"""
+
+def diff_catalog(courses, stored_hashes):
+    """
+    Compares catalog rows with the row hashes stored in the graph.
+    Returns (added, updated, deleted): lists of course ids.
+    """
+    current = {course['course_id']: course_row_hash(course) for course in courses}
+    added = sorted(course_id for course_id in current if course_id not in stored_hashes)
+    updated = sorted(
+        course_id for course_id, row_hash in current.items()
+        if course_id in stored_hashes and stored_hashes[course_id] != row_hash
+    )
+    deleted = sorted(course_id for course_id in stored_hashes if course_id not in current)
+    return added, updated, deleted
+
+def _run(tx, query, **params):
+    tx.run(query, **params).consume()
+
+def sync_catalog(driver, catalog_paths=None, batch_size=1000, on_event=None, database=None):
+    """
+    Writes the minimal upserts and deletes to bring the graph in line with the catalog CSVs.
+    Returns (events, stats). Each event is {'event': 'course_added'|'course_updated'|'course_deleted',
+    'course_id', 'version'}; on_event, if given, is called with each one.
+    """
+    started = time.perf_counter()
+    courses = []
+    for path in catalog_paths if catalog_paths is not None else processed_catalog_paths():
+        courses.extend(read_department_catalog(path))
+
+    with driver.session(database=database) as session:
+        stored_hashes = {
+            record['course_id']: record['row_hash']
+            for record in session.execute_read(lambda tx: list(tx.run(STORED_HASHES_QUERY)))
+        }
+    added, updated, deleted = diff_catalog(courses, stored_hashes)
+    stats = {'diff': {'rows': len(courses), 'seconds': round(time.perf_counter() - started, 4)}}
+
+    if not (added or updated or deleted):
+        return [], stats
+
+    with driver.session(database=database) as session:
+        started = time.perf_counter()
+        session.execute_write(_run, DELETE_GROUPS_QUERY, course_ids=updated + deleted)
+        session.execute_write(_run, DEMOTE_COURSES_QUERY, course_ids=deleted)
+        session.execute_write(_run, DELETE_COURSES_QUERY, course_ids=deleted)
+        stats['deletes'] = {'rows': len(updated) + len(deleted), 'seconds': round(time.perf_counter() - started, 4)}
+
+    changed = set(added + updated)
+    catalog_graph = CatalogGraph()
+    catalog_graph.add_department_catalog([course for course in courses if course['course_id'] in changed])
+    stats.update(load_catalog_graph(driver, catalog_graph, batch_size=batch_size, database=database))
+
+    version = stats['catalog_version']
+    events = (
+        [{'event': 'course_added', 'course_id': course_id, 'version': version} for course_id in added]
+        + [{'event': 'course_updated', 'course_id': course_id, 'version': version} for course_id in updated]
+        + [{'event': 'course_deleted', 'course_id': course_id, 'version': version} for course_id in deleted]
+    )
+    if on_event is not None:
+        for event in events:
+            on_event(event)
+    return events, stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync changed catalog rows into Neo4j.")
+    parser.add_argument("--catalog", nargs="*", help="department catalog CSVs (default: data/processed/*.csv)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--events", help="append change events to this JSON lines file instead of stdout")
+    parser.add_argument("--dry-run", action="store_true", help="diff and write against an in-memory stand-in")
+    parser.add_argument("--uri")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    driver = DryRunDriver() if args.dry_run else _connect(args.uri, args.username, args.password)
+    started = time.perf_counter()
+    try:
+        events, stats = sync_catalog(driver, args.catalog, batch_size=args.batch_size)
+    finally:
+        driver.close()
+
+    if args.events:
+        with open(args.events, 'a') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+    else:
+        for event in events:
+            print(json.dumps(event))
+    print_stats(stats)
+    print(f"Synced {len(events)} changed courses in {time.perf_counter() - started:.3f}s")
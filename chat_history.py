@@ -0,0 +1,205 @@
+import time
+import queue
+import atexit
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import SystemMessage, get_buffer_string
+
+def approximate_tokens(messages):
+    # ~4 characters per token for English text
+    return sum(len(message.content) for message in messages) // 4
+
+class WindowedChatHistory(BaseChatMessageHistory):
+    """
+    History of one session as the agent sees it: a rolling summary of older turns plus the last
+    `window` to 2 * `window` - 1 messages.
+    Reads are served from memory; writes are queued for the store's writer thread.
+    """
+
+    def __init__(self, store, session_id):
+        self.store = store
+        self.session_id = session_id
+        self.summary = ''
+        self.recent = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # only the last window of messages (and the saved summary) is read from the backend, once per session
+        if self.recent is None:
+            self.recent = list(self.store.backend(self.session_id).messages)[-self.store.window:]
+            self.summary = self.store.load_summary(self.session_id)
+
+    @property
+    def messages(self):
+        with self._lock:
+            self._load()
+            messages = list(self.recent)
+            if self.summary:
+                messages.insert(0, SystemMessage(content=f"Summary of the earlier conversation: {self.summary}"))
+        self.store.record_turn(messages)
+        return messages
+
+    def add_message(self, message):
+        with self._lock:
+            self._load()
+            self.recent.append(message)
+            # fold the oldest `window` messages at once, so summarizing costs one LLM call per window
+            overflow = []
+            if len(self.recent) >= 2 * self.store.window:
+                overflow = self.recent[:self.store.window]
+                self.recent = self.recent[self.store.window:]
+        self.store.enqueue(self, message, overflow)
+
+    def clear(self):
+        with self._lock:
+            self.recent = []
+            self.summary = ''
+        self.store.backend(self.session_id).clear()
+
+class ChatHistoryStore:
+    """
+    Bounded, write-behind chat histories.
+    backend_factory(session_id) returns the persistent history (e.g. Neo4jChatMessageHistory); each
+    message is written to it by a background thread so the UI thread never waits on Neo4j.
+    Messages that fall out of the window are folded into a rolling summary by summarize(summary, messages)
+    on a summarizer thread of its own, so a slow LLM call does not hold up the message writes.
+    Without summarize, old messages are simply dropped from the prompt.
+    Summaries are kept with save_summary(session_id, summary) and read back with load_summary(session_id)
+    when an evicted session returns; without them, an evicted session's summary is lost.
+    At most max_sessions windows and backends are kept in memory, the least recently used are evicted.
+    """
+
+    def __init__(self, backend_factory, window=6, summarize=None, max_sessions=1000, token_counter=approximate_tokens,
+                 load_summary=None, save_summary=None):
+        self.backend_factory = backend_factory
+        self.window = window
+        self.summarize = summarize
+        self.max_sessions = max_sessions
+        self.token_counter = token_counter
+        self._load_summary = load_summary
+        self._save_summary = save_summary
+        self.sessions = OrderedDict()
+        self.backends = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        # one thread, so the summaries of a session are folded in order
+        self._summarizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-history-summarizer")
+        self._summaries = set()
+        self._metrics = {
+            'turns': 0, 'messages': 0, 'max_messages': 0, 'tokens': 0, 'max_tokens': 0,
+            'writes': 0, 'write_seconds': 0.0, 'write_errors': 0, 'summaries': 0, 'summary_errors': 0,
+        }
+        self._writer = threading.Thread(target=self._write_loop, name="chat-history-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def get(self, session_id):
+        with self._lock:
+            if session_id not in self.sessions:
+                self.sessions[session_id] = WindowedChatHistory(self, session_id)
+                # forget idle sessions' windows; their messages are already persisted
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            self.sessions.move_to_end(session_id)
+            return self.sessions[session_id]
+
+    def backend(self, session_id):
+        # backends must not close a shared driver when evicted (see agent.py)
+        with self._lock:
+            if session_id not in self.backends:
+                self.backends[session_id] = self.backend_factory(session_id)
+                while len(self.backends) > self.max_sessions:
+                    self.backends.popitem(last=False)
+            self.backends.move_to_end(session_id)
+            return self.backends[session_id]
+
+    def load_summary(self, session_id):
+        if self._load_summary is None:
+            return ''
+        try:
+            return self._load_summary(session_id) or ''
+        except Exception as e:
+            print(f"Failed to load the chat summary of session {session_id}: {str(e)}")
+            return ''
+
+    def enqueue(self, history, message, overflow):
+        self._queue.put((history, message))
+        if overflow and self.summarize is not None:
+            future = self._summarizer.submit(self._fold, history, overflow)
+            with self._lock:
+                self._summaries.add(future)
+            future.add_done_callback(self._summary_done)
+
+    def _summary_done(self, future):
+        with self._lock:
+            self._summaries.discard(future)
+
+    def _fold(self, history, overflow):
+        try:
+            summary = self.summarize(history.summary, get_buffer_string(overflow))
+            with history._lock:
+                history.summary = summary
+            self._metrics['summaries'] += 1
+            if self._save_summary is not None:
+                self._save_summary(history.session_id, summary)
+        except Exception as e:
+            self._metrics['summary_errors'] += 1
+            print(f"Failed to summarize the chat history of session {history.session_id}: {str(e)}")
+
+    def _write_loop(self):
+        while True:
+            history, message = self._queue.get()
+            try:
+                started = time.perf_counter()
+                self.backend(history.session_id).add_message(message)
+                self._metrics['writes'] += 1
+                self._metrics['write_seconds'] += time.perf_counter() - started
+            except Exception as e:
+                self._metrics['write_errors'] += 1
+                print(f"Failed to persist chat message for session {history.session_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        Blocks until every queued message is written and every pending summary is saved.
+        """
+        self._queue.join()
+        with self._lock:
+            summaries = list(self._summaries)
+        for future in summaries:
+            future.result()
+
+    def record_turn(self, messages):
+        tokens = self.token_counter(messages)
+        metrics = self._metrics
+        metrics['turns'] += 1
+        metrics['messages'] += len(messages)
+        metrics['tokens'] += tokens
+        metrics['max_messages'] = max(metrics['max_messages'], len(messages))
+        metrics['max_tokens'] = max(metrics['max_tokens'], tokens)
+
+    def metrics(self):
+        """
+        History size loaded per turn (messages and approximate tokens) and write-behind health.
+        """
+        metrics = dict(self._metrics)
+        turns = metrics['turns']
+        return {
+            'turns': turns,
+            'avg_messages_per_turn': round(metrics['messages'] / turns, 2) if turns else 0,
+            'max_messages_per_turn': metrics['max_messages'],
+            'avg_tokens_per_turn': round(metrics['tokens'] / turns, 1) if turns else 0,
+            'max_tokens_per_turn': metrics['max_tokens'],
+            'pending_writes': self._queue.qsize(),
+            'writes': metrics['writes'],
+            'avg_write_seconds': round(metrics['write_seconds'] / metrics['writes'], 4) if metrics['writes'] else 0,
+            'write_errors': metrics['write_errors'],
+            'summaries': metrics['summaries'],
+            'pending_summaries': len(self._summaries),
+            'summary_errors': metrics['summary_errors'],
+            'sessions': len(self.sessions),
+        }
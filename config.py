@@ -0,0 +1,51 @@
+"""
+Settings (Neo4j and OpenAI credentials, limits, API options), readable with or without Streamlit.
+Replaces st.secrets, so the agent can also run in the headless API (api.py) and batch scripts.
+
+A setting is looked up in:
+    1. the environment variable of the same name, e.g. NEO4J_URI, OPENAI_API_KEY
+    2. the TOML file named by ADVISOR_CONFIG, by default .streamlit/secrets.toml (the file Streamlit reads)
+Values from the environment are strings; callers convert them as they already did for st.secrets.
+"""
+import os
+import tomllib
+import threading
+
+DEFAULT_CONFIG_PATH = ".streamlit/secrets.toml"
+
+class Settings:
+    """
+    Read-only mapping with the interface of st.secrets used in this repo: settings["NAME"] and
+    settings.get("NAME", default). The file is read once, on first use.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("ADVISOR_CONFIG", DEFAULT_CONFIG_PATH)
+        self._values = None
+        self._lock = threading.Lock()
+
+    def _file_values(self):
+        with self._lock:
+            if self._values is None:
+                try:
+                    with open(self.path, 'rb') as f:
+                        self._values = tomllib.load(f)
+                except FileNotFoundError:
+                    self._values = {}
+            return self._values
+
+    def get(self, name, default=None):
+        if name in os.environ:
+            return os.environ[name]
+        return self._file_values().get(name, default)
+
+    def __getitem__(self, name):
+        value = self.get(name)
+        if value is None:
+            raise KeyError(f"{name} is not set: set the environment variable or add it to {self.path}")
+        return value
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+settings = Settings()
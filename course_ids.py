@@ -0,0 +1,35 @@
+import re
+
+# Pattern: Letters + space + numbers (optionally followed by a letter), e.g. "MATH 18", "MATH 20C", "MATH 31CH"
+COURSE_ID_PATTERN = r'^[A-Z]+\s\d+[A-Z]*$'
+
+def clean_course_id(course_id):
+    # Double Checks for course_id format
+    course_id = course_id.strip().replace('`', '').split('\n')[0]
+    if not re.match(COURSE_ID_PATTERN, course_id):
+        raise ValueError('Course ID must be in format like "MATH 18" or "MATH 20C"')
+    return course_id
+
+def _load_departments(path='data/Course_Catalogue.txt'):
+    # Same department list used to scrape course indexes out of the catalog
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+DEPARTMENTS = _load_departments()
+
+# Course ids inside free text, e.g. "what do I need before math 20c?"
+_course_id_in_text = re.compile(
+    rf"\b({'|'.join(sorted(DEPARTMENTS, key=len, reverse=True))})\s*(\d+[A-Z]{{0,2}})\b",
+    re.IGNORECASE,
+)
+
+def find_course_ids(text):
+    """
+    Returns the course ids mentioned in text, normalized to 'MATH 20C' form, in order of appearance.
+    """
+    course_ids = []
+    for dept, number in _course_id_in_text.findall(text):
+        course_id = f"{dept.upper()} {number.upper()}"
+        if course_id not in course_ids:
+            course_ids.append(course_id)
+    return course_ids
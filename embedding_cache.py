@@ -0,0 +1,129 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = ".cache/embeddings.sqlite"
+
+class CachedEmbeddings(Embeddings):
+    """
+    Content-addressed cache in front of an embedding model, stored in a local SQLite file.
+    Keys are sha256(model + text), so the same text is embedded once no matter which
+    retriever asks for it. Misses are deduplicated and sent to the model in batches;
+    least recently used entries are evicted past max_entries.
+    """
+
+    def __init__(self, underlying, path=DEFAULT_CACHE_PATH, max_entries=100000, batch_size=256):
+        self.underlying = underlying
+        # wrappers (llm_governor.GovernedEmbeddings) name the model they wrap, so keys survive wrapping
+        self.namespace = getattr(underlying, 'cache_namespace', None) or \
+            f"{type(underlying).__name__}:{getattr(underlying, 'model', '')}"
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._connection.commit()
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode('utf-8')).hexdigest()
+
+    def _lookup(self, keys, duplicates=0):
+        # keys are distinct; the counters are updated here, under the lock stats() reads them with
+        found = {}
+        now = time.time()
+        with self._lock:
+            # stay below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array('f', blob).tolist()
+                self._connection.execute(
+                    f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})", [now, *batch]
+                )
+            self._connection.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            self.deduplicated += duplicates
+        return found
+
+    def _store(self, vectors):
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, array('f', vector).tobytes(), now) for key, vector in vectors.items()],
+            )
+            count = self._connection.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._connection.commit()
+
+    def embed_documents(self, texts):
+        keys = [self._key(text) for text in texts]
+        unique = dict(zip(keys, texts))
+
+        found = self._lookup(list(unique), duplicates=len(keys) - len(unique))
+        missing = [key for key in unique if key not in found]
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            vectors = self.underlying.embed_documents([unique[key] for key in batch])
+            # return what a later hit would return (float32), so results do not depend on cache state
+            vectors = {key: array('f', vector).tolist() for key, vector in zip(batch, vectors)}
+            self._store(vectors)
+            found.update(vectors)
+
+        return [found[key] for key in keys]
+
+    def embed_query(self, text):
+        key = self._key(text)
+        found = self._lookup([key])
+        if key in found:
+            return found[key]
+        vector = array('f', self.underlying.embed_query(text)).tolist()
+        self._store({key: vector})
+        return vector
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+            hits, misses, deduplicated = self.hits, self.misses, self.deduplicated
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'deduplicated': deduplicated,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'entries': entries,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM embeddings")
+            self._connection.commit()
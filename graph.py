@@ -1,9 +1,129 @@
-import streamlit as st
+import sys
+import time
+import random
+import asyncio
+import threading
+
 from langchain_community.graphs import Neo4jGraph
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+
+from query_metrics import query_metrics
+from config import settings
+
+# Driver settings, overridable in the settings (config.py)
+MAX_POOL_SIZE = int(settings.get("NEO4J_MAX_POOL_SIZE", 50))
+# seconds to wait for a free connection before failing the query
+ACQUISITION_TIMEOUT = float(settings.get("NEO4J_ACQUISITION_TIMEOUT", 10.0))
+# retries of statements that failed with a transient error, with exponential backoff
+MAX_RETRIES = int(settings.get("NEO4J_MAX_RETRIES", 2))
+RETRY_BACKOFF = float(settings.get("NEO4J_RETRY_BACKOFF", 0.2))
+# server-side limit per statement in seconds, unlimited by default
+QUERY_TIMEOUT = float(settings["NEO4J_QUERY_TIMEOUT"]) if "NEO4J_QUERY_TIMEOUT" in settings else None
+
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+
+DRIVER_CONFIG = {
+    "max_connection_pool_size": MAX_POOL_SIZE,
+    "connection_acquisition_timeout": ACQUISITION_TIMEOUT,
+}
+
+def _retry_delay(attempt):
+    return RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+def _caller_name():
+    # name of the function that called query(), e.g. 'get_prerequisites'
+    code = sys._getframe(2).f_code
+    return getattr(code, 'co_qualname', code.co_name)
+
+class InstrumentedNeo4jGraph(Neo4jGraph):
+    """
+    Neo4jGraph that retries transient failures and records the latency of every statement in
+    query_metrics under a query name. Pass name= to tell apart several queries of one function
+    (e.g. 'get_major_requirements.direct_query'); by default the calling function's name is used.
+    """
+
+    def query(self, query, params={}, name=None):
+        name = name or _caller_name()
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                result = super().query(query, params)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= MAX_RETRIES:
+                    query_metrics.observe(name, time.perf_counter() - started, error=True)
+                    raise
+                query_metrics.record_retry(name)
+                print(f"Retrying {name} after {type(e).__name__}: {str(e)}")
+                time.sleep(_retry_delay(attempt))
+                attempt += 1
+                continue
+            except Exception:
+                query_metrics.observe(name, time.perf_counter() - started, error=True)
+                raise
+            query_metrics.observe(name, time.perf_counter() - started)
+            return result
 
 # Connect to Neo4j
-graph = Neo4jGraph(
-    url=st.secrets["NEO4J_URI"],
-    username=st.secrets["NEO4J_USERNAME"],
-    password=st.secrets["NEO4J_PASSWORD"],
-)
\ No newline at end of file
+graph = InstrumentedNeo4jGraph(
+    url=settings["NEO4J_URI"],
+    username=settings["NEO4J_USERNAME"],
+    password=settings["NEO4J_PASSWORD"],
+    timeout=QUERY_TIMEOUT,
+    driver_config=DRIVER_CONFIG,
+    # only the Cypher QA chain needs the schema; tools/cypher.py loads it from a cached copy
+    refresh_schema=False,
+)
+
+# Async driver for fanning out independent queries (see tools/db_retriever.py).
+# It lives on one background event loop, since its connections belong to the loop that opened them.
+_async_lock = threading.Lock()
+_async_loop = None
+async_driver = None
+
+def _event_loop():
+    global _async_loop, async_driver
+    with _async_lock:
+        if _async_loop is None:
+            _async_loop = asyncio.new_event_loop()
+            threading.Thread(target=_async_loop.run_forever, name="neo4j-async", daemon=True).start()
+            async_driver = AsyncGraphDatabase.driver(
+                settings["NEO4J_URI"],
+                auth=(settings["NEO4J_USERNAME"], settings["NEO4J_PASSWORD"]),
+                **DRIVER_CONFIG,
+            )
+    return _async_loop
+
+def run_async(coroutine):
+    """
+    Runs coroutine on the async driver's event loop and waits for its result.
+    Safe to call from any thread, including ones without an event loop.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, _event_loop()).result()
+
+async def aquery(query, params=None, name=None):
+    """
+    Async counterpart of graph.query, with the same retries and metrics:
+    returns the records as a list of dicts. Must run on the loop used by run_async.
+    """
+    name = name or _caller_name()
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            records, _, _ = await async_driver.execute_query(query, parameters_=params or {}, routing_="r")
+        except RETRYABLE_ERRORS as e:
+            if attempt >= MAX_RETRIES:
+                query_metrics.observe(name, time.perf_counter() - started, error=True)
+                raise
+            query_metrics.record_retry(name)
+            print(f"Retrying {name} after {type(e).__name__}: {str(e)}")
+            await asyncio.sleep(_retry_delay(attempt))
+            attempt += 1
+            continue
+        except Exception:
+            query_metrics.observe(name, time.perf_counter() - started, error=True)
+            raise
+        query_metrics.observe(name, time.perf_counter() - started)
+        return [record.data() for record in records]
@@ -1,15 +1,60 @@
-import streamlit as st
+from config import settings
 from langchain_openai import ChatOpenAI
 from langchain_openai import OpenAIEmbeddings
+from embedding_cache import CachedEmbeddings, DEFAULT_CACHE_PATH
+from llm_governor import LLMGovernor, GovernedChatModel, GovernedEmbeddings
+
+# Limits shared by every session (see llm_governor.py), overridable in the settings (config.py).
+# Set them a little below the account's OpenAI limits.
+MAX_RETRIES = int(settings.get("OPENAI_MAX_RETRIES", 3))
+RETRY_BACKOFF = float(settings.get("OPENAI_RETRY_BACKOFF", 0.5))
+# e.g. a local fake server for load tests (benchmarks/llm_governor.py)
+BASE_URL = settings.get("OPENAI_BASE_URL")
+
+llm_governor = LLMGovernor(
+    requests_per_minute=int(settings.get("OPENAI_REQUESTS_PER_MINUTE", 500)),
+    tokens_per_minute=int(settings.get("OPENAI_TOKENS_PER_MINUTE", 200000)),
+    max_concurrency=int(settings.get("OPENAI_MAX_CONCURRENCY", 8)),
+    max_retries=MAX_RETRIES,
+    backoff=RETRY_BACKOFF,
+)
+embedding_governor = LLMGovernor(
+    requests_per_minute=int(settings.get("EMBEDDING_REQUESTS_PER_MINUTE", 3000)),
+    tokens_per_minute=int(settings.get("EMBEDDING_TOKENS_PER_MINUTE", 1000000)),
+    max_concurrency=int(settings.get("EMBEDDING_MAX_CONCURRENCY", 4)),
+    max_retries=MAX_RETRIES,
+    backoff=RETRY_BACKOFF,
+)
 
 # Create the LLM
-llm = ChatOpenAI(
-    openai_api_key=st.secrets["OPENAI_API_KEY"],
-    model=st.secrets["OPENAI_MODEL"],
+# The client does not retry by itself; the governor does
+llm = GovernedChatModel(
+    underlying=ChatOpenAI(
+        openai_api_key=settings["OPENAI_API_KEY"],
+        model=settings["OPENAI_MODEL"],
+        base_url=BASE_URL,
+        max_retries=0,
+    ),
+    governor=llm_governor,
 )
 
 # Create the Embedding model
+# Shared by every retriever; repeated texts are served from the local embedding cache
+embeddings = CachedEmbeddings(
+    GovernedEmbeddings(
+        OpenAIEmbeddings(
+            model="text-embedding-ada-002",
+            openai_api_key=settings["OPENAI_API_KEY"],
+            base_url=BASE_URL,
+            max_retries=0,
+        ),
+        embedding_governor,
+    ),
+    path=settings.get("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH),
+)
 
-embeddings = OpenAIEmbeddings(
-    openai_api_key=st.secrets["OPENAI_API_KEY"]
-)
\ No newline at end of file
+def governor_stats():
+    """
+    Queue wait, coalescing, retry and error counts of the LLM and embedding governors.
+    """
+    return {'llm': llm_governor.snapshot(), 'embeddings': embedding_governor.snapshot()}
@@ -0,0 +1,352 @@
+"""
+Client-side governor for the OpenAI chat and embedding clients shared by every Streamlit session.
+
+Every call passes through, in order:
+    singleflight:   an identical request already in flight is not sent again; callers wait for its result
+    token buckets:  requests per minute and tokens per minute (prompt estimate + completion allowance,
+                    settled against the usage the provider reports)
+    concurrency:    at most max_concurrency requests in flight
+    retries:        rate limits (429), timeouts, connection and 5xx errors are retried with jittered
+                    exponential backoff, or after the Retry-After the provider asks for
+Streamed calls (stream()) are limited and retried the same way, up to their first chunk, but not coalesced.
+Queue wait, coalescing, retry and error counts are kept in snapshot().
+
+GovernedChatModel and GovernedEmbeddings put a governor in front of a LangChain chat model or
+embedding model (see llm.py); benchmarks/llm_governor.py runs them against a local fake server.
+"""
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any
+
+import openai
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import messages_to_dict
+
+from chat_history import approximate_tokens
+from query_metrics import QUANTILES, _percentile
+
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504)
+
+def is_retryable(error):
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return getattr(error, 'status_code', None) in RETRYABLE_STATUS
+
+def _retry_after(error):
+    # seconds the provider asked us to wait, if it said
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """
+    Refills at per_minute / 60 per second up to capacity (one second's worth by default, since
+    providers enforce per-minute limits over shorter periods too).
+    reserve() takes the amount right away, going into debt if needed, and returns how long the
+    caller must wait for the debt to be paid off, so waiting callers are served in order.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or max(1.0, self.rate)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        with self._lock:
+            self._refill()
+            # a request larger than the bucket is charged in full too; its debt is paid off at the
+            # refill rate, so the wait is finite and the per-minute limit still holds
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount):
+        # charge (or refund) the difference between an estimate and the actual amount
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+class LLMGovernor:
+    """
+    Rate limits, concurrency limit, request coalescing and retries for one provider endpoint.
+    requests_per_minute / tokens_per_minute of None disable that bucket.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_concurrency=8,
+                 max_retries=3, backoff=0.5, max_backoff=30.0, window=2048):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queue_waits = deque(maxlen=window)
+
+    def _retry_delay(self, attempt, error):
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt)) * random.uniform(0.5, 1.5)
+        return max(delay, _retry_after(error) or 0.0)
+
+    @contextmanager
+    def admit(self, tokens):
+        """
+        Waits for the rate limits and a concurrency slot, then holds the slot for the with block.
+        """
+        started = time.monotonic()
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.token_bucket is not None:
+            wait = max(wait, self.token_bucket.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+        self._slots.acquire()
+        with self._lock:
+            self.queue_waits.append(time.monotonic() - started)
+            self.sent += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def settle(self, estimated, actual):
+        """
+        Corrects the token bucket once the provider reported the tokens a request really used.
+        """
+        if self.token_bucket is not None and actual:
+            self.token_bucket.adjust(actual - estimated)
+
+    def _wait_to_retry(self, attempt, error):
+        # raises error unless it is retryable and retries are left, otherwise sleeps before the retry
+        if getattr(error, 'status_code', None) == 429:
+            with self._lock:
+                self.rate_limited += 1
+        if not is_retryable(error) or attempt >= self.max_retries:
+            with self._lock:
+                self.errors += 1
+            raise error
+        delay = self._retry_delay(attempt, error)
+        with self._lock:
+            self.retries += 1
+        print(f"Retrying LLM request in {delay:.2f}s after {type(error).__name__}: {str(error)[:200]}")
+        time.sleep(delay)
+
+    def _call_with_retries(self, tokens, call):
+        attempt = 0
+        while True:
+            error = None
+            with self.admit(tokens):
+                try:
+                    return call()
+                except Exception as e:
+                    error = e
+            self._wait_to_retry(attempt, error)
+            attempt += 1
+
+    def stream(self, tokens, start):
+        """
+        Yields the chunks of start() (a new generator per attempt) under the limits above, holding
+        the slot until the last chunk. Retried like run() until the first chunk arrives; an error after
+        that is raised, since the caller already has part of the answer. Streams are not coalesced.
+        """
+        with self._lock:
+            self.calls += 1
+        attempt = 0
+        while True:
+            error = None
+            with self.admit(tokens):
+                chunks = start()
+                try:
+                    first = next(chunks)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    error = e
+                if error is None:
+                    yield first
+                    try:
+                        yield from chunks
+                    except Exception:
+                        with self._lock:
+                            self.errors += 1
+                        raise
+                    return
+            self._wait_to_retry(attempt, error)
+            attempt += 1
+
+    def run(self, key, tokens, call):
+        """
+        Returns call() for request key, made under the limits above. While a call with the same key
+        is in flight, later callers get its result (or exception) instead of sending their own.
+        """
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return flight.result()
+
+        try:
+            result = self._call_with_retries(tokens, call)
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self.queue_waits)
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'sent': self.sent,
+                'retries': self.retries,
+                'rate_limited': self.rate_limited,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'max_concurrency': self.max_concurrency,
+                **{f'queue_wait_p{int(q * 100)}_ms': round(_percentile(waits, q) * 1000, 3) for q in QUANTILES},
+                'queue_wait_max_ms': round(waits[-1] * 1000, 3) if waits else 0.0,
+            }
+
+    def to_prometheus(self, prefix='llm'):
+        """
+        Prometheus text exposition format.
+        """
+        with self._lock:
+            counters = (
+                ('calls', self.calls, 'Requests made through the governor.'),
+                ('coalesced', self.coalesced, 'Requests answered by an identical request already in flight.'),
+                ('sent', self.sent, 'Requests sent to the provider, retries included.'),
+                ('retries', self.retries, 'Requests retried after a retryable error.'),
+                ('rate_limited', self.rate_limited, 'Requests the provider answered with 429.'),
+                ('errors', self.errors, 'Requests that failed after retries.'),
+            )
+            in_flight = self.in_flight
+            waits = sorted(self.queue_waits)
+
+        lines = []
+        for name, value, description in counters:
+            lines += [
+                f"# HELP {prefix}_{name}_total {description}",
+                f"# TYPE {prefix}_{name}_total counter",
+                f"{prefix}_{name}_total {value}",
+            ]
+        lines += [
+            f"# HELP {prefix}_in_flight Requests currently sent to the provider.",
+            f"# TYPE {prefix}_in_flight gauge",
+            f"{prefix}_in_flight {in_flight}",
+            f"# HELP {prefix}_queue_wait_seconds Time spent waiting for rate limits and a slot, over recent requests.",
+            f"# TYPE {prefix}_queue_wait_seconds gauge",
+        ]
+        for q in QUANTILES:
+            lines.append(f'{prefix}_queue_wait_seconds{{quantile="{q}"}} {_percentile(waits, q)}')
+        return '\n'.join(lines) + '\n'
+
+def request_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+class GovernedChatModel(BaseChatModel):
+    """
+    Chat model that sends every generation of `underlying` through `governor`.
+    Give the underlying model max_retries=0, so retries are left to the governor.
+    A coalesced call returns the leader's result; only the leader's callbacks see streamed tokens.
+    """
+    underlying: Any
+    governor: Any
+    # completion tokens reserved per call, before the provider reports the real usage
+    completion_tokens: int = 256
+
+    @property
+    def _llm_type(self):
+        return f"governed-{self.underlying._llm_type}"
+
+    def _estimate(self, messages):
+        return approximate_tokens(messages) + self.completion_tokens
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = request_key(self.underlying._llm_type, getattr(self.underlying, 'model_name', ''),
+                          messages_to_dict(messages), stop, kwargs)
+        estimate = self._estimate(messages)
+
+        def call():
+            result = self.underlying._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            usage = (result.llm_output or {}).get('token_usage') or {}
+            self.governor.settle(estimate, usage.get('total_tokens'))
+            return result
+        return self.governor.run(key, estimate, call)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # the ReAct agent streams every step, so streams get the same limits and retries (not coalescing)
+        estimate = self._estimate(messages)
+        prompt_tokens = estimate - self.completion_tokens
+        text, usage = '', None
+        chunks = self.governor.stream(estimate, lambda: self.underlying._stream(
+            messages, stop=stop, run_manager=run_manager, **kwargs))
+        for chunk in chunks:
+            text += chunk.text
+            usage = getattr(chunk.message, 'usage_metadata', None) or usage
+            yield chunk
+        # streamed responses carry no usage here; count ~4 characters per completion token
+        actual = usage['total_tokens'] if usage else prompt_tokens + len(text) // 4
+        self.governor.settle(estimate, actual)
+
+class GovernedEmbeddings(Embeddings):
+    """
+    Embedding model that sends every request of `underlying` through `governor`.
+    cache_namespace keeps the keys of CachedEmbeddings the same as for the bare model.
+    """
+
+    def __init__(self, underlying, governor):
+        self.underlying = underlying
+        self.governor = governor
+        self.model = getattr(underlying, 'model', '')
+        self.cache_namespace = f"{type(underlying).__name__}:{self.model}"
+
+    def embed_documents(self, texts):
+        tokens = sum(len(text) for text in texts) // 4
+        return self.governor.run(request_key(self.cache_namespace, 'documents', texts), tokens,
+                                 lambda: self.underlying.embed_documents(texts))
+
+    def embed_query(self, text):
+        return self.governor.run(request_key(self.cache_namespace, 'query', text), len(text) // 4,
+                                 lambda: self.underlying.embed_query(text))
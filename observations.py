@@ -0,0 +1,260 @@
+"""
+Compact serialization of tool outputs (observations) before they enter the ReAct scratchpad.
+
+LangChain str()s whatever a tool returns, and every later agent step re-sends the scratchpad, so
+nested requirement dicts and whole retrieved documents are paid for again on each step. Here:
+    major requirement documents / courses by milestone:  one line per requirement in AND/OR notation,
+                                                         repeated course lists written once
+    PDF and Cypher QA results:   the answer text, source documents reduced to citations
+    lists of records:            a header line and one ' | ' separated line per record
+    other dicts and lists:       compact JSON
+Observations over max_tokens (~4 characters per token) are cut at a line, and end with a handle
+('obs-3:2') that the "Expand tool output" tool turns into the next part.
+Raw and observed token counts are kept per tool (report()).
+"""
+import os
+import re
+import json
+import threading
+from collections import OrderedDict
+
+MAX_OBSERVATION_TOKENS = 800
+# Full observations kept for drill-down, oldest dropped first
+MAX_STORED_OBSERVATIONS = 200
+
+_HANDLE = re.compile(r"obs-(\d+)(?::(\d+))?")
+
+def text_tokens(text):
+    # ~4 characters per token, as in chat_history.approximate_tokens
+    return len(text) // 4
+
+def _clean(text):
+    return ' '.join(str(text or '').split())
+
+def _options(options):
+    """
+    Course ids and sequence paths to select from: "MATH 20A, MATH 20B OR (MATH 31AH AND MATH 31BH)".
+    """
+    courses, paths = [], []
+    for option in options:
+        if isinstance(option, (list, tuple)):
+            path = f"({' AND '.join(option)})" if len(option) > 1 else option[0]
+            if path not in paths:
+                paths.append(path)
+        elif option not in courses:
+            courses.append(option)
+    parts = [', '.join(courses)] if courses else []
+    return ' OR '.join(parts + paths)
+
+def format_major_requirements(document):
+    lines = [f"{document['major ID']} {_clean(document['title'])}: {_clean(document['description'])}",
+             "Each requirement: name (what satisfies it): courses to select from"]
+    seen = {}
+    for division in document['curriculum']:
+        lines.append(f"[{division['division']}] {_clean(division['description'])}")
+        for study in division['requirements']:
+            options = _options(study['select from'])
+            name = _clean(study['study'])
+            # the same course list under several requirements is written once
+            if options in seen:
+                options = f"same courses as {seen[options]}"
+            else:
+                seen[options] = name
+            description = _clean(study['description'])
+            detail = f" - {description}" if description and description != name else ''
+            lines.append(f"- {name} ({study['needed to satisfy']}): {options}{detail}")
+    return '\n'.join(lines)
+
+def format_courses_by_milestone(milestones):
+    lines = []
+    seen = {}
+    for title, options in milestones.items():
+        options = _options(options)
+        if options in seen:
+            options = f"same courses as {seen[options]}"
+        else:
+            seen[options] = title
+        lines.append(f"{title}: {options}")
+    return '\n'.join(lines)
+
+def _citation(document):
+    metadata = document.metadata
+    source = os.path.basename(metadata.get('source', '')) or 'catalog'
+    page = f" p. {metadata['page'] + 1}" if isinstance(metadata.get('page'), int) else ''
+    course = f"{metadata['course_id']}, " if metadata.get('course_id') else ''
+    return f"{course}{source}{page}"
+
+def format_qa_result(result):
+    # RetrievalQA / GraphCypherQAChain output: keep the answer, cite the sources
+    lines = [str(result['result']).strip()]
+    citations = list(dict.fromkeys(_citation(document) for document in result.get('source_documents') or []))
+    if citations:
+        lines.append(f"Sources: {'; '.join(citations)}")
+    return '\n'.join(lines)
+
+def _cell(value):
+    if isinstance(value, (list, tuple)):
+        return ', '.join(_cell(item) for item in value)
+    return _clean(value)
+
+def format_records(records):
+    # Cypher-style records with the same keys: one header line, one line per record
+    columns = list(records[0])
+    lines = [' | '.join(columns)]
+    lines.extend(' | '.join(_cell(record.get(column)) for column in columns) for record in records)
+    return '\n'.join(lines)
+
+def _is_records(value):
+    return (isinstance(value, list) and value and all(isinstance(record, dict) for record in value)
+            and all(record.keys() == value[0].keys() for record in value))
+
+def _is_milestone_listing(value):
+    return isinstance(value, dict) and value and all(
+        isinstance(options, list) and all(isinstance(option, (str, list, tuple)) for option in options)
+        for options in value.values()
+    )
+
+def compact(value):
+    """
+    Text for a tool output, in the notation above.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict) and 'curriculum' in value:
+        return format_major_requirements(value)
+    if isinstance(value, dict) and 'result' in value:
+        return format_qa_result(value)
+    if _is_milestone_listing(value):
+        return format_courses_by_milestone(value)
+    if _is_records(value):
+        return format_records(value)
+    try:
+        return json.dumps(value, separators=(',', ':'), default=str)
+    except (TypeError, ValueError):
+        return str(value)
+
+def _pages(text, max_chars):
+    pages, current = [], ''
+    for line in text.split('\n'):
+        # lines longer than a page are split too
+        while len(line) > max_chars:
+            if current:
+                pages.append(current)
+                current = ''
+            pages.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + 1 + len(line) > max_chars:
+            pages.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current or not pages:
+        pages.append(current)
+    return pages
+
+class _ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.raw_tokens = 0
+        self.compact_tokens = 0
+        self.observed_tokens = 0
+        self.truncated = 0
+
+class ObservationLog:
+    """
+    Serializes tool outputs with compact(), caps them at max_tokens and keeps the full text of
+    capped ones (the last max_stored) for expand(). Counts tokens per tool:
+        raw_tokens:       str(output), what LangChain would have put in the scratchpad
+        compact_tokens:   the whole compact serialization
+        observed_tokens:  what the agent actually saw (first part only, for capped outputs)
+    """
+
+    def __init__(self, max_tokens=MAX_OBSERVATION_TOKENS, max_stored=MAX_STORED_OBSERVATIONS):
+        self.max_tokens = max_tokens
+        self.max_stored = max_stored
+        self.stored = OrderedDict()
+        self.tools = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def format(self, tool, value, cap=True):
+        """
+        The observation for one tool output. cap=False skips the token cap (e.g. for the fast
+        path, which has no way to ask for more).
+        """
+        text = compact(value)
+        observed = self._cap(text) if cap else text
+        with self._lock:
+            stats = self.tools.setdefault(tool, _ToolStats())
+            stats.calls += 1
+            stats.raw_tokens += text_tokens(str(value))
+            stats.compact_tokens += text_tokens(text)
+            stats.observed_tokens += text_tokens(observed)
+            stats.truncated += observed is not text
+        return observed
+
+    def wrap(self, tool, func):
+        """
+        func with its output passed through format(), for Tool.from_function.
+        """
+        def call(*args, **kwargs):
+            return self.format(tool, func(*args, **kwargs))
+        call.__name__ = getattr(func, '__name__', tool)
+        return call
+
+    def _cap(self, text):
+        if text_tokens(text) <= self.max_tokens:
+            return text
+        pages = _pages(text, self.max_tokens * 4)
+        with self._lock:
+            handle = f"obs-{self._next_id}"
+            self._next_id += 1
+            self.stored[handle] = pages
+            while len(self.stored) > self.max_stored:
+                self.stored.popitem(last=False)
+        return self._page(handle, pages, 1)
+
+    def _page(self, handle, pages, number):
+        text = pages[number - 1]
+        if number < len(pages):
+            remaining = sum(text_tokens(page) for page in pages[number:])
+            text += (f"\n[part {number} of {len(pages)}, ~{remaining} more tokens: "
+                     f"use Expand tool output with '{handle}:{number + 1}' for the next part]")
+        return text
+
+    def expand(self, request):
+        """
+        Tool entry point: the part of a capped observation named by a handle, 'obs-3:2'
+        (part 2 when no part is given).
+        """
+        match = _HANDLE.search(str(request))
+        if match is None:
+            return "Give the handle printed at the end of the cut tool output, e.g. 'obs-3:2'."
+        handle = f"obs-{match.group(1)}"
+        with self._lock:
+            pages = self.stored.get(handle)
+        if pages is None:
+            return f"{handle} is no longer available; call the original tool again."
+        number = int(match.group(2) or 2)
+        if not 1 <= number <= len(pages):
+            return f"{handle} has {len(pages)} parts."
+        return self._page(handle, pages, number)
+
+    def report(self):
+        """
+        Per tool: calls, token totals and the reduction of observed against raw tokens.
+        """
+        with self._lock:
+            return {
+                tool: {
+                    'calls': stats.calls,
+                    'raw_tokens': stats.raw_tokens,
+                    'compact_tokens': stats.compact_tokens,
+                    'observed_tokens': stats.observed_tokens,
+                    'truncated': stats.truncated,
+                    'reduction': round(1 - stats.observed_tokens / stats.raw_tokens, 3) if stats.raw_tokens else 0.0,
+                }
+                for tool, stats in sorted(self.tools.items())
+            }
+
+observation_log = ObservationLog()
@@ -0,0 +1,144 @@
+import json
+import time
+import threading
+from collections import deque
+
+# Histogram bucket upper bounds in seconds, as exported to Prometheus
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+def _percentile(ordered, quantile):
+    if not ordered:
+        return 0.0
+    position = quantile * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class _QueryStats:
+    def __init__(self, window):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        # recent samples for p50/p95/p99; the buckets keep the whole history
+        self.recent = deque(maxlen=window)
+
+class QueryMetrics:
+    """
+    Latency and error counts of Cypher statements, keyed by query name
+    (e.g. 'get_prerequisites', 'get_major_requirements.direct_query').
+    Percentiles are computed over the last `window` calls of each query; the Prometheus export
+    also includes cumulative histogram buckets, so rates and quantiles can be derived server side.
+    """
+
+    def __init__(self, window=2048):
+        self.window = window
+        self.queries = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def _stats(self, name):
+        if name not in self.queries:
+            self.queries[name] = _QueryStats(self.window)
+        return self.queries[name]
+
+    def observe(self, name, seconds, error=False):
+        with self._lock:
+            stats = self._stats(name)
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.recent.append(seconds)
+            if error:
+                stats.errors += 1
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+
+    def record_retry(self, name):
+        with self._lock:
+            self._stats(name).retries += 1
+
+    def reset(self):
+        with self._lock:
+            self.queries = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """
+        Returns {query name: {'count', 'errors', 'retries', 'total_seconds', 'mean_ms', 'p50_ms',
+        'p95_ms', 'p99_ms', 'max_ms'}}, slowest total first.
+        """
+        with self._lock:
+            queries = {
+                name: (stats.count, stats.errors, stats.retries, stats.total, stats.max, sorted(stats.recent))
+                for name, stats in self.queries.items()
+            }
+        snapshot = {}
+        for name, (count, errors, retries, total, slowest, recent) in sorted(
+                queries.items(), key=lambda item: item[1][3], reverse=True):
+            snapshot[name] = {
+                'count': count,
+                'errors': errors,
+                'retries': retries,
+                'total_seconds': round(total, 4),
+                'mean_ms': round(total / count * 1000, 3) if count else 0.0,
+                **{f"p{int(q * 100)}_ms": round(_percentile(recent, q) * 1000, 3) for q in QUANTILES},
+                'max_ms': round(slowest * 1000, 3),
+            }
+        return snapshot
+
+    def to_json(self, indent=None):
+        return json.dumps({'since': self.started_at, 'queries': self.snapshot()}, indent=indent)
+
+    def to_prometheus(self, prefix='neo4j_query'):
+        """
+        Prometheus text exposition format.
+        """
+        with self._lock:
+            queries = {
+                name: (stats.count, stats.errors, stats.retries, stats.total, list(stats.buckets), sorted(stats.recent))
+                for name, stats in self.queries.items()
+            }
+
+        lines = [
+            f"# HELP {prefix}_seconds Cypher statement latency by query name.",
+            f"# TYPE {prefix}_seconds histogram",
+        ]
+        for name, (count, _, _, total, buckets, _) in sorted(queries.items()):
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, buckets):
+                cumulative += bucket
+                lines.append(f'{prefix}_seconds_bucket{{query="{_label(name)}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_seconds_bucket{{query="{_label(name)}",le="+Inf"}} {count}')
+            lines.append(f'{prefix}_seconds_sum{{query="{_label(name)}"}} {total}')
+            lines.append(f'{prefix}_seconds_count{{query="{_label(name)}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_recent_seconds Cypher statement latency quantiles over recent calls.",
+            f"# TYPE {prefix}_recent_seconds gauge",
+        ]
+        for name, (_, _, _, _, _, recent) in sorted(queries.items()):
+            for q in QUANTILES:
+                lines.append(f'{prefix}_recent_seconds{{query="{_label(name)}",quantile="{q}"}} {_percentile(recent, q)}')
+
+        for metric, position, description in (
+                ('errors', 1, 'Cypher statements that failed after retries.'),
+                ('retries', 2, 'Cypher statement retries after transient errors.')):
+            lines += [
+                f"# HELP {prefix}_{metric}_total {description}",
+                f"# TYPE {prefix}_{metric}_total counter",
+            ]
+            for name, values in sorted(queries.items()):
+                lines.append(f'{prefix}_{metric}_total{{query="{_label(name)}"}} {values[position]}')
+        return '\n'.join(lines) + '\n'
+
+# Shared by every graph connection in the process (see graph.py)
+query_metrics = QueryMetrics()
@@ -0,0 +1,174 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from course_ids import find_course_ids
+from router import MAJOR_MENTION
+
+class ResponseCache:
+    """
+    Semantic cache of fast-path answers (agent answers can depend on the conversation so far,
+    and are not shared between sessions).
+    Questions are normalized (course ids rewritten as 'MATH 20C', case and whitespace folded) and
+    embedded; a cached answer is reused when a new question mentions the same course ids and its
+    embedding is at least `threshold` cosine-similar.
+
+    Each answer remembers the catalog version it was computed from and the course ids it depends on,
+    so a catalog reload only drops the answers about courses that changed (see invalidate()).
+    version_source(), if given, returns the current catalog version and is checked on every lookup:
+    answers from another version that invalidate() did not carry over are dropped.
+    Entries expire after `ttl` seconds and the least recently used are evicted past max_entries.
+
+    Only self-contained questions (mentioning a course id or the major) are cached, since
+    follow-ups like "what about its prerequisites?" depend on the conversation.
+    """
+
+    def __init__(self, embeddings, threshold=0.95, ttl=24 * 3600, max_entries=2000, version_source=None):
+        self.embeddings = embeddings
+        self.version_source = version_source
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.catalog_version = None
+        self.entries = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidated = 0
+        self.expired = 0
+
+    @staticmethod
+    def normalize(question):
+        """
+        Returns (normalized question, course ids it mentions).
+        """
+        course_ids = find_course_ids(question)
+        normalized = question
+        for course_id in course_ids:
+            dept, number = course_id.split(' ')
+            normalized = re.sub(rf"\b{dept}\s*{number}\b", course_id, normalized, flags=re.IGNORECASE)
+        normalized = ' '.join(normalized.lower().split())
+        return normalized, course_ids
+
+    @staticmethod
+    def cacheable(question, course_ids):
+        return bool(course_ids) or bool(MAJOR_MENTION.search(question))
+
+    def _embed(self, normalized):
+        vector = np.asarray(self.embeddings.embed_query(normalized), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _current_version(self):
+        """
+        The catalog version from version_source (which may call invalidate() for a reload it notices),
+        or the last known one if it is unavailable.
+        """
+        if self.version_source is not None:
+            try:
+                version = self.version_source()
+            except Exception as e:
+                print(f"Catalog version unavailable for the response cache: {str(e)}")
+            else:
+                with self._lock:
+                    self.catalog_version = version
+        return self.catalog_version
+
+    def lookup(self, question):
+        """
+        Returns a cached answer for question, or None.
+        """
+        normalized, course_ids = self.normalize(question)
+        if not self.cacheable(question, course_ids):
+            return None
+        version = self._current_version()
+        vector = self._embed(normalized)
+        key = frozenset(course_ids)
+        now = time.time()
+
+        with self._lock:
+            best_id, best_score = None, self.threshold
+            for entry_id, entry in list(self.entries.items()):
+                if entry['catalog_version'] != version:
+                    del self.entries[entry_id]
+                    self.invalidated += 1
+                    continue
+                if now - entry['created_at'] > self.ttl:
+                    del self.entries[entry_id]
+                    self.expired += 1
+                    continue
+                if entry['course_ids'] != key:
+                    continue
+                score = float(np.dot(vector, entry['vector']))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(best_id)
+            self.hits += 1
+            return self.entries[best_id]['answer']
+
+    def store(self, question, answer):
+        normalized, course_ids = self.normalize(question)
+        if not self.cacheable(question, course_ids):
+            return
+        version = self._current_version()
+        vector = self._embed(normalized)
+        with self._lock:
+            self.entries[self._next_id] = {
+                'question': normalized,
+                'course_ids': frozenset(course_ids),
+                'vector': vector,
+                'answer': answer,
+                'catalog_version': version,
+                'created_at': time.time(),
+            }
+            self._next_id += 1
+            self.stores += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, changed_course_ids=None, catalog_version=None):
+        """
+        Drops answers affected by a catalog change.
+        changed_course_ids=None drops everything; otherwise only answers about those courses,
+        plus answers that mention no course (e.g. major requirements), which may depend on anything.
+        The answers kept are carried over to catalog_version, if given.
+        """
+        with self._lock:
+            if changed_course_ids is None:
+                dropped = list(self.entries)
+            else:
+                changed = set(changed_course_ids)
+                dropped = [
+                    entry_id for entry_id, entry in self.entries.items()
+                    if not entry['course_ids'] or entry['course_ids'] & changed
+                ]
+            for entry_id in dropped:
+                del self.entries[entry_id]
+            if catalog_version is not None:
+                self.catalog_version = catalog_version
+                for entry in self.entries.values():
+                    entry['catalog_version'] = catalog_version
+            self.invalidated += len(dropped)
+            return len(dropped)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'stores': self.stores,
+            'invalidated': self.invalidated,
+            'expired': self.expired,
+            'catalog_version': self.catalog_version,
+        }
@@ -0,0 +1,118 @@
+import re
+import threading
+
+from course_ids import find_course_ids
+
+# Intent rules, checked in order. Each maps a question to one db_retriever function.
+_ALL_PREREQS = re.compile(
+    r"\b(all|every|entire|full|complete|whole|recursive(ly)?)\b.*\b(pre-?req(uisite)?s?|requirements?)\b"
+    r"|\bpre-?req(uisite)?s? (chain|tree|path)\b",
+    re.IGNORECASE,
+)
+_PREREQS = re.compile(
+    r"\bpre-?req(uisite)?s?\b"
+    r"|\b(need|required|have) (to (take|complete) )?before\b"
+    r"|\brequirements? (for|of|to take)\b",
+    re.IGNORECASE,
+)
+_ANALYTICS = re.compile(
+    r"\b(fastest|quickest|shortest) (path|way|route)\b"
+    r"|\bunlocks? the most\b|\bmost (courses )?unlocked\b"
+    r"|\bhow (deep|long) is (the|its) (pre-?req(uisite)?s? )?chain\b",
+    re.IGNORECASE,
+)
+# "what does MATH 20C unlock?" asks for the courses themselves, which the analytics only count
+_UNLOCKS = re.compile(r"\bunlock(s|ed|ing)?\b", re.IGNORECASE)
+_COURSE_INFO = re.compile(
+    r"\b(what is|what's|whats|tell me about|describe|description|about|units?|title|cover(s|ed)?|info(rmation)?)\b",
+    re.IGNORECASE,
+)
+MAJOR_MENTION = re.compile(r"\b(math[- ]?cs|mathematics[- ]computer science|ma30)\b", re.IGNORECASE)
+_MAJOR_REQUIREMENTS = re.compile(r"\b(requirements?|required|need to (take|graduate)|graduate)\b", re.IGNORECASE)
+
+# Questions that need reasoning or several tools always go through the agent
+_NEEDS_AGENT = re.compile(
+    r"\b(compare|vs|versus|should|plan|schedule|recommend|suggest|which|quarter|easier|harder|better|can i|eligible)\b",
+    re.IGNORECASE,
+)
+MAX_FAST_PATH_WORDS = 25
+
+class Route:
+    def __init__(self, intent, tool, argument):
+        self.intent = intent
+        self.tool = tool
+        self.argument = argument
+
+    def __repr__(self):
+        return f"Route({self.intent!r}, {self.tool!r}, {self.argument!r})"
+
+def route_question(question):
+    """
+    Classifies a question into one of the common intents that a single db_retriever call can answer.
+    Returns a Route, or None if the question should go through the ReAct agent.
+    """
+    if len(question.split()) > MAX_FAST_PATH_WORDS or _NEEDS_AGENT.search(question):
+        return None
+
+    course_ids = find_course_ids(question)
+    if len(course_ids) > 1:
+        return None
+
+    if not course_ids:
+        if MAJOR_MENTION.search(question) and _MAJOR_REQUIREMENTS.search(question):
+            return Route('major_requirements', 'get_major_requirements', 'MA30')
+        return None
+
+    course_id = course_ids[0]
+    if _ANALYTICS.search(question):
+        # "the prerequisites of CSE 100 and the fastest path" needs both tools
+        if _PREREQS.search(question) and re.search(r"\band\b", question, re.IGNORECASE):
+            return None
+        return Route('course_analytics', 'get_course_analytics', course_id)
+    if _UNLOCKS.search(question):
+        return None
+    if _ALL_PREREQS.search(question):
+        return Route('all_prerequisites', 'iterative_get_prerequisites', course_id)
+    if _PREREQS.search(question):
+        return Route('prerequisites', 'get_prerequisites', course_id)
+    if _COURSE_INFO.search(question):
+        return Route('course_info', 'get_course_info', course_id)
+    return None
+
+class RouterStats:
+    """
+    Counts and latencies per path, used to estimate the time saved by the fast path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.paths = {}
+
+    def record(self, path, seconds):
+        with self._lock:
+            count, total = self.paths.get(path, (0, 0.0))
+            self.paths[path] = (count + 1, total + seconds)
+
+    def average(self, path):
+        count, total = self.paths.get(path, (0, 0.0))
+        return total / count if count else None
+
+    def report(self):
+        with self._lock:
+            return {
+                path: {'count': count, 'average_seconds': round(total / count, 3)}
+                for path, (count, total) in self.paths.items()
+            }
+
+router_stats = RouterStats()
+
+def log_route(path, seconds):
+    """
+    Records which path answered a question and prints the latency saved against the average agent turn.
+    """
+    router_stats.record(path, seconds)
+    agent_average = router_stats.average('agent')
+    if path != 'agent' and agent_average is not None:
+        print(f"Router: {path} answered in {seconds:.2f}s, ~{agent_average - seconds:.2f}s faster than the agent average")
+    else:
+        print(f"Router: {path} answered in {seconds:.2f}s")
@@ -0,0 +1,109 @@
+import time
+import queue
+import threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+STREAM_ALL_TAG = "stream_all"
+
+class AgentEventHandler(BaseCallbackHandler):
+    """
+    Turns agent callbacks into UI events on a queue:
+        {'type': 'tool_start', 'tool', 'input'}
+        {'type': 'tool_end', 'tool', 'seconds'}
+        {'type': 'token', 'text'}
+    ReAct steps are not shown: tokens of an LLM run are only emitted after its "Final Answer:"
+    marker, unless the run is tagged STREAM_ALL_TAG (plain answers such as the fast path).
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self._buffers = {}
+        self._streaming = set()
+        self._answer_starts = set()
+        self._tools = {}
+
+    def _start_llm(self, run_id, tags):
+        self._buffers[run_id] = ''
+        if tags and STREAM_ALL_TAG in tags:
+            self._streaming.add(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, tags=None, **kwargs):
+        self._start_llm(run_id, tags)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, tags=None, **kwargs):
+        self._start_llm(run_id, tags)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        if run_id in self._streaming:
+            if run_id in self._answer_starts:
+                # the space after "Final Answer:" can come in the next token
+                token = token.lstrip()
+                if token:
+                    self._answer_starts.discard(run_id)
+            if token:
+                self.events.put({'type': 'token', 'text': token})
+            return
+        buffer = self._buffers.get(run_id, '') + token
+        self._buffers[run_id] = buffer
+        if FINAL_ANSWER_MARKER in buffer:
+            self._streaming.add(run_id)
+            text = buffer.split(FINAL_ANSWER_MARKER, 1)[1].lstrip()
+            if text:
+                self.events.put({'type': 'token', 'text': text})
+            else:
+                self._answer_starts.add(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._buffers.pop(run_id, None)
+        self._streaming.discard(run_id)
+        self._answer_starts.discard(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get('name', 'tool')
+        self._tools[run_id] = (name, time.perf_counter())
+        self.events.put({'type': 'tool_start', 'tool': name, 'input': input_str})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        name, started = self._tools.pop(run_id, ('tool', time.perf_counter()))
+        self.events.put({'type': 'tool_end', 'tool': name, 'seconds': time.perf_counter() - started})
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        name, started = self._tools.pop(run_id, ('tool', time.perf_counter()))
+        self.events.put({'type': 'tool_end', 'tool': name, 'seconds': time.perf_counter() - started, 'error': str(error)})
+
+_DONE = object()
+
+def stream_events(work, submit=None):
+    """
+    Runs work(handler) in a thread and yields the handler's events as they happen,
+    followed by {'type': 'final', 'text': <work's return value>}.
+    Exceptions raised by work are re-raised in the caller.
+    submit(fn), if given, runs fn instead of a new thread (e.g. a worker pool's submit);
+    if it raises, nothing is yielded and the error propagates.
+    """
+    handler = AgentEventHandler()
+    outcome = {}
+
+    def run():
+        try:
+            outcome['text'] = work(handler)
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            handler.events.put(_DONE)
+
+    if submit is None:
+        threading.Thread(target=run, name="agent-turn", daemon=True).start()
+    else:
+        submit(run)
+    while True:
+        event = handler.events.get()
+        if event is _DONE:
+            break
+        yield event
+
+    if 'error' in outcome:
+        raise outcome['error']
+    yield {'type': 'final', 'text': outcome['text']}
@@ -0,0 +1,38 @@
+"""
+SchedulePlanner on a small catalog modelled on the MATH 10 and MATH 20 calculus sequences, where
+MATH 20B and MATH 10C can each be taken after the other.
+
+    python -m pytest tests
+"""
+import pytest
+
+from tools.schedule_planner import SchedulePlanner
+
+PREREQUISITES = {
+    'MATH 10A': [['MATH 3C', 'MATH 4C']],
+    'MATH 10B': [['MATH 10A', 'MATH 20A']],
+    'MATH 10C': [['MATH 10B', 'MATH 20B']],
+    'MATH 20A': [['MATH 2C', 'MATH 4C', 'MATH 10A']],
+    'MATH 20B': [['MATH 20A', 'MATH 10B', 'MATH 10C']],
+    'MATH 20C': [['MATH 20B']],
+}
+UNITS = {course_id: 4 for course_id in
+         ['MATH 2C', 'MATH 3C', 'MATH 4C', 'MATH 10A', 'MATH 10B', 'MATH 10C', 'MATH 20A', 'MATH 20B', 'MATH 20C']}
+
+@pytest.mark.parametrize("targets", [['MATH 10C', 'MATH 20C'], ['MATH 20C', 'MATH 10C']])
+def test_plan_does_not_depend_on_target_order(targets):
+    plan = SchedulePlanner(PREREQUISITES, UNITS).plan(targets)
+
+    courses = [course_id for quarter in plan['quarters'] for course_id in quarter['courses']]
+    # MATH 20B serves both targets, so MATH 10B is not needed
+    assert sorted(courses) == ['MATH 10C', 'MATH 20A', 'MATH 20B', 'MATH 20C', 'MATH 2C']
+    assert plan['total_units'] == 20
+    assert plan['optimal'] and plan['lower_bound'] == len(plan['quarters']) == 4
+
+def test_plan_with_unscheduled_courses_is_not_optimal():
+    plan = SchedulePlanner(PREREQUISITES, UNITS).plan(['MATH 20C', 'MATH 10C'], max_quarters=2)
+
+    assert plan['unscheduled'] == ['MATH 10C', 'MATH 20B', 'MATH 20C']
+    # the bound still counts the targets that were not placed
+    assert plan['lower_bound'] == 4
+    assert not plan['optimal']
@@ -0,0 +1,94 @@
+"""
+Events of streaming.py for the two ways an answer is produced: the ReAct agent (only the text after
+"Final Answer:" is streamed) and the fast path (every token). The LLM is GenericFakeChatModel, which
+streams its scripted answers word by word; the graph is the in-memory stand-in of benchmarks/offline.py.
+
+    python -m pytest tests
+"""
+import sys
+
+import pytest
+from langchain.agents import AgentExecutor, create_react_agent
+from langchain.tools import Tool
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+
+from streaming import stream_events
+
+REACT_PROMPT = PromptTemplate.from_template(
+    "Tools: {tools} ({tool_names})\nQuestion: {input}\n{agent_scratchpad}"
+)
+
+def scripted_llm(*answers):
+    return GenericFakeChatModel(messages=iter([AIMessage(content=answer) for answer in answers]))
+
+def test_agent_streams_only_the_final_answer():
+    llm = scripted_llm(
+        "Thought: I should look it up\nAction: lookup\nAction Input: CSE 100",
+        "Thought: I know the answer\nFinal Answer: CSE 100 needs CSE 12 and CSE 21",
+    )
+    lookup = Tool.from_function(name="lookup", description="Looks up a course", func=lambda text: "CSE 12, CSE 21")
+    executor = AgentExecutor(agent=create_react_agent(llm, [lookup], REACT_PROMPT), tools=[lookup])
+
+    events = list(stream_events(
+        lambda handler: executor.invoke({"input": "What does CSE 100 need?"}, {"callbacks": [handler]})['output']
+    ))
+
+    assert [event['type'] for event in events if event['type'] != 'token'] == ['tool_start', 'tool_end', 'final']
+    assert events[0]['tool'] == 'lookup' and events[0]['input'] == 'CSE 100'
+    tokens = [event['text'] for event in events if event['type'] == 'token']
+    # word by word, and none of the ReAct steps
+    assert len(tokens) > 1
+    assert ''.join(tokens) == "CSE 100 needs CSE 12 and CSE 21"
+    assert events[-1]['text'] == "CSE 100 needs CSE 12 and CSE 21"
+
+def test_stream_events_reraises_errors():
+    def fail(handler):
+        raise ValueError("no answer")
+
+    with pytest.raises(ValueError):
+        list(stream_events(fail))
+
+@pytest.fixture(scope="module")
+def offline_agent():
+    # agent.py with a fake LLM and the in-memory graph, as in benchmarks/agent_eval.py
+    from langchain_community.chat_message_histories import ChatMessageHistory
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from benchmarks.offline import CatalogGraphStandIn, install
+    from tools.course_index import CourseGraphIndex
+    from tools.requirement_cache import RequirementCache
+
+    saved = {name: sys.modules.get(name) for name in ('graph', 'llm', 'agent')}
+    index = CourseGraphIndex.from_csv()
+    llm = scripted_llm("CSE 100 requires CSE 12 , CSE 15L and CSE 21 .")
+    install(llm, DeterministicFakeEmbedding(size=64), CatalogGraphStandIn(index))
+    sys.modules.pop('agent', None)
+    import agent
+    import tools.db_retriever as db_retriever
+
+    def build_db_retriever():
+        db_retriever.use_course_index(index)
+        db_retriever.requirement_cache = RequirementCache(db_retriever.catalog_version, path=None)
+        return db_retriever
+
+    agent.tool_registry.register("db_retriever", build_db_retriever)
+    agent.history_store.backend_factory = lambda session_id: ChatMessageHistory()
+    yield agent
+
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+
+def test_fast_path_streams_every_token(offline_agent):
+    events = list(stream_events(
+        lambda handler: offline_agent.answer_question("What are the prerequisites for CSE 100?", "test", [handler])
+    ))
+
+    assert events[0]['type'] == 'tool_start' and events[0]['tool'] == 'get_prerequisites'
+    assert events[1]['type'] == 'tool_end'
+    tokens = [event['text'] for event in events if event['type'] == 'token']
+    assert len(tokens) > 1
+    assert ''.join(tokens) == events[-1]['text'] == "CSE 100 requires CSE 12 , CSE 15L and CSE 21 ."
@@ -0,0 +1,398 @@
+import os
+import time
+import threading
+from array import array
+
+from catalog_data import (
+    processed_catalog_paths,
+    requirement_paths,
+    read_department_catalog,
+    read_major_requirements,
+)
+
+# CatalogVersion is bumped by catalog_loader.py; the counts catch edits made any other way
+VERSION_STAMP_QUERY = """
+    MATCH (n) WHERE n:Course OR n:OrGroup OR n:Milestone
+    WITH count(n) AS nodes
+    OPTIONAL MATCH ()-[r:REQUIRED|INCLUDED_IN]->()
+    WITH nodes, count(r) AS relationships
+    OPTIONAL MATCH (v:CatalogVersion {name: 'catalog'})
+    RETURN v.version AS version, nodes, relationships
+"""
+
+def neo4j_version_stamp(graph):
+    """
+    Version of the catalog graph in Neo4j: (CatalogVersion.version, node count, relationship count).
+    """
+    result = graph.query(VERSION_STAMP_QUERY)
+    return (result[0]['version'], result[0]['nodes'], result[0]['relationships'])
+
+class _CompiledGraph:
+    """
+    Immutable adjacency store built by CourseGraphIndex.
+    Courses and OrGroups are interned to ints; adjacency is kept as CSR-style int arrays:
+        course -> groups:  group_offsets[c] .. group_offsets[c + 1] index into course_groups
+        group -> members:  member_offsets[g] .. member_offsets[g + 1] index into members
+        course -> courses requiring it: required_for_offsets / required_for
+    """
+    __slots__ = (
+        'course_ids', 'course_lookup', 'course_info', 'group_ids',
+        'group_offsets', 'course_groups', 'member_offsets', 'members',
+        'required_for_offsets', 'required_for', 'milestones',
+    )
+
+    def __init__(self, courses, groups, milestones):
+        self.course_ids = []
+        self.course_lookup = {}
+        self.course_info = []
+        for course_id, info in courses.items():
+            self._intern(course_id, info)
+
+        groups_by_course = {}
+        for group_id, course_id, prereq_courses in sorted(groups):
+            self._intern(course_id)
+            members = [self._intern(prereq) for prereq in prereq_courses]
+            groups_by_course.setdefault(self.course_lookup[course_id], []).append((group_id, members))
+
+        self.group_ids = []
+        self.group_offsets = array('i', [0])
+        self.course_groups = array('i')
+        self.member_offsets = array('i', [0])
+        self.members = array('i')
+        reverse = [set() for _ in self.course_ids]
+        for course in range(len(self.course_ids)):
+            for group_id, members in groups_by_course.get(course, []):
+                self.course_groups.append(len(self.group_ids))
+                self.group_ids.append(group_id)
+                self.members.extend(members)
+                self.member_offsets.append(len(self.members))
+                for prereq in members:
+                    reverse[prereq].add(course)
+            self.group_offsets.append(len(self.course_groups))
+
+        self.required_for_offsets = array('i', [0])
+        self.required_for = array('i')
+        for dependents in reverse:
+            self.required_for.extend(sorted(dependents, key=self.course_ids.__getitem__))
+            self.required_for_offsets.append(len(self.required_for))
+
+        self.milestones = milestones
+
+    def _intern(self, course_id, info=None):
+        if course_id not in self.course_lookup:
+            self.course_lookup[course_id] = len(self.course_ids)
+            self.course_ids.append(course_id)
+            self.course_info.append(info)
+        elif info is not None:
+            self.course_info[self.course_lookup[course_id]] = info
+        return self.course_lookup[course_id]
+
+    def fingerprints(self):
+        """
+        Per course and milestone snapshot, used to find what changed between two loads.
+        """
+        fingerprints = {}
+        for course, course_id in enumerate(self.course_ids):
+            info = self.course_info[course]
+            groups = tuple(
+                (self.group_ids[group], tuple(self.course_ids[prereq] for prereq in members))
+                for group, members in self.groups_of(course)
+            )
+            fingerprints[course_id] = (tuple(sorted(info.items())) if info else None, groups)
+        for milestone_id, milestone in self.milestones.items():
+            fingerprints[milestone_id] = repr(sorted(milestone.items()))
+        return fingerprints
+
+    def groups_of(self, course):
+        for position in range(self.group_offsets[course], self.group_offsets[course + 1]):
+            group = self.course_groups[position]
+            yield group, self.members[self.member_offsets[group]:self.member_offsets[group + 1]]
+
+
+class CourseGraphIndex:
+    """
+    In-process copy of the Course/OrGroup/Milestone graph.
+    The catalog is small (a few hundred courses), so the whole graph is loaded once,
+    either from Neo4j or straight from data/processed/*.csv, and prerequisite,
+    reverse-prerequisite and closure queries are answered from int arrays without a round trip.
+
+    The graph is reloaded by refresh(); with refresh_interval set, maybe_refresh() also
+    reloads whenever the source's version stamp changes. Callbacks registered with on_change()
+    get (version, changed ids) after each reload, for invalidating caches built on the catalog.
+    """
+
+    def __init__(self, source='csv', graph=None, paths=None, requirements=None, refresh_interval=None):
+        if source not in ('csv', 'neo4j'):
+            raise ValueError('source must be "csv" or "neo4j"')
+        if source == 'neo4j' and graph is None:
+            raise ValueError('A Neo4j graph is required for source="neo4j"')
+        self.source = source
+        self.graph = graph
+        self.paths = paths if paths is not None else (processed_catalog_paths() if source == 'csv' else [])
+        self.requirements = requirements if requirements is not None else (requirement_paths() if source == 'csv' else [])
+        self.refresh_interval = refresh_interval
+        self.version = None
+        self.loaded_at = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._compiled = None
+        self._listeners = []
+        self.refresh(force=True)
+
+    @classmethod
+    def from_neo4j(cls, graph, refresh_interval=None):
+        return cls(source='neo4j', graph=graph, refresh_interval=refresh_interval)
+
+    @classmethod
+    def from_csv(cls, paths=None, requirements=None, refresh_interval=None):
+        return cls(source='csv', paths=paths, requirements=requirements, refresh_interval=refresh_interval)
+
+    # Loading
+
+    def version_stamp(self):
+        """
+        Cheap fingerprint of the source; a change means the index is stale.
+        """
+        if self.source == 'csv':
+            stamp = []
+            for path in self.paths + self.requirements:
+                stat = os.stat(path)
+                stamp.append((path, stat.st_mtime_ns, stat.st_size))
+            return tuple(stamp)
+
+        return neo4j_version_stamp(self.graph)
+
+    def refresh(self, force=False):
+        """
+        Reloads the graph if forced or if the version stamp changed. Returns True if reloaded.
+        """
+        with self._lock:
+            version = self.version_stamp()
+            self._checked_at = time.monotonic()
+            if not force and version == self.version:
+                return False
+
+            if self.source == 'csv':
+                courses, groups, milestones = self._load_csv()
+            else:
+                courses, groups, milestones = self._load_neo4j()
+
+            previous = self._compiled
+            # swap in the new graph in one assignment so readers never see a partial state
+            self._compiled = _CompiledGraph(courses, groups, milestones)
+            self.version = version
+            self.loaded_at = time.time()
+
+            if previous is None:
+                return True
+            before, after = previous.fingerprints(), self._compiled.fingerprints()
+            changed = {key for key in before.keys() | after.keys() if before.get(key) != after.get(key)}
+            listeners = list(self._listeners)
+
+        for callback in listeners:
+            callback(version, changed)
+        return True
+
+    def on_change(self, callback):
+        """
+        Calls callback(version, changed_ids) after every reload; changed_ids holds the course and
+        milestone ids whose info, prerequisites or requirements differ from the previous load.
+        """
+        self._listeners.append(callback)
+
+    def maybe_refresh(self):
+        if self.refresh_interval is None:
+            return False
+        if time.monotonic() - self._checked_at < self.refresh_interval:
+            return False
+        return self.refresh()
+
+    def _load_csv(self):
+        courses = {}
+        groups = []
+        for path in self.paths:
+            for course in read_department_catalog(path):
+                courses[course['course_id']] = {
+                    'title': course['title'],
+                    'units': course['units'],
+                    'description': course['description'],
+                }
+                for group_idx, or_group in enumerate(course['prerequisites']):
+                    if not or_group:
+                        continue
+                    groups.append((f"{course['course_id']}_GROUP_{group_idx}", course['course_id'], or_group))
+
+        milestones = {}
+        for path in self.requirements:
+            for milestone in read_major_requirements(path):
+                milestones[milestone['milestone_id']] = {
+                    'title': milestone['title'],
+                    'description': milestone['description'],
+                    'units_required': milestone['units_required'],
+                    'sub_milestones': milestone['sub_milestones'],
+                    'courses': milestone['courses'],
+                    'paths': milestone['paths'],
+                }
+        return courses, groups, milestones
+
+    def _load_neo4j(self):
+        courses = {}
+        for record in self.graph.query("""
+            MATCH (c:Course)
+            RETURN c.course_id as course_id, c.title as title, c.units as units, c.description as description
+        """):
+            courses[record['course_id']] = {
+                'title': record['title'],
+                'units': record['units'],
+                'description': record['description'],
+            }
+
+        groups = [
+            (record['group_id'], record['course_id'], record['prereq_courses'])
+            for record in self.graph.query("""
+                MATCH (og:OrGroup)-[:REQUIRED]->(c:Course)
+                MATCH (prereq:Course)-[:INCLUDED_IN]->(og)
+                RETURN c.course_id as course_id, og.group_id as group_id,
+                    collect(prereq.course_id) as prereq_courses
+            """)
+        ]
+
+        milestones = {}
+        for record in self.graph.query("""
+            MATCH (m:Milestone)
+            OPTIONAL MATCH (sub:Milestone)-[:REQUIRED]->(m)
+            OPTIONAL MATCH (c:Course)-[:INCLUDED_IN]->(m)
+            RETURN m.milestone_id as milestone_id, m.title as title, m.description as description,
+                m.units_required as units_required,
+                collect(DISTINCT sub.milestone_id) as sub_milestones,
+                collect(DISTINCT c.course_id) as courses
+        """):
+            milestones[record['milestone_id']] = {
+                'title': record['title'],
+                'description': record['description'],
+                'units_required': record['units_required'],
+                'sub_milestones': sorted(record['sub_milestones']),
+                'courses': record['courses'],
+                'paths': [],
+            }
+        for record in self.graph.query("""
+            MATCH (c:Course)-[:REQUIRED]->(og:OrGroup)-[:INCLUDED_IN]->(m:Milestone)
+            RETURN m.milestone_id as milestone_id, og.group_id as group_id, collect(c.course_id) as courses
+            ORDER BY milestone_id, group_id
+        """):
+            milestones[record['milestone_id']]['paths'].append((record['group_id'], record['courses']))
+        return courses, groups, milestones
+
+    # Queries
+
+    def has_course(self, course_id):
+        return course_id in self._compiled.course_lookup
+
+    def course_count(self):
+        return len(self._compiled.course_ids)
+
+    def course_ids(self):
+        return list(self._compiled.course_ids)
+
+    def get_course_info(self, course_id):
+        """
+        Same records as the get_course_info Cypher query, or None for unknown/placeholder courses.
+        """
+        compiled = self._compiled
+        course = compiled.course_lookup.get(course_id)
+        if course is None or compiled.course_info[course] is None:
+            return None
+        info = compiled.course_info[course]
+        return [{
+            'id': course_id,
+            'title': info['title'],
+            'units': info['units'],
+            'description': info['description'],
+        }]
+
+    def get_prerequisites(self, course_id):
+        """
+        Same records as the get_prerequisites Cypher query: [{'group_id', 'prereq_courses'}, ...].
+        """
+        compiled = self._compiled
+        course = compiled.course_lookup.get(course_id)
+        if course is None:
+            return []
+        return [
+            {
+                'group_id': compiled.group_ids[group],
+                'prereq_courses': [compiled.course_ids[prereq] for prereq in members],
+            }
+            for group, members in compiled.groups_of(course)
+        ]
+
+    def get_required_for(self, course_id):
+        """
+        Courses that list course_id in one of their prerequisite groups.
+        """
+        compiled = self._compiled
+        course = compiled.course_lookup.get(course_id)
+        if course is None:
+            return []
+        start, end = compiled.required_for_offsets[course], compiled.required_for_offsets[course + 1]
+        return [compiled.course_ids[dependent] for dependent in compiled.required_for[start:end]]
+
+    def get_dependents(self, course_ids):
+        """
+        Every course that has one of course_ids somewhere in its prerequisite chain (including course_ids).
+        """
+        compiled = self._compiled
+        seen = set(course_ids)
+        to_process = [compiled.course_lookup[c] for c in course_ids if c in compiled.course_lookup]
+        while to_process:
+            course = to_process.pop()
+            start, end = compiled.required_for_offsets[course], compiled.required_for_offsets[course + 1]
+            for dependent in compiled.required_for[start:end]:
+                if compiled.course_ids[dependent] not in seen:
+                    seen.add(compiled.course_ids[dependent])
+                    to_process.append(dependent)
+        return seen
+
+    def get_prerequisite_closure(self, course_id, max_depth=None):
+        """
+        Same result as db_retriever.get_prerequisite_closure, computed in-process.
+        """
+        compiled = self._compiled
+        root = compiled.course_lookup[course_id]
+        depth = array('i', [-1]) * len(compiled.course_ids)
+        depth[root] = 0
+        order = [root]
+        prerequisites = {}
+
+        # expand level by level in course_id order, like the batched Cypher query
+        frontier = [root]
+        level = 0
+        while frontier and (max_depth is None or level < max_depth):
+            level += 1
+            next_frontier = []
+            for course in sorted(frontier, key=compiled.course_ids.__getitem__):
+                groups = []
+                for group, members in compiled.groups_of(course):
+                    groups.append([compiled.course_ids[prereq] for prereq in members])
+                    for prereq in members:
+                        if depth[prereq] < 0:
+                            depth[prereq] = level
+                            next_frontier.append(prereq)
+                if groups:
+                    prerequisites[compiled.course_ids[course]] = groups
+            order.extend(next_frontier)
+            frontier = next_frontier
+
+        ordered = {compiled.course_ids[course]: prerequisites[compiled.course_ids[course]]
+                   for course in order if compiled.course_ids[course] in prerequisites}
+        return {
+            'course_id': course_id,
+            'prerequisites': ordered,
+            'depth': {compiled.course_ids[course]: depth[course] for course in order},
+        }
+
+    def get_milestone(self, milestone_id):
+        return self._compiled.milestones.get(milestone_id)
+
+    def milestones(self):
+        return self._compiled.milestones
@@ -1,4 +1,3 @@
-import streamlit as st
 from llm import llm
 from graph import graph
 
@@ -37,11 +36,86 @@ Cypher Query:
 cypher_prompt = PromptTemplate.from_template(CYPHER_GENERATION_TEMPLATE)
 
 # Create the Cypher QA chain
-from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain
-
-cypher_qa = GraphCypherQAChain.from_llm(
+from typing import Any, Dict, List, Optional
+
+from langchain.callbacks.manager import CallbackManagerForChainRun
+from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain, extract_cypher
+
+from tools.cypher_cache import CypherTemplateCache, load_schema
+from tools.db_retriever import catalog_version
+
+class CachedGraphCypherQAChain(GraphCypherQAChain):
+    """
+    GraphCypherQAChain that reuses generated Cypher across questions of the same shape
+    (see tools/cypher_cache.py), skipping the generation LLM call on a hit.
+    Generated queries are checked with EXPLAIN before they are cached.
+    """
+
+    template_cache: Optional[Any] = None
+
+    def _validate(self, cypher, params):
+        self.graph.query(f"EXPLAIN {cypher}", params, name="cypher_qa.explain")
+
+    def _call(
+        self,
+        inputs: Dict[str, Any],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Dict[str, Any]:
+        _run_manager = run_manager or CallbackManagerForChainRun.get_noop_manager()
+        callbacks = _run_manager.get_child()
+        question = inputs[self.input_key]
+
+        intermediate_steps: List = []
+
+        cached = self.template_cache.lookup(question) if self.template_cache is not None else None
+        if cached is not None:
+            generated_cypher, params = cached
+            _run_manager.on_text("Cached Cypher:", end="\n", verbose=self.verbose)
+        else:
+            generated_cypher = self.cypher_generation_chain.run(
+                {"question": question, "schema": self.graph_schema}, callbacks=callbacks
+            )
+            generated_cypher = extract_cypher(generated_cypher)
+            if self.cypher_query_corrector:
+                generated_cypher = self.cypher_query_corrector(generated_cypher)
+            params = {}
+            _run_manager.on_text("Generated Cypher:", end="\n", verbose=self.verbose)
+            if generated_cypher and self.template_cache is not None:
+                self.template_cache.store(question, generated_cypher, self._validate)
+
+        _run_manager.on_text(generated_cypher, color="green", end="\n", verbose=self.verbose)
+        intermediate_steps.append({"query": generated_cypher, "params": params})
+
+        # Generated Cypher be null if query corrector identifies invalid schema
+        if generated_cypher:
+            context = self.graph.query(generated_cypher, params, name="cypher_qa")[: self.top_k]
+        else:
+            context = []
+
+        if self.return_direct:
+            final_result = context
+        else:
+            _run_manager.on_text("Full Context:", end="\n", verbose=self.verbose)
+            _run_manager.on_text(str(context), color="green", end="\n", verbose=self.verbose)
+            intermediate_steps.append({"context": context})
+
+            result = self.qa_chain({"question": question, "context": context}, callbacks=callbacks)
+            final_result = result[self.qa_chain.output_key]
+
+        chain_result: Dict[str, Any] = {self.output_key: final_result}
+        if self.return_intermediate_steps:
+            chain_result["intermediate_steps"] = intermediate_steps
+        return chain_result
+
+# The schema string is built from a copy saved per catalog version instead of APOC calls on every start
+load_schema(graph, catalog_version())
+
+cypher_template_cache = CypherTemplateCache(catalog_version)
+
+cypher_qa = CachedGraphCypherQAChain.from_llm(
     llm,
     graph=graph,
     verbose=True,
-    cypher_prompt=cypher_prompt
-)
\ No newline at end of file
+    cypher_prompt=cypher_prompt,
+    template_cache=cypher_template_cache,
+)
@@ -0,0 +1,195 @@
+import os
+import re
+import json
+import pickle
+import threading
+from collections import OrderedDict
+
+from course_ids import find_course_ids
+
+TEMPLATE_PATH = ".cache/cypher_templates.json"
+SCHEMA_PATH = ".cache/graph_schema.pkl"
+
+# Major ids as used by the requirement tools, e.g. 'MA30'
+_MAJOR_ID = re.compile(r'\b[A-Z]{2}\d{2}\b')
+_STRING_LITERAL = re.compile(r"'([^'\\]*)'|\"([^\"\\]*)\"")
+
+def question_template(question):
+    """
+    Returns (template, params): the question with course and major ids replaced by placeholders,
+    lowercased and stripped of punctuation, and the ids keyed by placeholder name.
+    "What are the prerequisites for math 20c?" -> ("what are the prerequisites for <course_0>", {'course_0': 'MATH 20C'})
+    """
+    params = {}
+    template = question
+    for i, course_id in enumerate(find_course_ids(question)):
+        dept, number = course_id.split(' ')
+        template = re.sub(rf"\b{dept}\s*{number}\b", f"<course_{i}>", template, flags=re.IGNORECASE)
+        params[f"course_{i}"] = course_id
+    for i, major_id in enumerate(dict.fromkeys(_MAJOR_ID.findall(template))):
+        template = re.sub(rf"\b{major_id}\b", f"<major_{i}>", template)
+        params[f"major_{i}"] = major_id
+    template = ' '.join(re.sub(r"[^\w<>\s]", ' ', template.lower()).split())
+    return template, params
+
+def lift_literals(cypher, params):
+    """
+    Replaces the string literals of cypher that equal a param value with $param.
+    Returns the parameterized Cypher, or None if a course id literal would stay hardcoded or a
+    param is not used as $param (e.g. the id was split into STARTS WITH 'CSE' / ENDS WITH '100'),
+    in which case the query only fits the question it was generated for.
+    """
+    values = {value: name for name, value in params.items()}
+
+    def replace(match):
+        literal = match.group(1) if match.group(1) is not None else match.group(2)
+        return f"${values[literal]}" if literal in values else match.group(0)
+
+    lifted = _STRING_LITERAL.sub(replace, cypher)
+    for match in _STRING_LITERAL.finditer(lifted):
+        literal = match.group(1) if match.group(1) is not None else match.group(2)
+        if find_course_ids(literal) or _MAJOR_ID.search(literal):
+            return None
+    if any(not re.search(rf'\${re.escape(name)}\b', lifted) for name in params):
+        return None
+    return lifted
+
+class CypherTemplateCache:
+    """
+    Cache of generated Cypher by question template, so questions that differ only in course or
+    major ids ("prerequisites of CSE 100" / "prerequisites of MATH 20C") share one generated query
+    with the ids passed as parameters. Only queries that pass validation are stored.
+
+    Templates are tied to the catalog version returned by version_source() and saved to a JSON file.
+    """
+
+    def __init__(self, version_source=None, path=TEMPLATE_PATH, max_entries=500):
+        self.version_source = version_source
+        self.path = path
+        self.max_entries = max_entries
+        self.version = None
+        self.templates = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.rejected = 0
+        self._load()
+
+    def _current_version(self):
+        version = self.version_source() if self.version_source is not None else None
+        # JSON turns tuples into lists
+        return list(version) if isinstance(version, tuple) else version
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+            self.version = saved['version']
+            self.templates = OrderedDict(saved['templates'])
+        except Exception as e:
+            print(f"Ignoring unreadable Cypher template cache {self.path}: {str(e)}")
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'version': self.version, 'templates': self.templates}, f)
+        os.replace(temporary, self.path)
+
+    def _check_version(self):
+        version = self._current_version()
+        if version != self.version:
+            self.version = version
+            self.templates = OrderedDict()
+
+    def lookup(self, question):
+        """
+        Returns (cypher, params) for a question whose template was seen before, or None.
+        """
+        template, params = question_template(question)
+        with self._lock:
+            self._check_version()
+            entry = self.templates.get(template)
+            if entry is None or set(entry['params']) != set(params):
+                self.misses += 1
+                return None
+            self.templates.move_to_end(template)
+            entry['uses'] += 1
+            self.hits += 1
+            return entry['cypher'], params
+
+    def store(self, question, cypher, validate):
+        """
+        Parameterizes cypher generated for question and caches it if validate(cypher, params)
+        does not raise. Returns True if stored.
+        """
+        template, params = question_template(question)
+        lifted = lift_literals(cypher, params)
+        if lifted is None:
+            self.rejected += 1
+            return False
+        try:
+            validate(lifted, params)
+        except Exception as e:
+            print(f"Not caching Cypher for '{template}': {str(e)}")
+            self.rejected += 1
+            return False
+
+        with self._lock:
+            self._check_version()
+            self.templates[template] = {'cypher': lifted, 'params': sorted(params), 'uses': 0}
+            self.stored += 1
+            while len(self.templates) > self.max_entries:
+                self.templates.popitem(last=False)
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Could not save Cypher template cache {self.path}: {str(e)}")
+        return True
+
+    def stats(self):
+        """
+        Template reuse: each cache hit saves the Cypher generation LLM call.
+        """
+        lookups = self.hits + self.misses
+        with self._lock:
+            reused = sorted(
+                ((template, entry['uses']) for template, entry in self.templates.items() if entry['uses']),
+                key=lambda item: item[1], reverse=True,
+            )
+        return {
+            'templates': len(self.templates),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'stored': self.stored,
+            'rejected': self.rejected,
+            'llm_calls_saved': self.hits,
+            'most_reused': reused[:10],
+        }
+
+def load_schema(graph, version, path=SCHEMA_PATH):
+    """
+    Sets graph.schema and graph.structured_schema from the file saved for this catalog version,
+    or refreshes them from Neo4j (several APOC calls) and saves them.
+    """
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                saved = pickle.load(f)
+            if saved['version'] == version:
+                graph.schema, graph.structured_schema = saved['schema'], saved['structured_schema']
+                return
+        except Exception as e:
+            print(f"Ignoring unreadable schema cache {path}: {str(e)}")
+
+    graph.refresh_schema()
+    if path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'version': version, 'schema': graph.schema, 'structured_schema': graph.structured_schema}, f)
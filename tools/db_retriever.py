@@ -1,8 +1,63 @@
-import streamlit as st
-from graph import graph
+from graph import graph, aquery, run_async
 import re
+import time
+import asyncio
+from course_ids import clean_course_id, find_course_ids
+from tools.course_index import CourseGraphIndex, neo4j_version_stamp
+from tools.requirement_cache import RequirementCache
+from tools.degree_progress import DegreeProgressEngine, requirement_courses, format_progress
+from tools.schedule_planner import SchedulePlanner, format_plan
+from tools.prerequisite_analytics import (
+    analyze_catalog,
+    load_snapshot,
+    save_snapshot,
+    format_course_analytics,
+    rank_courses,
+    ranking_request,
+    format_ranking,
+)
+
+# Optional in-process CourseGraphIndex (tools/course_index.py).
+# When set, the tools below answer from it and only fall back to Neo4j for courses it does not know.
+course_index = None
+
+def use_course_index(index):
+    global course_index
+    course_index = index
+    # requirement documents are rebuilt after the index sees a catalog reload
+    index.on_change(lambda version, changed: requirement_cache.invalidate())
+
+# Without a course index, the catalog version is read from Neo4j at most this often (seconds)
+VERSION_CHECK_INTERVAL = 60
+_version_check = {'version': None, 'checked_at': None}
+
+def catalog_version():
+    if course_index is not None:
+        course_index.maybe_refresh()
+        return course_index.version
+    now = time.monotonic()
+    if _version_check['checked_at'] is None or now - _version_check['checked_at'] > VERSION_CHECK_INTERVAL:
+        _version_check['version'] = neo4j_version_stamp(graph)
+        _version_check['checked_at'] = now
+    return _version_check['version']
+
+# Major requirements and courses by milestone only change with the catalog,
+# so they are built once per catalog version (see tools/requirement_cache.py)
+requirement_cache = RequirementCache(catalog_version)
+
+def _indexed(course_id):
+    if course_index is None:
+        return None
+    course_index.maybe_refresh()
+    if course_index.has_course(course_id):
+        return course_index
+    return None
 
 def get_course_info(course_id):
+    index = _indexed(course_id)
+    if index is not None and index.get_course_info(course_id):
+        return index.get_course_info(course_id)
+
     query = """
         MATCH (c:Course {course_id: $course_id})
         RETURN 
@@ -11,30 +66,21 @@ def get_course_info(course_id):
             c.units as units,
             c.description as description
     """
-    result = graph.query(query, params={"course_id": course_id})
+    result = graph.query(query, params={"course_id": course_id}, name="get_course_info")
     if result and len(result) > 0:
         return result
     return None
 
-def get_prerequisites(course_id, _ashelper=False):
-    # Double Checks for course_id format
-    course_id = course_id.strip().replace('`', '').split('\n')[0]
-    pattern = r'^[A-Z]+\s\d+[A-Z]*$'
-    if not re.match(pattern, course_id):
-        raise ValueError('Course ID must be in format like "MATH 18" or "MATH 20C"')
+PREREQUISITES_QUERY = """
+    MATCH (c:Course {course_id: $course_id})
+    MATCH (og:OrGroup)-[:REQUIRED]->(c)
+    MATCH (prereq:Course)-[:INCLUDED_IN]->(og)
+    RETURN og.group_id as group_id, 
+        collect(prereq.course_id) as prereq_courses
+    ORDER BY og.group_id
+"""
 
-    query = """
-        MATCH (c:Course {course_id: $course_id})
-        MATCH (og:OrGroup)-[:REQUIRED]->(c)
-        MATCH (prereq:Course)-[:INCLUDED_IN]->(og)
-        RETURN og.group_id as group_id, 
-            collect(prereq.course_id) as prereq_courses
-        ORDER BY og.group_id
-    """
-    result = graph.query(query, params={"course_id": course_id})
-    
-    if _ashelper:
-        return result
+def format_prerequisites(result):
     if not result:
         return "This course has no prerequisites."
     
@@ -48,55 +94,205 @@ def get_prerequisites(course_id, _ashelper=False):
     
     return "Prerequisites: " + " AND ".join(prereq_groups)
 
-def iterative_get_prerequisites(course_id):
-    # Double Checks for course_id format
-    course_id = course_id.strip().replace('`', '').split('\n')[0]
-    pattern = r'^[A-Z]+\s\d+[A-Z]*$'
-    if not re.match(pattern, course_id):
-        raise ValueError('Course ID must be in format like "MATH 18" or "MATH 20C"')
-    
-    prereq_tree = {}
-    to_process = {course_id}
-    processed = set()
-    prereqs = []
+def get_prerequisites(course_id, _ashelper=False):
+    course_id = clean_course_id(course_id)
 
-    while to_process:
-        current_course = to_process.pop()
-        if current_course in processed:
-            continue
-            
-        result = get_prerequisites(current_course, _ashelper=True)
-        processed.add(current_course)
-        
-        if result:
-            prereq_tree[current_course] = []
-            subprereq_strings = []
-            for record in result:
-                group_id = record['group_id']
-                prereq_courses = record['prereq_courses']
-                
-                # If there's only one course in the group, don't create an OR group
-                if len(prereq_courses) == 1:
-                    prereq_tree[current_course].append(prereq_courses[0])
-                    subprereq_strings.append(f"({prereq_courses[0]})")
-                else:
-                    # Create an OR group
-                    prereq_tree[current_course].append({
-                        'type': 'OR',
-                        'courses': prereq_courses
-                    })
-                    subprereq_strings.append(f"({' or '.join(prereq_courses)})")
-                
-                # Add all prerequisites to processing queue
-                for prereq in prereq_courses:
-                    if prereq not in processed:
-                        to_process.add(prereq)
-                
-            prereqs.append(f"{current_course}: {' and '.join(subprereq_strings)}")
+    index = _indexed(course_id)
+    if index is not None:
+        result = index.get_prerequisites(course_id)
+    else:
+        result = graph.query(PREREQUISITES_QUERY, params={"course_id": course_id}, name="get_prerequisites")
     
+    if _ashelper:
+        return result
+    return format_prerequisites(result)
+
+CLOSURE_LEVEL_QUERY = """
+    UNWIND $frontier AS course_id
+    MATCH (og:OrGroup)-[:REQUIRED]->(c:Course {course_id: course_id})
+    MATCH (prereq:Course)-[:INCLUDED_IN]->(og)
+    RETURN c.course_id as course_id,
+        og.group_id as group_id,
+        collect(prereq.course_id) as prereq_courses
+    ORDER BY course_id, group_id
+"""
+
+def _expand_level(result, prerequisites, depth, level):
+    # records one BFS level into prerequisites/depth, returns the next frontier
+    next_frontier = []
+    for record in result:
+        prerequisites.setdefault(record['course_id'], []).append(record['prereq_courses'])
+        for prereq in record['prereq_courses']:
+            if prereq not in depth:
+                depth[prereq] = level
+                next_frontier.append(prereq)
+    return next_frontier
+
+def _closure(course_id, prerequisites, depth):
+    # keep BFS order for the text output
+    ordered = {course: prerequisites[course] for course in depth if course in prerequisites}
+    return {'course_id': course_id, 'prerequisites': ordered, 'depth': depth}
+
+def get_prerequisite_closure(course_id, max_depth=None):
+    """
+    Retrieves the whole prerequisite subgraph below course_id.
+    Runs one batched query per BFS level (UNWIND over the frontier) instead of
+    one query per course, so the number of round trips is bounded by the depth
+    of the prerequisite chain. max_depth=1 only returns immediate prerequisites.
+
+    Returns a dict:
+        'course_id': the requested course
+        'prerequisites': {course_id: [[OR group courses], ...]} in BFS order,
+                         only for courses that have prerequisites
+        'depth': {course_id: BFS level at which the course was first reached}
+    """
+    course_id = clean_course_id(course_id)
+
+    index = _indexed(course_id)
+    if index is not None:
+        return index.get_prerequisite_closure(course_id, max_depth=max_depth)
+
+    prerequisites = {}
+    depth = {course_id: 0}
+    frontier = [course_id]
+    level = 0
+
+    while frontier and (max_depth is None or level < max_depth):
+        result = graph.query(CLOSURE_LEVEL_QUERY, params={"frontier": frontier}, name="get_prerequisite_closure")
+        level += 1
+        frontier = _expand_level(result, prerequisites, depth, level)
+
+    return _closure(course_id, prerequisites, depth)
+
+def format_prerequisite_closure(closure):
+    prereqs = []
+    for course, groups in closure['prerequisites'].items():
+        subprereq_strings = [f"({' or '.join(courses)})" for courses in groups]
+        prereqs.append(f"{course}: {' and '.join(subprereq_strings)}")
     return '\n'.join(prereqs)
 
+def iterative_get_prerequisites(course_id, max_depth=None, structured=False):
+    """
+    Retrieves ALL prerequisites of course_id, one line per course in the chain:
+    "MATH 20C: (MATH 20B)". Set structured=True to get the closure dict
+    from get_prerequisite_closure instead of text.
+    """
+    closure = get_prerequisite_closure(course_id, max_depth=max_depth)
+    if structured:
+        return closure
+    return format_prerequisite_closure(closure)
+
+# Async and batch variants.
+# A question about several courses is answered by one tool call: the per-course lookups run
+# concurrently on the async Neo4j driver (graph.run_async), so wall time is that of the slowest
+# course instead of the sum. Courses in the course index are answered from memory as above.
+
+def course_id_list(course_ids):
+    """
+    Accepts a list of course ids or free text like "CSE 100, CSE 101 and MATH 184".
+    Returns the cleaned course ids, without duplicates.
+    """
+    if isinstance(course_ids, str):
+        found = find_course_ids(course_ids)
+        return found if found else [clean_course_id(course_ids)]
+    cleaned = []
+    for course_id in course_ids:
+        course_id = clean_course_id(course_id)
+        if course_id not in cleaned:
+            cleaned.append(course_id)
+    return cleaned
+
+async def aget_prerequisites(course_id, _ashelper=False):
+    course_id = clean_course_id(course_id)
+
+    index = _indexed(course_id)
+    if index is not None:
+        result = index.get_prerequisites(course_id)
+    else:
+        result = await aquery(PREREQUISITES_QUERY, {"course_id": course_id}, name="get_prerequisites")
+
+    if _ashelper:
+        return result
+    return format_prerequisites(result)
+
+async def aget_prerequisite_closure(course_id, max_depth=None):
+    """
+    Async version of get_prerequisite_closure, same return value.
+    """
+    course_id = clean_course_id(course_id)
+
+    index = _indexed(course_id)
+    if index is not None:
+        return index.get_prerequisite_closure(course_id, max_depth=max_depth)
+
+    prerequisites = {}
+    depth = {course_id: 0}
+    frontier = [course_id]
+    level = 0
+
+    while frontier and (max_depth is None or level < max_depth):
+        result = await aquery(CLOSURE_LEVEL_QUERY, {"frontier": frontier}, name="get_prerequisite_closure")
+        level += 1
+        frontier = _expand_level(result, prerequisites, depth, level)
+
+    return _closure(course_id, prerequisites, depth)
+
+async def aget_prerequisites_batch(course_ids):
+    """
+    Immediate prerequisites of several courses, fetched concurrently.
+    Returns one line per course: "CSE 100: Prerequisites: CSE 12 AND ...".
+    """
+    course_ids = course_id_list(course_ids)
+    results = await asyncio.gather(*(aget_prerequisites(course_id) for course_id in course_ids))
+    return '\n'.join(f"{course_id}: {result}" for course_id, result in zip(course_ids, results))
+
+async def aget_prerequisite_closures(course_ids, max_depth=None):
+    """
+    Prerequisite closures of several courses, fetched concurrently.
+    Returns {course_id: closure dict} in the order given.
+    """
+    course_ids = course_id_list(course_ids)
+    closures = await asyncio.gather(*(aget_prerequisite_closure(course_id, max_depth) for course_id in course_ids))
+    return dict(zip(course_ids, closures))
+
+def format_prerequisite_closures(closures):
+    # one line per course across all chains; courses shared by several chains are listed once
+    merged = {}
+    no_prereqs = []
+    for course_id, closure in closures.items():
+        if not closure['prerequisites']:
+            no_prereqs.append(course_id)
+        for course, groups in closure['prerequisites'].items():
+            merged.setdefault(course, groups)
+    lines = [format_prerequisite_closure({'prerequisites': merged})] if merged else []
+    lines.extend(f"{course_id}: no prerequisites" for course_id in no_prereqs)
+    return '\n'.join(lines)
+
+def get_prerequisites_batch(course_ids):
+    """
+    Retrieves the immediate prerequisites of several courses in one call.
+    course_ids is a list or free text mentioning the courses.
+    """
+    return run_async(aget_prerequisites_batch(course_ids))
+
+def iterative_get_prerequisites_batch(course_ids, max_depth=None, structured=False):
+    """
+    Retrieves ALL prerequisites of several courses in one call, as one combined list of
+    "MATH 20C: (MATH 20B)" lines. Set structured=True to get {course_id: closure dict}.
+    """
+    closures = run_async(aget_prerequisite_closures(course_ids, max_depth=max_depth))
+    if structured:
+        return closures
+    return format_prerequisite_closures(closures)
+
 def get_courses_by_milestone(dummy=None):
+    """
+    Courses of every milestone, by milestone title: course ids taken directly,
+    then lists of courses for each sequence path. Cached per catalog version.
+    """
+    return requirement_cache.get(('courses_by_milestone',), build_courses_by_milestone)
+
+def build_courses_by_milestone():
     # Cypher query to get course IDs grouped by milestone titles
     query_courses = """
         MATCH (c:Course)-[:INCLUDED_IN]->(m: Milestone)
@@ -123,39 +319,29 @@ def get_courses_by_milestone(dummy=None):
         ORDER BY milestone_id
         """
     
-    result_courses = graph.query(query_courses)
-    result_orgroups = graph.query(query_orgroups)
+    result_courses = graph.query(query_courses, name="get_courses_by_milestone.query_courses")
+    result_orgroups = graph.query(query_orgroups, name="get_courses_by_milestone.query_orgroups")
 
-    
     formatted_results = {}
 
     # Process direct courses
     for record in result_courses:
-        title = record["title"]
-        courses = record["course_ids"]
-
-        # Initialize the title if not present
-        if title not in formatted_results:
-            formatted_results[title] = []
+        formatted_results.setdefault(record["title"], []).extend(record["course_ids"])
 
-        # Add direct courses to the list
-        formatted_results[title].extend(courses)
-
-    # Process grouped courses
+    # Process grouped courses (as lists)
     for record in result_orgroups:
-        title = record["title"]
-        grouped_courses = record["grouped_courses"]
-
-        # Initialize the title if not present
-        if title not in formatted_results:
-            formatted_results[title] = []
-
-        # Add grouped courses (as lists) to the list
-        formatted_results[title].extend(grouped_courses)
+        formatted_results.setdefault(record["title"], []).extend(record["grouped_courses"])
 
     return formatted_results
 
 def get_major_requirements(major_id):
+    """
+    Requirement document of a major: divisions, and for each the requirements with the courses
+    or sequence paths to select from. Cached per catalog version.
+    """
+    return requirement_cache.get(('major_requirements', major_id), lambda: build_major_requirements(major_id))
+
+def build_major_requirements(major_id):
     requirements = {}
 
     # First query: Get direct course requirements
@@ -171,7 +357,7 @@ def get_major_requirements(major_id):
     """
 
     # Process direct course requirements
-    direct_results = graph.query(direct_query, params={"major_id": major_id})
+    direct_results = graph.query(direct_query, params={"major_id": major_id}, name="get_major_requirements.direct_query")
     
     record = direct_results[0]
     requirements['major ID'] = major_id
@@ -179,15 +365,23 @@ def get_major_requirements(major_id):
     requirements['description'] = record['major.description']
     requirements['curriculum'] = []
 
-    for record in direct_results:
+    # index into the curriculum: division id -> division, (division id, study) -> requirement
+    divisions = {}
+    studies = {}
+
+    def find_division(record):
         current_div = record['division']
-        # find division
-        if not any(div['division']==current_div for div in requirements['curriculum']):
-            requirements['curriculum'].append({
+        if current_div not in divisions:
+            divisions[current_div] = {
                 'division': current_div, 
                 'description': record['div.description'], 
                 'requirements': []
-            })
+            }
+            requirements['curriculum'].append(divisions[current_div])
+        return divisions[current_div]
+
+    for record in direct_results:
+        div = find_division(record)
         
         # set units as needed criteria
         if record['units_needed']==0:
@@ -195,14 +389,14 @@ def get_major_requirements(major_id):
         else:
             needed = f"{record['units_needed']} units"
 
-        for div in requirements['curriculum']:
-            if div['division']==current_div:
-                div['requirements'].append({
-                    'study': record['requirement'], 
-                    'description': record['require.description'],
-                    'needed to satisfy': needed,
-                    'select from': record['select_from_courses']
-                })
+        study = {
+            'study': record['requirement'], 
+            'description': record['require.description'],
+            'needed to satisfy': needed,
+            'select from': record['select_from_courses']
+        }
+        div['requirements'].append(study)
+        studies.setdefault((div['division'], record['requirement']), study)
     
     # Second query: Get OR group requirements
     or_group_query = """
@@ -219,35 +413,171 @@ def get_major_requirements(major_id):
     """
     
     # Process requirements with sequence options
-    or_group_results = graph.query(or_group_query, params={"major_id": major_id})
+    or_group_results = graph.query(or_group_query, params={"major_id": major_id}, name="get_major_requirements.or_group_query")
     for record in or_group_results:
-        current_div = record['division']
-        # find division
-        if not any(div['division']==current_div for div in requirements['curriculum']):
-            requirements['curriculum'].append({
-                'division': current_div, 
-                'description': record['div.description'], 
-                'requirements': []
-            })
-        
+        div = find_division(record)
+        key = (div['division'], record['requirement'])
+
         # since sequences are being offered, no units requirement are here
-        needed = 'one sequence path'
-
-        # check if current division is recorded
-        for div in requirements['curriculum']:
-            if div['division']==current_div:
-                current_requirement = record['requirement']
-                # check if current requirement is recorded
-                if not any(study['study']==current_requirement for study in div['requirements']):
-                    div['requirements'].append({
-                        'study': record['requirement'], 
-                        'description': record['require.description'],
-                        'needed to satisfy': needed,
-                        'select from': []
-                    })
-                
-                for study in div['requirements']:
-                    if study['study']==current_requirement:
-                        study['select from'].append(tuple(record['select_from_courses']))
+        if key not in studies:
+            studies[key] = {
+                'study': record['requirement'], 
+                'description': record['require.description'],
+                'needed to satisfy': 'one sequence path',
+                'select from': []
+            }
+            div['requirements'].append(studies[key])
+
+        studies[key]['select from'].append(tuple(record['select_from_courses']))
     
-    return requirements
\ No newline at end of file
+    return requirements
+
+def get_major_requirement_index(major_id):
+    """
+    The major requirement document indexed by division id and requirement title:
+    {division: {study: requirement}}. Cached per catalog version.
+    """
+    def build():
+        document = get_major_requirements(major_id)
+        return {
+            div['division']: {study['study']: study for study in div['requirements']}
+            for div in document['curriculum']
+        }
+    return requirement_cache.get(('major_requirement_index', major_id), build)
+
+COURSE_UNITS_QUERY = """
+    UNWIND $course_ids AS course_id
+    MATCH (c:Course {course_id: course_id})
+    RETURN c.course_id as course_id, c.units as units
+"""
+
+def get_course_units(course_ids):
+    """
+    Units of each course as {course_id: units}, from the course index when possible,
+    with one query for the rest.
+    """
+    units = {}
+    missing = []
+    for course_id in course_ids:
+        index = _indexed(course_id)
+        info = index.get_course_info(course_id) if index is not None else None
+        if info:
+            units[course_id] = info[0]['units']
+        else:
+            missing.append(course_id)
+    if missing:
+        for record in graph.query(COURSE_UNITS_QUERY, params={"course_ids": missing}, name="get_course_units"):
+            units[record['course_id']] = record['units']
+    return units
+
+def get_degree_progress_engine(major_id):
+    """
+    DegreeProgressEngine for a major, compiled once per catalog version.
+    """
+    def build():
+        document = get_major_requirements(major_id)
+        return DegreeProgressEngine(document, get_course_units(requirement_courses(document)))
+    return requirement_cache.get(('degree_progress', major_id), build)
+
+def evaluate_degree_progress(major_id, completed_courses):
+    """
+    Satisfied and remaining requirements of a major for a list of completed course ids (see DegreeProgressEngine.evaluate).
+    """
+    return get_degree_progress_engine(major_id).evaluate(course_id_list(completed_courses))
+
+def _major_id(text, default='MA30'):
+    # major ids look like 'MA30'; MA30 is the only major loaded
+    major = re.search(r'\b[A-Z]{2}\d{2}\b', text)
+    return major.group(0) if major else default
+
+def get_degree_progress(text):
+    """
+    Tool entry point. text names the major id and the completed courses,
+    e.g. "MA30: MATH 18, MATH 20A, CSE 11". The major defaults to MA30, the only one loaded.
+    """
+    completed = find_course_ids(text)
+
+    engine = get_degree_progress_engine(_major_id(text))
+    report = engine.evaluate(completed)
+    next_courses = engine.what_if(completed, engine.courses)
+    return format_progress(report, next_courses)
+
+def get_schedule_planner(course_ids):
+    """
+    SchedulePlanner over the prerequisite chains of course_ids, fetched in one batch.
+    """
+    closures = iterative_get_prerequisites_batch(course_ids, structured=True)
+    prerequisites = {}
+    for closure in closures.values():
+        prerequisites.update(closure['prerequisites'])
+    courses = set(closures) | set(prerequisites)
+    for groups in prerequisites.values():
+        for group in groups:
+            courses.update(group)
+    return SchedulePlanner(prerequisites, get_course_units(sorted(courses)))
+
+def plan_schedule(text):
+    """
+    Tool entry point. text names either target courses or a major id, and the completed courses after
+    a "completed:" label, in their own clause or sentence:
+        "CSE 100, MATH 184; completed: CSE 11, MATH 20A"
+        "MA30; completed: MATH 18, CSE 11"   (plans the remaining requirements of the major)
+    """
+    wanted, completed_text = [], []
+    for clause in re.split(r'[;\n]|\.\s', text):
+        label = re.search(r'\bcompleted\s*:', clause, flags=re.IGNORECASE)
+        if label:
+            wanted.append(clause[:label.start()])
+            completed_text.append(clause[label.end():])
+        else:
+            wanted.append(clause)
+    wanted, completed = ' '.join(wanted), find_course_ids(' '.join(completed_text))
+    targets = find_course_ids(wanted)
+
+    notes = []
+    if targets:
+        planner = get_schedule_planner(targets)
+        unknown = [course_id for course_id in targets if course_id not in planner.units]
+        if unknown:
+            notes.append(f"Not in the catalog, left out of the plan: {', '.join(unknown)}")
+            targets = [course_id for course_id in targets if course_id not in unknown]
+    else:
+        major_id = _major_id(wanted, default=None)
+        if major_id is None:
+            return ("Input format error: name the target course ids or a major id, then the completed courses, "
+                    "e.g. 'CSE 100, MATH 184; completed: CSE 11, MATH 20A' or 'MA30; completed: MATH 18, CSE 11'.")
+        engine = get_degree_progress_engine(major_id)
+        planner = get_schedule_planner(engine.courses)
+        targets = planner.requirement_targets(engine, completed)
+    return '\n'.join([format_plan(planner.plan(targets, completed))] + notes)
+
+def get_prerequisite_analytics():
+    """
+    Prerequisite analytics of the whole catalog (see tools/prerequisite_analytics.py), built once per
+    catalog version: read from the snapshot written by catalog_analytics.py, or computed here and saved.
+    """
+    return requirement_cache.get(('prerequisite_analytics',), build_prerequisite_analytics)
+
+def build_prerequisite_analytics():
+    version = catalog_version()
+    analytics = load_snapshot(version)
+    if analytics is None:
+        analytics = analyze_catalog(course_index if course_index is not None else CourseGraphIndex.from_neo4j(graph))
+        try:
+            save_snapshot(analytics, version)
+        except OSError as e:
+            print(f"Could not save the prerequisite analytics snapshot: {str(e)}")
+    return analytics
+
+def get_course_analytics(text):
+    """
+    Tool entry point. For the courses named in text: prerequisite chain depth and the fastest chain,
+    quarters needed from scratch, and how many courses they unlock. Without a course id, ranks catalog
+    courses instead, e.g. "lower-division CSE courses that unlock the most" or "deepest MATH chains".
+    """
+    analytics = get_prerequisite_analytics()
+    course_ids = find_course_ids(text)
+    if course_ids:
+        return format_course_analytics(analytics, course_ids)
+    by, department, division = ranking_request(analytics, text)
+    return format_ranking(analytics, rank_courses(analytics, by, department, division), by)
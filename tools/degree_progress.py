@@ -0,0 +1,202 @@
+import re
+
+import numpy as np
+
+# Units assumed for courses the catalog has no units for (typical UCSD course)
+DEFAULT_UNITS = 4.0
+
+def requirement_courses(document):
+    """
+    Every course id named in a major requirement document, in order of appearance.
+    """
+    courses = []
+    for div in document['curriculum']:
+        for study in div['requirements']:
+            for option in study['select from']:
+                for course_id in (option if isinstance(option, tuple) else (option,)):
+                    if course_id not in courses:
+                        courses.append(course_id)
+    return courses
+
+class DegreeProgressEngine:
+    """
+    Evaluates sets of completed courses against one major's requirement document
+    (as returned by db_retriever.get_major_requirements).
+
+    Courses of the major are numbered, and each set of completed courses becomes a row of 0/1 bits
+    over them. Requirements compile to bit masks over the same courses:
+        'one course'         satisfied by any course of the requirement
+        'N units'            satisfied when the units of completed courses reach N
+        'one sequence path'  satisfied when every course of one path (OR group) is completed
+    A requirement with both courses and paths is satisfied by either rule. Evaluating many students
+    or what-if scenarios is then a few matrix products over the stacked rows.
+    """
+
+    def __init__(self, document, course_units=None):
+        course_units = course_units or {}
+        self.major_id = document['major ID']
+        self.title = document['title']
+        self.courses = requirement_courses(document)
+        self.course_lookup = {course_id: i for i, course_id in enumerate(self.courses)}
+        self.units = np.array(
+            [course_units.get(course_id) or DEFAULT_UNITS for course_id in self.courses], dtype=np.float32)
+
+        self.requirements = []
+        course_masks = []
+        needed_units = []
+        needs_one_course = []
+        paths = []
+        path_requirement = []
+        for div in document['curriculum']:
+            for study in div['requirements']:
+                index = len(self.requirements)
+                self.requirements.append({
+                    'division': div['division'],
+                    'study': study['study'],
+                    'needed to satisfy': study['needed to satisfy'],
+                    'courses': [option for option in study['select from'] if not isinstance(option, tuple)],
+                    'paths': [list(option) for option in study['select from'] if isinstance(option, tuple)],
+                })
+
+                mask = np.zeros(len(self.courses), dtype=np.uint8)
+                for course_id in self.requirements[-1]['courses']:
+                    mask[self.course_lookup[course_id]] = 1
+                course_masks.append(mask)
+
+                units = re.match(r'([\d.]+) units', study['needed to satisfy'])
+                needed_units.append(float(units.group(1)) if units else 0.0)
+                needs_one_course.append(not units and mask.any())
+
+                for path in self.requirements[-1]['paths']:
+                    path_mask = np.zeros(len(self.courses), dtype=np.uint8)
+                    for course_id in path:
+                        path_mask[self.course_lookup[course_id]] = 1
+                    paths.append(path_mask)
+                    path_requirement.append(index)
+
+        shape = (0, len(self.courses))
+        self.course_masks = np.array(course_masks, dtype=np.uint8).reshape(-1, len(self.courses))
+        self.needed_units = np.array(needed_units, dtype=np.float32)
+        self.needs_one_course = np.array(needs_one_course, dtype=bool)
+        self.path_masks = np.array(paths, dtype=np.uint8).reshape(-1, len(self.courses)) if paths else np.zeros(shape, dtype=np.uint8)
+        self.path_sizes = self.path_masks.sum(axis=1)
+        self.path_requirement = np.array(path_requirement, dtype=np.int64)
+        # requirement x path incidence, to reduce "any path complete" per requirement
+        self.path_incidence = np.zeros((len(self.requirements), len(paths)), dtype=np.int32)
+        self.path_incidence[self.path_requirement, np.arange(len(paths))] = 1
+
+    def encode(self, completed_sets):
+        """
+        Stacks sets of completed course ids into a (students x courses) 0/1 matrix.
+        Courses that do not count toward the major are ignored.
+        """
+        bits = np.zeros((len(completed_sets), len(self.courses)), dtype=np.uint8)
+        for row, completed in enumerate(completed_sets):
+            columns = [self.course_lookup[course_id] for course_id in completed if course_id in self.course_lookup]
+            bits[row, columns] = 1
+        return bits
+
+    def evaluate_bits(self, bits):
+        """
+        Returns (satisfied, units, paths_done) for a (students x courses) 0/1 matrix:
+            satisfied:  (students x requirements) bool
+            units:      (students x requirements) units completed toward each requirement
+            paths_done: (students x paths) number of completed courses of each path
+        """
+        bits = bits.astype(np.float32)
+        units = bits @ (self.course_masks * self.units).T
+        courses_done = bits @ self.course_masks.T
+        paths_done = bits @ self.path_masks.T
+        path_complete = (paths_done >= self.path_sizes) & (self.path_sizes > 0)
+
+        satisfied = np.zeros(units.shape, dtype=bool)
+        satisfied |= (self.needed_units > 0) & (units >= self.needed_units)
+        satisfied |= self.needs_one_course & (courses_done >= 1)
+        satisfied |= (path_complete.astype(np.int32) @ self.path_incidence.T) > 0
+        return satisfied, units, paths_done
+
+    def evaluate_batch(self, completed_sets):
+        """
+        (students x requirements) bool matrix of satisfied requirements, one row per set of completed courses.
+        """
+        return self.evaluate_bits(self.encode(completed_sets))[0]
+
+    def evaluate(self, completed):
+        """
+        Progress report for one set of completed course ids:
+            'satisfied': requirements met
+            'remaining': requirements not met, with units so far, the courses left to choose from,
+                         and for sequence requirements the missing courses of the closest path
+        """
+        completed = set(completed)
+        satisfied, units, paths_done = self.evaluate_bits(self.encode([completed]))
+        report = {
+            'major ID': self.major_id,
+            'title': self.title,
+            'requirements satisfied': int(satisfied[0].sum()),
+            'requirements total': len(self.requirements),
+            'satisfied': [],
+            'remaining': [],
+        }
+        for index, requirement in enumerate(self.requirements):
+            entry = {
+                'division': requirement['division'],
+                'study': requirement['study'],
+                'needed to satisfy': requirement['needed to satisfy'],
+            }
+            if satisfied[0, index]:
+                entry['completed'] = [course_id for course_id in requirement['courses'] if course_id in completed]
+                report['satisfied'].append(entry)
+                continue
+
+            if self.needed_units[index] > 0:
+                entry['units completed'] = float(units[0, index])
+            if requirement['courses']:
+                entry['select from'] = [course_id for course_id in requirement['courses'] if course_id not in completed]
+            if requirement['paths']:
+                path_indexes = np.flatnonzero(self.path_requirement == index)
+                closest = path_indexes[np.argmax(paths_done[0, path_indexes] / self.path_sizes[path_indexes])]
+                path = requirement['paths'][list(path_indexes).index(closest)]
+                entry['closest path'] = path
+                entry['missing from closest path'] = [course_id for course_id in path if course_id not in completed]
+            report['remaining'].append(entry)
+        return report
+
+    def what_if(self, completed, candidates):
+        """
+        For each candidate course, the requirements that taking it next would newly satisfy.
+        All candidates are evaluated in one batch. Returns {course_id: [study, ...]} for useful candidates.
+        """
+        completed = set(completed)
+        candidates = [course_id for course_id in candidates if course_id not in completed]
+        satisfied = self.evaluate_batch([completed] + [completed | {course_id} for course_id in candidates])
+        gained = satisfied[1:] & ~satisfied[0]
+        return {
+            course_id: [self.requirements[index]['study'] for index in np.flatnonzero(row)]
+            for course_id, row in zip(candidates, gained) if row.any()
+        }
+
+def format_progress(report, next_courses=None):
+    lines = [f"{report['title']} ({report['major ID']}): "
+             f"{report['requirements satisfied']} of {report['requirements total']} requirements satisfied."]
+    if report['satisfied']:
+        lines.append("Satisfied:")
+        for entry in report['satisfied']:
+            lines.append(f"- {entry['division']} / {entry['study']}")
+    if report['remaining']:
+        lines.append("Remaining:")
+        for entry in report['remaining']:
+            line = f"- {entry['division']} / {entry['study']} (needs {entry['needed to satisfy']}"
+            if 'units completed' in entry:
+                line += f", {entry['units completed']:g} units so far"
+            line += ")"
+            if entry.get('select from'):
+                line += f"; select from {', '.join(entry['select from'])}"
+            if entry.get('missing from closest path'):
+                line += f"; closest path {' + '.join(entry['closest path'])} is missing {', '.join(entry['missing from closest path'])}"
+            lines.append(line)
+    if next_courses:
+        lines.append("Courses that would complete a requirement next:")
+        for course_id, studies in next_courses.items():
+            lines.append(f"- {course_id}: {', '.join(studies)}")
+    return '\n'.join(lines)
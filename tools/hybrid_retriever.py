@@ -0,0 +1,174 @@
+import re
+import math
+
+import numpy as np
+
+from course_ids import find_course_ids
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+class BM25Index:
+    """
+    BM25 over a fixed list of texts, as an inverted index of numpy arrays:
+    term -> (document numbers, term frequencies).
+    """
+
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+        postings = {}
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[doc] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, ([], []))
+                postings[token][0].append(doc)
+                postings[token][1].append(count)
+
+        average = lengths.mean() if len(texts) else 0.0
+        # per-document length normalization, computed once
+        self.norms = k1 * (1 - b + b * lengths / average) if average else np.full(len(texts), k1, dtype=np.float32)
+        self.postings = {
+            token: (np.array(docs, dtype=np.int32), np.array(counts, dtype=np.float32))
+            for token, (docs, counts) in postings.items()
+        }
+        self.idf = {
+            token: math.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, (docs, _) in self.postings.items()
+        }
+
+    def scores(self, query):
+        scores = np.zeros(self.size, dtype=np.float32)
+        for token in set(tokenize(query)):
+            if token not in self.postings:
+                continue
+            docs, counts = self.postings[token]
+            scores[docs] += self.idf[token] * counts * (self.k1 + 1) / (counts + self.norms[docs])
+        return scores
+
+def _ranking(scores, limit):
+    # indexes of the `limit` best positive scores, best first
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+class HybridCourseRetriever:
+    """
+    "Find courses about X" over the catalog, without a database round trip per query.
+
+    Each course's title and description are searched two ways:
+        dense: cosine similarity against a numpy matrix of normalized embeddings
+        BM25:  keyword scores from an inverted index
+    and the two rankings are merged with reciprocal-rank fusion (score = sum of 1 / (rrf_k + rank)).
+    Prerequisites and required_for are copied from the course index when the retriever is built,
+    so results carry graph metadata without per-result queries.
+
+    course_index is a CourseGraphIndex; the retriever rebuilds itself when the index's version changes.
+    """
+
+    def __init__(self, course_index, embeddings, rrf_k=60, candidates=50):
+        self.course_index = course_index
+        self.embeddings = embeddings
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+        self.version = None
+        self.build()
+
+    def build(self):
+        index = self.course_index
+        courses = []
+        for course_id in index.course_ids():
+            info = index.get_course_info(course_id)
+            # placeholders (courses only referenced as prerequisites) have no text to search
+            if not info or not (info[0]['title'] or info[0]['description']):
+                continue
+            courses.append({
+                'course_id': course_id,
+                'title': info[0]['title'],
+                'units': info[0]['units'],
+                'description': info[0]['description'],
+                'prerequisites': [record['prereq_courses'] for record in index.get_prerequisites(course_id)],
+                'required_for': index.get_required_for(course_id),
+            })
+
+        texts = [f"{course['course_id']} {course['title']}. {course['description']}" for course in courses]
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        lookup = {course['course_id']: i for i, course in enumerate(courses)}
+        # swapped in one assignment so searches never mix two builds
+        self._state = (courses, lookup, vectors / norms, BM25Index(texts))
+        self.version = index.version
+
+    @property
+    def courses(self):
+        return self._state[0]
+
+    def maybe_rebuild(self):
+        self.course_index.maybe_refresh()
+        if self.course_index.version != self.version:
+            self.build()
+
+    def dense_ranking(self, query, limit, state=None):
+        vectors = (state or self._state)[2]
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        scores = vectors @ (vector / norm if norm else vector)
+        # shift so every course stays a candidate, cosine scores can be negative
+        return _ranking(scores - scores.min() + 1e-6, limit)
+
+    def keyword_ranking(self, query, limit, state=None):
+        return _ranking((state or self._state)[3].scores(query), limit)
+
+    def search(self, query, k=5, mode='hybrid'):
+        """
+        Returns the k best courses for query as dicts (course_id, title, units, description,
+        prerequisites, required_for, score). mode is 'hybrid', 'dense' or 'keyword'.
+        Course ids named in the query rank first.
+        """
+        self.maybe_rebuild()
+        state = self._state
+        courses, lookup = state[0], state[1]
+        limit = max(k, self.candidates)
+        rankings = []
+        if mode in ('hybrid', 'dense'):
+            rankings.append(self.dense_ranking(query, limit, state))
+        if mode in ('hybrid', 'keyword'):
+            rankings.append(self.keyword_ranking(query, limit, state))
+
+        fused = {}
+        for ranking in rankings:
+            for rank, doc in enumerate(ranking):
+                fused[doc] = fused.get(doc, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+        for course_id in find_course_ids(query):
+            if course_id in lookup:
+                fused[lookup[course_id]] = fused.get(lookup[course_id], 0.0) + 1.0
+
+        best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [{**courses[doc], 'score': round(score, 4)} for doc, score in best]
+
+def format_courses(results, description_chars=300):
+    lines = []
+    for course in results:
+        prerequisites = ' AND '.join(
+            group[0] if len(group) == 1 else f"({' OR '.join(group)})" for group in course['prerequisites'])
+        description = course['description'] or ''
+        if len(description) > description_chars:
+            description = description[:description_chars].rsplit(' ', 1)[0] + '...'
+        units = f" ({course['units']:g} units)" if course['units'] is not None else ''
+        lines.append(
+            f"{course['course_id']}: {course['title']}{units}. "
+            f"Prerequisites: {prerequisites or 'none'}. "
+            f"Required for: {', '.join(course['required_for']) or 'none'}. {description}"
+        )
+    return '\n'.join(lines) if lines else "No matching courses found."
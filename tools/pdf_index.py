@@ -0,0 +1,258 @@
+"""
+Builds and loads the FAISS index used by tools/pdf_reader.py.
+
+The catalogs are split into one chunk per course entry ("CSE 12. Basic Data Structures ... (4)"
+up to the next course header), with the course id in the chunk metadata, so a question about a
+course can be answered from its entry alone.
+
+The index is built offline and saved to resources/pdf_index together with a manifest
+of content hashes for every PDF and chunk. Rebuilding only re-embeds chunks whose text
+changed; unchanged PDFs are not even re-parsed.
+
+    python -m tools.pdf_index            # build/update with the OpenAI embeddings from llm.py
+    python -m tools.pdf_index --fake 64  # deterministic local embeddings, no API calls
+"""
+import os
+import re
+import json
+import pickle
+import hashlib
+import argparse
+from bisect import bisect_right
+
+import faiss
+from langchain_community.document_loaders import PyPDFLoader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from course_ids import find_course_ids
+
+PDF_PATHS = ["resources/CSE-Catalog.pdf", "resources/Math-Catalog.pdf"]
+INDEX_DIRECTORY = "resources/pdf_index"
+MANIFEST_NAME = "manifest.json"
+# Bump when split_pdf changes, so existing indexes are re-split
+CHUNKER_VERSION = "course-entries-1"
+# Longer entries (and the text before the first course) fall back to the recursive splitter
+MAX_ENTRY_CHARS = 1500
+# Chunks are whole course entries, so fewer of them are needed than the default 4
+SEARCH_K = 3
+
+# "MATH 20C. Calculus and Analytic Geometry for Science and Engineering (4)" at the start of a line;
+# requiring the units keeps prerequisite lists that wrap onto a new line from matching
+COURSE_HEADER = re.compile(r'^([A-Z]{2,5}) (\d+[A-Z]{0,2})\. (.+?) \(([^()]*\d[^()]*)\)(?=\s|$)', re.M)
+# Browser print header and footer repeated on every page
+PAGE_CHROME = re.compile(r'^(\d{1,2}/\d{1,2}/\d{2}, \d{1,2}:\d{2} [AP]M .*|https?://\S+ \d+/\d+)\n?', re.M)
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def chunk_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def embedding_model_name(embeddings):
+    # name the real model, not the embedding cache wrapped around it
+    embeddings = getattr(embeddings, 'underlying', embeddings)
+    return f"{type(embeddings).__name__}:{getattr(embeddings, 'model', '')}:{getattr(embeddings, 'size', '')}"
+
+def split_pdf_pages(path, chunk_size=500, chunk_overlap=50):
+    # the original page-by-page splitter, kept for comparison (benchmarks/pdf_chunking.py)
+    documents = PyPDFLoader(path).load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return text_splitter.split_documents(documents)
+
+def split_pdf(path):
+    """
+    Splits a catalog PDF into one Document per course entry, with metadata source, page,
+    course_id and title. Entries spanning a page break stay whole.
+    """
+    text = ''
+    page_starts = []
+    for page in PyPDFLoader(path).load():
+        page_starts.append(len(text))
+        text += PAGE_CHROME.sub('', page.page_content).rstrip('\n') + '\n'
+
+    headers = list(COURSE_HEADER.finditer(text))
+    sections = [(0, headers[0].start() if headers else len(text), None)]
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        sections.append((header.start(), end, header))
+
+    fallback = RecursiveCharacterTextSplitter(chunk_size=MAX_ENTRY_CHARS, chunk_overlap=100)
+    documents = []
+    for start, end, header in sections:
+        content = text[start:end].strip()
+        if not content:
+            continue
+        metadata = {'source': path, 'page': bisect_right(page_starts, start) - 1}
+        if header is not None:
+            metadata['course_id'] = f"{header.group(1)} {header.group(2)}"
+            metadata['title'] = header.group(3)
+        if len(content) <= MAX_ENTRY_CHARS:
+            documents.append(Document(page_content=content, metadata=metadata))
+        else:
+            documents.extend(fallback.create_documents([content], [metadata]))
+    return documents
+
+def course_entries(vector_store):
+    """
+    Returns {course_id: [Document, ...]} for the course entry chunks of a loaded index.
+    """
+    entries = {}
+    for doc_id in vector_store.index_to_docstore_id.values():
+        document = vector_store.docstore.search(doc_id)
+        course_id = document.metadata.get('course_id')
+        if course_id:
+            entries.setdefault(course_id, []).append(document)
+    return entries
+
+class CourseEntryRetriever(BaseRetriever):
+    """
+    Questions naming catalog courses get exactly those courses' entries, looked up by id;
+    only questions that name none go through vector search.
+    """
+    entries: dict
+    search: BaseRetriever
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        documents = [document for course_id in find_course_ids(query) for document in self.entries.get(course_id, [])]
+        if documents:
+            return documents
+        return self.search.invoke(query, config={'callbacks': run_manager.get_child()})
+
+def course_entry_retriever(vector_store, k=SEARCH_K):
+    return CourseEntryRetriever(entries=course_entries(vector_store), search=vector_store.as_retriever(search_kwargs={'k': k}))
+
+def load_manifest(directory=INDEX_DIRECTORY):
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def load_index(embeddings, directory=INDEX_DIRECTORY, mmap=True):
+    """
+    Loads a saved index. With mmap=True the FAISS vectors are memory-mapped instead of read into memory.
+    Only load indexes built by build_index: the docstore is a pickle.
+    """
+    flags = faiss.IO_FLAG_MMAP if mmap else 0
+    index = faiss.read_index(os.path.join(directory, "index.faiss"), flags)
+    with open(os.path.join(directory, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+def index_is_current(embeddings, pdf_paths=PDF_PATHS, directory=INDEX_DIRECTORY):
+    manifest = load_manifest(directory)
+    if manifest is None or manifest['embedding_model'] != embedding_model_name(embeddings):
+        return False
+    if manifest.get('chunker') != CHUNKER_VERSION:
+        return False
+    if sorted(manifest['pdfs']) != sorted(pdf_paths):
+        return False
+    return all(manifest['pdfs'][path]['sha256'] == file_hash(path) for path in pdf_paths)
+
+def build_index(embeddings, pdf_paths=PDF_PATHS, directory=INDEX_DIRECTORY):
+    """
+    Builds (or incrementally updates) the saved index and returns (vector_store, stats).
+    Vectors of chunks whose content hash is already in the manifest are copied from the
+    previous index; only new or changed chunks are sent to the embedding model.
+    """
+    manifest = load_manifest(directory)
+    if manifest is not None and manifest['embedding_model'] != embedding_model_name(embeddings):
+        manifest = None
+
+    # content hash -> vector, from the previous build
+    previous_vectors = {}
+    previous_store = None
+    if manifest is not None:
+        previous_store = load_index(embeddings, directory, mmap=False)
+        chunk_hashes = {
+            chunk['id']: chunk['sha256']
+            for pdf in manifest['pdfs'].values()
+            for chunk in pdf['chunks']
+        }
+        for position, doc_id in previous_store.index_to_docstore_id.items():
+            if doc_id in chunk_hashes:
+                previous_vectors[chunk_hashes[doc_id]] = previous_store.index.reconstruct(position).tolist()
+
+    stats = {'pdfs_parsed': 0, 'chunks': 0, 'chunks_reused': 0, 'chunks_embedded': 0}
+    new_manifest = {'embedding_model': embedding_model_name(embeddings), 'chunker': CHUNKER_VERSION, 'pdfs': {}}
+    same_chunker = manifest is not None and manifest.get('chunker') == CHUNKER_VERSION
+    texts, metadatas, ids, vectors = [], [], [], []
+
+    for path in pdf_paths:
+        pdf_sha = file_hash(path)
+        previous_pdf = manifest['pdfs'].get(path) if manifest is not None else None
+
+        if previous_pdf is not None and previous_pdf['sha256'] == pdf_sha and same_chunker:
+            # unchanged file: reuse the stored chunks as they are
+            chunks = [
+                (chunk['id'], chunk['sha256'], previous_store.docstore.search(chunk['id']))
+                for chunk in previous_pdf['chunks']
+            ]
+        else:
+            stats['pdfs_parsed'] += 1
+            chunks = []
+            for position, document in enumerate(split_pdf(path)):
+                sha = chunk_hash(document.page_content)
+                chunks.append((f"{pdf_sha[:12]}-{position}", sha, document))
+
+        new_manifest['pdfs'][path] = {
+            'sha256': pdf_sha,
+            'chunks': [{'id': doc_id, 'sha256': sha} for doc_id, sha, _ in chunks],
+        }
+        for doc_id, sha, document in chunks:
+            texts.append(document.page_content)
+            metadatas.append(document.metadata)
+            ids.append(doc_id)
+            vectors.append(previous_vectors.get(sha))
+
+    # embed only the chunks we have no vector for, once per distinct text
+    stats['chunks'] = len(texts)
+    stats['chunks_reused'] = sum(1 for vector in vectors if vector is not None)
+    missing = {}
+    for position, vector in enumerate(vectors):
+        if vector is None:
+            missing.setdefault(chunk_hash(texts[position]), texts[position])
+    if missing:
+        embedded = dict(zip(missing, embeddings.embed_documents(list(missing.values()))))
+        for position, vector in enumerate(vectors):
+            if vector is None:
+                vectors[position] = embedded[chunk_hash(texts[position])]
+    stats['chunks_embedded'] = len(missing)
+
+    vector_store = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=metadatas, ids=ids)
+    vector_store.save_local(directory)
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as f:
+        json.dump(new_manifest, f, indent=1)
+    return vector_store, stats
+
+def load_or_build_index(embeddings, pdf_paths=PDF_PATHS, directory=INDEX_DIRECTORY):
+    """
+    Memory-maps the saved index if it matches the PDFs on disk, otherwise updates it first.
+    """
+    if not index_is_current(embeddings, pdf_paths, directory):
+        _, stats = build_index(embeddings, pdf_paths, directory)
+        print(f"PDF index updated: {stats}")
+    return load_index(embeddings, directory)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the PDF catalog FAISS index.")
+    parser.add_argument("--directory", default=INDEX_DIRECTORY)
+    parser.add_argument("--fake", type=int, metavar="SIZE",
+                        help="use deterministic local embeddings of this size instead of OpenAI")
+    args = parser.parse_args()
+
+    if args.fake:
+        from langchain_community.embeddings import DeterministicFakeEmbedding
+        embeddings = DeterministicFakeEmbedding(size=args.fake)
+    else:
+        from llm import embeddings
+
+    _, stats = build_index(embeddings, directory=args.directory)
+    print(stats)
@@ -1,35 +1,20 @@
-from llm import llm
-import streamlit as st
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
+from llm import llm, embeddings
 from langchain.chains import RetrievalQA
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.prompts import PromptTemplate
 
+from tools.pdf_index import load_or_build_index, course_entry_retriever
 
-def load_and_split_pdfs(pdf_paths):
-    all_documents = []
-    for path in pdf_paths:
-        loader = PyPDFLoader(path)  # Load each PDF
-        documents = loader.load()  # Load the PDF
-        all_documents.extend(documents)  # Combine all documents
-    return all_documents
 
-pdf_paths = ["resources/CSE-Catalog.pdf", "resources/Math-Catalog.pdf"]  # Replace with your PDF file paths
-documents = load_and_split_pdfs(pdf_paths)
-
-# Step 2: Split text into manageable chunks
-text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-chunks = text_splitter.split_documents(documents)
-
-# Step 3: Generate embeddings for all chunks
-embeddings = OpenAIEmbeddings(model="text-embedding-ada-002", openai_api_key=st.secrets["OPENAI_API_KEY"])  # Use OpenAI's embedding model
-vector_store = FAISS.from_documents(chunks, embeddings)  # Store embeddings in FAISS
+# Steps 1-3: load, split and embed the catalogs.
+# The index is built offline (python -m tools.pdf_index) and memory-mapped here;
+# it is only updated if a catalog PDF changed since the last build.
+# Uses the shared (cached) embeddings from llm.py.
+vector_store = load_or_build_index(embeddings)
 
 # Step 4: Create a retrieval-based QA tool
-retriever = vector_store.as_retriever()
+# Questions naming a course get that course's catalog entry; the rest use vector search.
+retriever = course_entry_retriever(vector_store)
 
 # Create the RetrievalQA chain with the correct parameters
 qa_chain = RetrievalQA.from_chain_type(
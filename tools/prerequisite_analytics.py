@@ -0,0 +1,237 @@
+import os
+import re
+import json
+import math
+import time
+
+from tools.schedule_planner import SchedulePlanner
+
+SNAPSHOT_PATH = ".cache/prerequisite_analytics.json"
+# Course numbers from 100 up are upper division
+UPPER_DIVISION = 100
+RANKING_SIZE = 10
+
+def _course_number(course_id):
+    number = re.match(r'\D*(\d+)', course_id.split(' ')[-1])
+    return int(number.group(1)) if number else None
+
+def _cycles(course_ids, groups):
+    # Tarjan's strongly connected components over course -> prerequisite option edges;
+    # a component with more than one course (or a course requiring itself) is a cycle
+    order = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    cycles = []
+
+    def visit(course_id):
+        order[course_id] = low[course_id] = len(order)
+        stack.append(course_id)
+        on_stack.add(course_id)
+        for group in groups[course_id]:
+            for option in group:
+                if option not in order:
+                    visit(option)
+                    low[course_id] = min(low[course_id], low[option])
+                elif option in on_stack:
+                    low[course_id] = min(low[course_id], order[option])
+        if low[course_id] == order[course_id]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == course_id:
+                    break
+            if len(component) > 1 or any(course_id in group for group in groups[course_id]):
+                cycles.append(sorted(component))
+
+    for course_id in course_ids:
+        if course_id not in order:
+            visit(course_id)
+    return sorted(cycles)
+
+def analyze_catalog(index):
+    """
+    Per-course metrics over the prerequisite OrGroup graph of a CourseGraphIndex (one course of
+    every group is required):
+        'prereq_depth':   length of the longest prerequisite chain below the course when every
+                          OR group is satisfied by its shallowest option (0: no prerequisites)
+        'fastest_chain':  that chain, from an entry course up to the course
+        'min_quarters':   quarters of the SchedulePlanner plan that takes the course from scratch,
+                          under the 22 unit limit, the course's own quarter included
+        'unlocks':        courses that have the course somewhere in their prerequisite chain
+        'direct_unlocks': courses that list it in one of their groups
+        'in_cycle':       the course is part of a prerequisite cycle
+        'dangling_prereqs': prerequisites that are not in the catalog (placeholder courses)
+    Courses that are not in the catalog count as entry courses (depth 0, 4 units).
+    Depth, chain and quarters are None when every way to the course runs through a cycle.
+
+    Returns {'courses': {course_id: metrics}, 'cycles': [[course_id, ...], ...],
+             'dangling': {missing course_id: [courses referencing it]}, 'seconds': ...}.
+    """
+    started = time.perf_counter()
+    course_ids = index.course_ids()
+    groups = {
+        course_id: [record['prereq_courses'] for record in index.get_prerequisites(course_id) if record['prereq_courses']]
+        for course_id in course_ids
+    }
+    in_catalog = {course_id: bool(index.get_course_info(course_id)) for course_id in course_ids}
+
+    # shallowest depth per course: start everything at infinity and relax until nothing changes,
+    # so courses that can only be reached through a cycle stay infinite
+    depth = dict.fromkeys(course_ids, math.inf)
+    changed = True
+    while changed:
+        changed = False
+        for course_id in course_ids:
+            value = 1 + max((min(depth[option] for option in group) for group in groups[course_id]), default=-1)
+            if value < depth[course_id]:
+                depth[course_id] = value
+                changed = True
+
+    def fastest_chain(course_id):
+        chain = [course_id]
+        while groups[course_id]:
+            # the deepest group decides the depth; follow its shallowest option
+            group = max(groups[course_id], key=lambda group: min(depth[option] for option in group))
+            course_id = min(group, key=lambda option: (depth[option], option))
+            chain.append(course_id)
+        return chain[::-1]
+
+    units = {
+        course_id: index.get_course_info(course_id)[0]['units']
+        for course_id in course_ids if in_catalog[course_id]
+    }
+    planner = SchedulePlanner(groups, units)
+    cycles = _cycles(course_ids, groups)
+    in_cycle = {course_id for cycle in cycles for course_id in cycle}
+
+    dangling = {}
+    courses = {}
+    for course_id in course_ids:
+        missing = sorted({option for group in groups[course_id] for option in group if not in_catalog[option]})
+        for option in missing:
+            dangling.setdefault(option, []).append(course_id)
+
+        reachable = depth[course_id] < math.inf
+        plan = planner.plan([course_id]) if reachable else None
+        courses[course_id] = {
+            'in_catalog': in_catalog[course_id],
+            'prereq_depth': depth[course_id] if reachable else None,
+            'fastest_chain': fastest_chain(course_id) if reachable else None,
+            'min_quarters': len(plan['quarters']) if plan and not plan['unscheduled'] else None,
+            'unlocks': len(index.get_dependents([course_id])) - 1,
+            'direct_unlocks': len(index.get_required_for(course_id)),
+            'in_cycle': course_id in in_cycle,
+            'dangling_prereqs': missing,
+        }
+
+    return {
+        'courses': courses,
+        'cycles': cycles,
+        'dangling': dict(sorted(dangling.items())),
+        'seconds': round(time.perf_counter() - started, 4),
+    }
+
+# Snapshot: the analytics of one catalog version as JSON, written by catalog_analytics.py
+# and by the db_retriever tool, read back while the catalog version is unchanged
+
+def _jsonable(version):
+    # version stamps are nested tuples, which come back from JSON as lists
+    return json.loads(json.dumps(version))
+
+def save_snapshot(analytics, version, path=SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump({'version': _jsonable(version), 'analytics': analytics}, f)
+    os.replace(temporary, path)
+
+def load_snapshot(version, path=SNAPSHOT_PATH):
+    """
+    The saved analytics if they were computed for this catalog version, otherwise None.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable analytics snapshot {path}: {str(e)}")
+        return None
+    if saved.get('version') != _jsonable(version):
+        return None
+    return saved['analytics']
+
+def format_course_analytics(analytics, course_ids):
+    lines = []
+    for course_id in course_ids:
+        metrics = analytics['courses'].get(course_id)
+        if metrics is None:
+            lines.append(f"{course_id}: not in the catalog graph")
+            continue
+        if metrics['prereq_depth'] is None:
+            reach = "cannot be reached, every prerequisite path runs through a cycle"
+        elif metrics['prereq_depth'] == 0:
+            reach = "no prerequisites" if metrics['in_catalog'] else "no known prerequisites"
+        else:
+            reach = (f"prerequisite chain {metrics['prereq_depth']} deep, fastest chain: "
+                     f"{' -> '.join(metrics['fastest_chain'])}")
+        parts = [reach]
+        if metrics['min_quarters'] is not None:
+            quarters = metrics['min_quarters']
+            parts.append(f"{quarters} quarter{'s' if quarters != 1 else ''} from scratch")
+        parts.append(f"unlocks {metrics['unlocks']} courses ({metrics['direct_unlocks']} directly)")
+        if metrics['in_cycle']:
+            parts.append("part of a prerequisite cycle")
+        if metrics['dangling_prereqs']:
+            parts.append(f"prerequisites outside the catalog: {', '.join(metrics['dangling_prereqs'])}")
+        if not metrics['in_catalog']:
+            parts.append("not described in the loaded catalogs")
+        lines.append(f"{course_id}: {'; '.join(parts)}")
+    return '\n'.join(lines)
+
+def rank_courses(analytics, by='unlocks', department=None, division=None, limit=RANKING_SIZE):
+    """
+    Catalog courses with the highest value of metric `by`, optionally only of one department
+    ('CSE') and division ('lower' or 'upper').
+    """
+    ranked = []
+    for course_id, metrics in analytics['courses'].items():
+        if not metrics['in_catalog'] or metrics[by] is None:
+            continue
+        if department is not None and course_id.split(' ')[0] != department:
+            continue
+        number = _course_number(course_id)
+        if division is not None and (number is None or (number < UPPER_DIVISION) != (division == 'lower')):
+            continue
+        ranked.append(course_id)
+    ranked.sort(key=lambda course_id: (-analytics['courses'][course_id][by], course_id))
+    return ranked[:limit]
+
+def ranking_request(analytics, text):
+    """
+    Reads (by, department, division) for rank_courses from a question like
+    "which lower-division CSE course unlocks the most".
+    """
+    lowered = text.lower()
+    by = 'prereq_depth' if re.search(r'\b(deep|deepest|longest|chain)\b', lowered) else 'unlocks'
+    division = 'lower' if 'lower' in lowered else 'upper' if 'upper' in lowered else None
+    departments = {course_id.split(' ')[0] for course_id in analytics['courses']}
+    department = next((word for word in re.findall(r'[A-Za-z]+', text) if word.upper() in departments), None)
+    return by, department.upper() if department else None, division
+
+def format_ranking(analytics, course_ids, by='unlocks'):
+    if not course_ids:
+        return "No catalog courses match."
+    label = {'unlocks': 'courses unlocked', 'prereq_depth': 'prerequisite chain depth'}[by]
+    lines = [f"Ranked by {label}:"]
+    for course_id in course_ids:
+        metrics = analytics['courses'][course_id]
+        lines.append(f"{course_id}: {metrics[by]} ({metrics['direct_unlocks']} directly unlocked, "
+                     f"chain {metrics['prereq_depth']} deep)")
+    cycles = [cycle for cycle in analytics['cycles'] if set(cycle) & set(course_ids)]
+    if cycles:
+        lines.append(f"Prerequisite cycles: {'; '.join(' / '.join(cycle) for cycle in cycles)}")
+    return '\n'.join(lines)
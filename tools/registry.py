@@ -0,0 +1,86 @@
+import time
+import threading
+
+class ToolRegistry:
+    """
+    Builds agent tool components on first use instead of at import.
+    A component is whatever a factory returns (a chain, a module of tool functions, ...);
+    lazy() hands out callables for Tool.from_function that build the component when first called.
+    warm_up() builds everything in a background thread so the UI can render first.
+    """
+
+    def __init__(self):
+        self.factories = {}
+        self.components = {}
+        self.timings = {}
+        self.errors = {}
+        self._locks = {}
+        self._created_at = time.perf_counter()
+
+    def register(self, name, factory):
+        self.factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        if name in self.components:
+            return self.components[name]
+        with self._locks[name]:
+            # another thread may have built it while we waited
+            if name not in self.components:
+                start = time.perf_counter()
+                try:
+                    self.components[name] = self.factories[name]()
+                except Exception as e:
+                    self.errors[name] = str(e)
+                    raise
+                finally:
+                    self.timings[name] = time.perf_counter() - start
+                self.errors.pop(name, None)
+        return self.components[name]
+
+    def lazy(self, name, attribute=None):
+        """
+        Returns a function that calls the component (or one of its attributes) once built.
+        """
+        def call(*args, **kwargs):
+            component = self.get(name)
+            func = getattr(component, attribute) if attribute else component
+            return func(*args, **kwargs)
+        call.__name__ = attribute or name
+        return call
+
+    def warm_up(self, background=True):
+        """
+        Builds every registered component, in a daemon thread by default. Failures are kept
+        in the report and retried on first use.
+        """
+        def build_all():
+            for name in self.factories:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Failed to build tool component {name}: {str(e)}")
+            print(f"Tool startup report: {self.startup_report()}")
+
+        if not background:
+            build_all()
+            return None
+        thread = threading.Thread(target=build_all, name="tool-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def startup_report(self):
+        """
+        Seconds spent building each component, and whether it is ready.
+        """
+        return {
+            'since_registry_created': round(time.perf_counter() - self._created_at, 3),
+            'components': {
+                name: {
+                    'ready': name in self.components,
+                    'seconds': round(self.timings[name], 3) if name in self.timings else None,
+                    'error': self.errors.get(name),
+                }
+                for name in self.factories
+            },
+        }
@@ -0,0 +1,74 @@
+import os
+import pickle
+import threading
+
+DEFAULT_PATH = ".cache/major_requirements.pkl"
+
+class RequirementCache:
+    """
+    Documents derived from the catalog graph (major requirements, courses by milestone),
+    built once per catalog version and kept in memory and in a pickle file, so a restart
+    does not have to run the multi-hop requirement queries again.
+
+    version_source() returns the current catalog version; when it differs from the version the
+    documents were built from, they are dropped and rebuilt on the next request.
+    """
+
+    def __init__(self, version_source, path=DEFAULT_PATH):
+        self.version_source = version_source
+        self.path = path
+        self.version = None
+        self.documents = {}
+        self.builds = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                saved = pickle.load(f)
+            self.version, self.documents = saved['version'], saved['documents']
+        except Exception as e:
+            print(f"Ignoring unreadable requirement cache {self.path}: {str(e)}")
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump({'version': self.version, 'documents': self.documents}, f)
+        os.replace(temporary, self.path)
+
+    def get(self, key, build):
+        """
+        Returns the document for key, calling build() if it is missing for the current catalog version.
+        The document is shared between callers and must not be modified.
+        """
+        version = self.version_source()
+        with self._lock:
+            if version != self.version:
+                self.version = version
+                self.documents = {}
+            if key in self.documents:
+                self.hits += 1
+                return self.documents[key]
+
+        document = build()
+        with self._lock:
+            if version == self.version:
+                self.documents[key] = document
+                self.builds += 1
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"Could not save requirement cache {self.path}: {str(e)}")
+        return document
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+            self.documents = {}
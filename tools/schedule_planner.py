@@ -0,0 +1,304 @@
+import math
+
+QUARTERS = ['Fall', 'Winter', 'Spring']
+# Full-time load per quarter (see the agent prompt)
+MIN_UNITS = 12.0
+MAX_UNITS = 22.0
+DEFAULT_UNITS = 4.0
+
+class SchedulePlanner:
+    """
+    Plans courses into quarters under the prerequisite DAG and the per-quarter unit limit.
+
+    prerequisites maps a course id to its prerequisite OR groups ([[course, ...], ...]: one course
+    of every group is required), units maps course ids to units.
+
+    Planning has two steps:
+      1. choose the courses to take: every target, plus for each unsatisfied OR group the option with
+         the lowest cost, where cost(course) = its units + the cost of its own cheapest prerequisites,
+         memoized per plan (only options that could be taken in an earlier quarter count, so cycles
+         of the catalog are never followed), going through the targets most expensive first and
+         counting courses every plan takes as free; prerequisites that courses chosen for other
+         targets made redundant are then dropped
+      2. list-schedule them: each quarter takes the available courses (all groups satisfied in earlier
+         quarters) with the longest chain of chosen courses depending on them first, up to max_units
+    The number of quarters is compared with a lower bound for the targets over every choice of
+    prerequisite options (the earliest quarter the last target could be taken in, and the units that
+    must be taken / max_units), so a plan reports whether it is provably as short as possible.
+    """
+
+    def __init__(self, prerequisites, units, max_units=MAX_UNITS, min_units=MIN_UNITS):
+        self.prerequisites = prerequisites
+        self.units = units
+        self.max_units = max_units
+        self.min_units = min_units
+
+    def _units(self, course_id):
+        return self.units.get(course_id) or DEFAULT_UNITS
+
+    def _groups(self, course_id):
+        return [group for group in self.prerequisites.get(course_id, []) if group]
+
+    def _earliest_quarters(self, courses, completed):
+        # {course: earliest quarter it can be taken in} for the courses whose groups are met by the
+        # others or completed ones, ignoring the unit limit
+        quarters = {}
+        quarter = 0
+        while True:
+            layer = [course_id for course_id in courses if course_id not in quarters and all(
+                any(option in completed or option in quarters for option in group)
+                for group in self._groups(course_id))]
+            if not layer:
+                return quarters
+            quarter += 1
+            quarters.update((course_id, quarter) for course_id in layer)
+
+    def _depths(self, course_ids, completed):
+        """
+        {course: the earliest quarter it could be taken in} for course_ids and every course they could
+        need, over the best prerequisite option of every OR group. Courses that can never be taken
+        are left out.
+        """
+        courses = set()
+        stack = [course_id for course_id in course_ids if course_id not in completed]
+        while stack:
+            course_id = stack.pop()
+            if course_id not in courses:
+                courses.add(course_id)
+                stack.extend(option for group in self._groups(course_id) for option in group
+                             if option not in completed)
+        return self._earliest_quarters(courses, completed)
+
+    def _cost_function(self, completed, depth):
+        memo = {}
+
+        def cost(course_id):
+            if course_id in completed:
+                return 0.0
+            if course_id not in depth:
+                return math.inf
+            if course_id not in memo:
+                # only options that can be taken before the course, so prerequisite cycles are never
+                # followed and the cost does not depend on which course was asked first
+                total = self._units(course_id)
+                for group in self._groups(course_id):
+                    total += min(cost(option) for option in group
+                                 if option in completed or depth.get(option, math.inf) < depth[course_id])
+                memo[course_id] = total
+            return memo[course_id]
+        return cost
+
+    def _chain_units(self, depth, completed):
+        """
+        {course: the units of its prerequisite chain with the most units (itself included)} for the
+        courses of depth, over the best prerequisite option of every OR group, so it holds whichever
+        options a plan takes.
+        """
+        # smallest solution of chain = units + max over groups of the min over options, reached from
+        # below so a prerequisite cycle never raises it
+        def chain(course_id, chain_units):
+            return self._units(course_id) + max((min(
+                0 if option in completed else chain_units.get(option, math.inf) for option in group)
+                for group in self._groups(course_id)), default=0)
+
+        chain_units = {course_id: self._units(course_id) for course_id in depth}
+        for _ in range(len(chain_units)):
+            updated = {course_id: chain(course_id, chain_units) for course_id in chain_units}
+            if updated == chain_units:
+                break
+            chain_units = updated
+        return chain_units
+
+    def choose_courses(self, targets, completed, cost=None, depth=None):
+        """
+        Returns (chosen course ids, unresolved course ids whose prerequisites cannot be met).
+        """
+        depth = self._depths(targets, completed) if depth is None else depth
+        cost = cost or self._cost_function(completed, depth)
+        # courses every plan takes: the targets and the only option of their single-course groups;
+        # choosing one of them for a group costs nothing more
+        mandatory = set()
+        stack = [course_id for course_id in targets if course_id not in completed]
+        while stack:
+            course_id = stack.pop()
+            if course_id not in mandatory:
+                mandatory.add(course_id)
+                stack.extend(group[0] for group in self._groups(course_id)
+                             if len(group) == 1 and group[0] not in completed)
+        chosen = []
+        chosen_set = set()
+        visited = set()
+        unresolved = []
+
+        def require(course_id):
+            if course_id in completed or course_id in visited:
+                return
+            visited.add(course_id)
+            for group in self._groups(course_id):
+                if any(option in completed or option in chosen_set for option in group):
+                    continue
+                # only options that can be taken before the course, as in the cost
+                options = [option for option in group
+                           if depth.get(option, math.inf) < depth.get(course_id, math.inf)]
+                if not options:
+                    unresolved.append(course_id)
+                    continue
+                require(min(options, key=lambda option: (0 if option in mandatory else cost(option), option)))
+            chosen.append(course_id)
+            chosen_set.add(course_id)
+
+        # the most expensive targets first, so cheaper ones reuse their prerequisites; a fixed order
+        # also makes the choice the same for every order of the same targets
+        for course_id in sorted(set(targets), key=lambda course_id: (-cost(course_id), course_id)):
+            require(course_id)
+
+        # drop chosen prerequisites that courses chosen for other targets made redundant (every course
+        # left can still be taken, no later than before), most expensive first, until none is left
+        quarters = self._earliest_quarters(chosen_set, completed)
+        pruned = True
+        while pruned:
+            pruned = False
+            for course_id in sorted(chosen_set - set(targets), key=lambda course_id: (-cost(course_id), course_id)):
+                rest = chosen_set - {course_id}
+                rest_quarters = self._earliest_quarters(rest, completed)
+                if (course_id in quarters and rest_quarters.keys() == quarters.keys() - {course_id}
+                        and max(rest_quarters.values(), default=0) <= max(quarters.values(), default=0)):
+                    chosen_set, quarters = rest, rest_quarters
+                    pruned = True
+                    break
+        # prerequisites first, in the order they were required
+        chosen = [course_id for course_id in chosen if course_id in chosen_set]
+        return sorted(chosen, key=lambda course_id: quarters.get(course_id, math.inf)), unresolved
+
+    def requirement_targets(self, engine, completed, cost=None):
+        """
+        Courses that satisfy the remaining requirements of a DegreeProgressEngine at the lowest cost:
+        the cheapest single course, the cheapest courses reaching the units needed, or the cheapest
+        sequence path, whichever the requirement allows.
+        """
+        completed = set(completed)
+        cost = cost or self._cost_function(completed, self._depths(engine.courses, completed))
+        satisfied, units_done, _ = engine.evaluate_bits(engine.encode([completed]))
+        targets = []
+        for index, requirement in enumerate(engine.requirements):
+            if satisfied[0, index]:
+                continue
+            options = []
+            courses = [course_id for course_id in requirement['courses'] if course_id not in completed]
+            if engine.needed_units[index] > 0:
+                needed = engine.needed_units[index] - units_done[0, index]
+                picked = []
+                for course_id in sorted(courses, key=lambda course_id: (cost(course_id) / self._units(course_id), course_id)):
+                    if needed <= 0:
+                        break
+                    picked.append(course_id)
+                    needed -= self._units(course_id)
+                if needed <= 0:
+                    options.append(picked)
+            elif courses:
+                options.append([min(courses, key=lambda course_id: (cost(course_id), course_id))])
+            for path in requirement['paths']:
+                options.append([course_id for course_id in path if course_id not in completed])
+
+            options = [option for option in options if all(cost(course_id) < math.inf for course_id in option)]
+            if options:
+                targets.extend(min(options, key=lambda option: (sum(cost(course_id) for course_id in option), option)))
+        return list(dict.fromkeys(targets))
+
+    def plan(self, targets, completed=(), start='Fall', max_quarters=15):
+        """
+        Quarter-by-quarter plan for taking the target courses (and the prerequisites they need).
+        Returns a dict:
+            'quarters': [{'quarter': 'Year 1 Fall', 'courses': [...], 'units': 16.0}, ...]
+            'lower_bound': fewest quarters any plan for the targets could use, whichever prerequisite
+                           options it takes, 'optimal': whether this plan schedules everything and reaches it
+            'below_full_time': quarters under min_units, 'unscheduled': courses that could not be placed
+        """
+        completed = set(completed)
+        depth = self._depths(targets, completed)
+        cost = self._cost_function(completed, depth)
+        chosen, unresolved = self.choose_courses(targets, completed, cost, depth)
+        chosen_set = set(chosen)
+
+        # longest chain of chosen courses that starts at each course
+        dependents = {course_id: [] for course_id in chosen}
+        for course_id in chosen:
+            for group in self._groups(course_id):
+                for option in group:
+                    if option in chosen_set:
+                        dependents[option].append(course_id)
+        height = {}
+
+        def chain(course_id, visiting=()):
+            if course_id not in height:
+                if course_id in visiting:
+                    return 0
+                height[course_id] = 1 + max(
+                    (chain(dependent, visiting + (course_id,)) for dependent in dependents[course_id]), default=0)
+            return height[course_id]
+
+        for course_id in chosen:
+            chain(course_id)
+
+        done = set(completed)
+        remaining = set(chosen) - set(unresolved)
+        quarters = []
+        season = QUARTERS.index(start)
+        while remaining and len(quarters) < max_quarters:
+            available = sorted(
+                (course_id for course_id in remaining
+                 if all(any(option in done for option in group) for group in self._groups(course_id))),
+                key=lambda course_id: (-height[course_id], course_id),
+            )
+            if not available:
+                break
+            taken, load = [], 0.0
+            for course_id in available:
+                units = self._units(course_id)
+                if load + units <= self.max_units or not taken:
+                    taken.append(course_id)
+                    load += units
+            position = season + len(quarters)
+            quarters.append({
+                'quarter': f"Year {position // 3 + 1} {QUARTERS[position % 3]}",
+                'courses': taken,
+                'units': load,
+            })
+            done.update(taken)
+            remaining.difference_update(taken)
+
+        scheduled = [course_id for course_id in chosen if course_id in done]
+        total_units = sum(self._units(course_id) for course_id in scheduled)
+        unscheduled = sorted(remaining | set(unresolved))
+        # every target counts, scheduled or not; targets that can never be taken bound nothing
+        chain_units = self._chain_units(depth, completed)
+        goals = [course_id for course_id in dict.fromkeys(targets) if course_id in depth]
+        # the targets themselves, or the prerequisite chain with the most units, must all be taken
+        needed_units = max(sum(self._units(course_id) for course_id in goals),
+                           max((chain_units[course_id] for course_id in goals), default=0))
+        lower_bound = max(
+            max((depth[course_id] for course_id in goals), default=0),
+            math.ceil(needed_units / self.max_units) if needed_units else 0,
+        )
+        return {
+            'quarters': quarters,
+            'total_units': total_units,
+            'lower_bound': lower_bound,
+            'optimal': not unscheduled and len(quarters) == lower_bound,
+            'below_full_time': [quarter['quarter'] for quarter in quarters if quarter['units'] < self.min_units],
+            'unscheduled': unscheduled,
+        }
+
+def format_plan(plan):
+    lines = []
+    for quarter in plan['quarters']:
+        lines.append(f"{quarter['quarter']} ({quarter['units']:g} units): {', '.join(quarter['courses'])}")
+    if not lines:
+        lines.append("Nothing left to schedule.")
+    lines.append(f"{len(plan['quarters'])} quarters, {plan['total_units']:g} units"
+                 + (" (fewest possible)" if plan['optimal'] else f" (at least {plan['lower_bound']} needed)"))
+    if plan['below_full_time']:
+        lines.append(f"Below the {MIN_UNITS:g} unit full-time minimum, add electives in: {', '.join(plan['below_full_time'])}")
+    if plan['unscheduled']:
+        lines.append(f"Could not schedule (prerequisites unavailable or too many quarters): {', '.join(plan['unscheduled'])}")
+    return '\n'.join(lines)
@@ -1,4 +1,3 @@
-import streamlit as st
 from llm import llm, embeddings
 from graph import graph
 